@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'club.settings')
 
 application = get_wsgi_application()
+
+# Barrido periódico de facturas atrasadas (OVERDUE_SWEEP_INTERVAL en segundos, 0 = desactivado)
+from django.conf import settings  # noqa: E402
+from finance.overdue import start_overdue_scheduler  # noqa: E402
+
+start_overdue_scheduler(settings.OVERDUE_SWEEP_INTERVAL)
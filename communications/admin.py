@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import BulkEmail, EmailRecipient
+from .models import BulkEmail, EmailRecipient, UnreadCounter
 
 @admin.register(BulkEmail)
 class BulkEmailAdmin(admin.ModelAdmin):
@@ -56,4 +56,11 @@ class EmailRecipientAdmin(admin.ModelAdmin):
     readonly_fields = ['user', 'bulk_email', 'sent_at', 'read_at']
     
     # 4. 'created_at' no existe, usamos 'sent_at' (que sí es un DateTimeField).
-    date_hierarchy = 'sent_at'
\ No newline at end of file
+    date_hierarchy = 'sent_at'
+
+
+@admin.register(UnreadCounter)
+class UnreadCounterAdmin(admin.ModelAdmin):
+    list_display = ['user', 'unread_count', 'updated_at']
+    search_fields = ['user__username', 'user__first_name', 'user__last_name']
+    readonly_fields = ['user', 'unread_count', 'updated_at']
@@ -0,0 +1,129 @@
+"""
+Resolución de audiencias para mensajes masivos.
+
+Una audiencia es un diccionario serializable (se guarda en ``BulkEmail.audience``)
+con la clave ``type`` y sus parámetros. Cada tipo se resuelve con una sola
+consulta con joins que devuelve ids de usuario únicos: un apoderado con
+varias jugadoras en el segmento recibe el mensaje una sola vez.
+"""
+from django.contrib.auth.models import User
+
+from finance.models import Invoice
+from players.models import Category, GuardianPlayer, Player
+
+AUDIENCE_TYPES = {
+    'all_guardians': 'Todos los Apoderados',
+    'multiple_categories': 'Apoderados por Categoría',
+    'player_status': 'Apoderados por Estado de Jugadora',
+    'outstanding_debt': 'Apoderados con Deuda Pendiente',
+    'specific_email': 'Apoderado Específico',
+    'all_admins': 'Todos los Administradores',
+}
+
+OUTSTANDING_STATUSES = ['pendiente', 'atrasada']
+
+
+class InvalidAudience(ValueError):
+    """La definición de audiencia está incompleta o no es válida."""
+
+
+def build_audience(data):
+    """
+    Construye la definición de audiencia a partir de los datos del formulario
+    (``request.POST``). Lanza ``InvalidAudience`` si falta algún parámetro.
+    """
+    audience_type = data.get('recipient_type')
+    if audience_type not in AUDIENCE_TYPES:
+        raise InvalidAudience('Selecciona un tipo de destinatario válido.')
+    audience = {'type': audience_type}
+
+    if audience_type == 'multiple_categories':
+        category_ids = sorted({int(pk) for pk in data.getlist('category') if pk.isdigit()})
+        if not category_ids:
+            raise InvalidAudience('Selecciona al menos una categoría.')
+        audience['category_ids'] = category_ids
+    elif audience_type == 'player_status':
+        valid = dict(Player.STATUS_CHOICES)
+        statuses = sorted({s for s in data.getlist('player_status') if s in valid})
+        if not statuses:
+            raise InvalidAudience('Selecciona al menos un estado de jugadora.')
+        audience['player_statuses'] = statuses
+    elif audience_type == 'outstanding_debt':
+        audience['overdue_only'] = bool(data.get('overdue_only'))
+    elif audience_type == 'specific_email':
+        email = (data.get('specific_email') or '').strip()
+        if not email:
+            raise InvalidAudience('Ingresa el email del apoderado.')
+        audience['email'] = email
+    return audience
+
+
+def resolve_audience(audience):
+    """Devuelve un queryset ``values_list('id', flat=True)`` con los usuarios (sin repetir) de la audiencia."""
+    audience_type = audience.get('type')
+
+    if audience_type in ('multiple_categories', 'player_status'):
+        links = GuardianPlayer.objects.filter(guardian__is_active=True)
+        if audience_type == 'multiple_categories':
+            links = links.filter(player__category_id__in=audience['category_ids'])
+        else:
+            links = links.filter(player__status__in=audience['player_statuses'])
+        return links.order_by('guardian_id').values_list('guardian_id', flat=True).distinct()
+
+    if audience_type == 'outstanding_debt':
+        statuses = ['atrasada'] if audience.get('overdue_only') else OUTSTANDING_STATUSES
+        return (
+            Invoice.objects.filter(status__in=statuses, guardian__is_active=True)
+            .order_by('guardian_id')
+            .values_list('guardian_id', flat=True)
+            .distinct()
+        )
+
+    users = User.objects.filter(is_active=True)
+    if audience_type == 'all_guardians':
+        users = users.filter(guardian_profile__isnull=False)
+    elif audience_type == 'specific_email':
+        users = users.filter(guardian_profile__isnull=False, email__iexact=audience['email'])
+    elif audience_type == 'all_admins':
+        users = users.filter(admin_profile__isnull=False)
+    else:
+        return User.objects.none().values_list('id', flat=True)
+    return users.order_by('id').values_list('id', flat=True)
+
+
+def describe_audience(audience, category_names=None):
+    """
+    Texto legible de la audiencia para el panel. ``category_names``
+    ({id: nombre}) evita consultar las categorías; ver ``label_audiences``.
+    """
+    label = AUDIENCE_TYPES.get(audience.get('type'), 'Sin definir')
+    if audience.get('type') == 'multiple_categories':
+        if category_names is None:
+            category_names = dict(Category.objects.filter(pk__in=audience['category_ids']).values_list('pk', 'name'))
+        names = sorted(category_names[pk] for pk in audience['category_ids'] if pk in category_names)
+        return f"{label}: {', '.join(names)}"
+    if audience.get('type') == 'player_status':
+        statuses = dict(Player.STATUS_CHOICES)
+        return f"{label}: {', '.join(statuses.get(s, s) for s in audience['player_statuses'])}"
+    if audience.get('type') == 'outstanding_debt' and audience.get('overdue_only'):
+        return f'{label} (solo atrasadas)'
+    if audience.get('type') == 'specific_email':
+        return f"{label}: {audience['email']}"
+    return label
+
+
+def label_audiences(bulk_emails):
+    """
+    Calcula ``audience_label`` de varios mensajes con una sola consulta de
+    categorías (para listados). Devuelve la lista de mensajes.
+    """
+    bulk_emails = list(bulk_emails)
+    category_ids = {
+        pk
+        for bulk_email in bulk_emails if bulk_email.audience.get('type') == 'multiple_categories'
+        for pk in bulk_email.audience['category_ids']
+    }
+    names = dict(Category.objects.filter(pk__in=category_ids).values_list('pk', 'name')) if category_ids else {}
+    for bulk_email in bulk_emails:
+        bulk_email.audience_label = describe_audience(bulk_email.audience, names)
+    return bulk_emails
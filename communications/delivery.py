@@ -0,0 +1,168 @@
+"""
+Pipeline de envío de mensajes masivos.
+
+1. ``create_recipients`` inserta los EmailRecipient por bloques a partir de
+   ``values_list('id')`` (sin instanciar Users).
+2. ``deliver_bulk_email`` envía los correos pendientes reutilizando una sola
+   conexión SMTP (``get_connection()`` + ``send_messages``) por lotes. Cada
+   lote se reclama en una transacción corta (``status='enviando'``, con
+   ``skip_locked`` para repartir el trabajo entre workers), el envío ocurre
+   fuera de ella y al final se registra ``enviado``/``fallido`` con un UPDATE.
+   Un lote que falla se reintenta con una conexión nueva; los reclamados por
+   un proceso que murió se vuelven a tomar tras ``BULK_EMAIL_CLAIM_TIMEOUT``.
+
+Funciona con cualquier EMAIL_BACKEND (en pruebas, el de memoria ``locmem``).
+"""
+import logging
+import mimetypes
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import BulkEmail, EmailRecipient
+
+logger = logging.getLogger(__name__)
+
+
+def create_recipients(bulk_email, user_ids, chunk_size=None):
+    """Crea los destinatarios por bloques. ``user_ids`` puede ser un queryset ``values_list('id', flat=True)``."""
+    chunk_size = chunk_size or settings.BULK_EMAIL_CHUNK_SIZE
+    if hasattr(user_ids, 'iterator'):
+        user_ids = user_ids.iterator(chunk_size=chunk_size)
+
+    created = 0
+    chunk = []
+    for user_id in user_ids:
+        chunk.append(EmailRecipient(bulk_email_id=bulk_email.pk, user_id=user_id, status='pendiente'))
+        if len(chunk) >= chunk_size:
+            EmailRecipient.objects.bulk_create(chunk, ignore_conflicts=True)
+            created += len(chunk)
+            chunk = []
+    if chunk:
+        EmailRecipient.objects.bulk_create(chunk, ignore_conflicts=True)
+        created += len(chunk)
+    return created
+
+
+def _read_attachment(bulk_email):
+    if not bulk_email.attachment:
+        return None
+    with bulk_email.attachment.open('rb') as fh:
+        content = fh.read()
+    name = os.path.basename(bulk_email.attachment.name)
+    return name, content, mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+def _build_message(bulk_email, email_address, attachment, connection):
+    message = EmailMultiAlternatives(
+        subject=bulk_email.title,
+        body=strip_tags(bulk_email.body_html),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[email_address],
+        connection=connection,
+    )
+    message.attach_alternative(bulk_email.body_html, 'text/html')
+    if attachment:
+        message.attach(*attachment)
+    return message
+
+
+def _claimable(bulk_email_id):
+    stale = timezone.now() - timedelta(seconds=settings.BULK_EMAIL_CLAIM_TIMEOUT)
+    return EmailRecipient.objects.filter(
+        Q(status='pendiente') | Q(status='enviando', sent_at__lt=stale),
+        bulk_email_id=bulk_email_id,
+    )
+
+
+def _claim_batch(bulk_email_id, batch_size):
+    """
+    Reclama hasta ``batch_size`` destinatarios: los marca 'enviando' (con la
+    hora del reclamo en ``sent_at``) y confirma, sin retener bloqueos durante
+    el envío. Devuelve [(pk, email)].
+    """
+    with transaction.atomic():
+        # of=('self',): bloquea solo EmailRecipient, no las filas de auth_user del JOIN
+        batch = list(
+            _claimable(bulk_email_id)
+            .select_for_update(skip_locked=True, of=('self',))
+            .order_by('pk')
+            .values_list('pk', 'user__email')[:batch_size]
+        )
+        if batch:
+            EmailRecipient.objects.filter(pk__in=[pk for pk, _ in batch]).update(
+                status='enviando', sent_at=timezone.now()
+            )
+    return batch
+
+
+def _send_with_retries(connection, messages, bulk_email_id):
+    """Envía un lote; si falla, reabre la conexión y reintenta. Devuelve (conexión, éxito)."""
+    attempts = max(1, settings.BULK_EMAIL_MAX_ATTEMPTS)
+    for attempt in range(1, attempts + 1):
+        try:
+            connection.send_messages(messages)
+            return connection, True
+        except Exception:
+            logger.exception(
+                'Error enviando lote del mensaje masivo %s (intento %s de %s)', bulk_email_id, attempt, attempts
+            )
+            connection.close()
+            connection = get_connection()
+            for message in messages:
+                message.connection = connection
+    return connection, False
+
+
+def deliver_bulk_email(bulk_email_id, batch_size=None):
+    """
+    Envía todos los destinatarios pendientes de un mensaje masivo.
+    Devuelve (enviados, fallidos).
+    """
+    batch_size = batch_size or settings.BULK_EMAIL_BATCH_SIZE
+    bulk_email = BulkEmail.objects.get(pk=bulk_email_id)
+    attachment = _read_attachment(bulk_email)
+    sent_total = failed_total = 0
+
+    connection = get_connection()
+    try:
+        while True:
+            batch = _claim_batch(bulk_email_id, batch_size)
+            if not batch:
+                break
+
+            with_email = [(pk, email) for pk, email in batch if email]
+            sent_ids, failed_ids = [], [pk for pk, email in batch if not email]
+            if with_email:
+                messages = [_build_message(bulk_email, email, attachment, connection) for _, email in with_email]
+                connection, ok = _send_with_retries(connection, messages, bulk_email_id)
+                (sent_ids if ok else failed_ids).extend(pk for pk, _ in with_email)
+
+            now = timezone.now()
+            if sent_ids:
+                EmailRecipient.objects.filter(pk__in=sent_ids).update(status='enviado', sent_at=now)
+            if failed_ids:
+                EmailRecipient.objects.filter(pk__in=failed_ids).update(status='fallido', sent_at=None)
+            sent_total += len(sent_ids)
+            failed_total += len(failed_ids)
+    finally:
+        connection.close()
+
+    BulkEmail.objects.filter(pk=bulk_email_id).update(is_sent=True, sent_at=timezone.now())
+    return sent_total, failed_total
+
+
+def deliver_pending_bulk_emails(batch_size=None):
+    """Procesa todos los mensajes masivos que aún tienen destinatarios pendientes."""
+    pending_ids = (
+        BulkEmail.objects.filter(recipients__status__in=['pendiente', 'enviando'])
+        .values_list('pk', flat=True)
+        .distinct()
+    )
+    return {bulk_id: deliver_bulk_email(bulk_id, batch_size=batch_size) for bulk_id in list(pending_ids)}
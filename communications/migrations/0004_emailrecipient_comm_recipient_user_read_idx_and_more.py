@@ -0,0 +1,23 @@
+# Generated by Django 5.0 on 2026-10-17 13:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communications', '0003_alter_bulkemail_options_alter_emailrecipient_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailrecipient',
+            index=models.Index(fields=['user', 'read_at'], name='comm_recipient_user_read_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailrecipient',
+            index=models.Index(condition=models.Q(('read_at__isnull', True)), fields=['user'], name='comm_recipient_unread_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0 on 2026-10-17 13:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('communications', '0004_emailrecipient_comm_recipient_user_read_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread_count', models.PositiveIntegerField(default=0, verbose_name='Mensajes no leídos')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Contador de No Leídos',
+                'verbose_name_plural': 'Contadores de No Leídos',
+            },
+        ),
+    ]
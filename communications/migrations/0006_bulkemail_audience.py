@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-17 13:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communications', '0005_unreadcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkemail',
+            name='audience',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Audiencia'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-17 13:25
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communications', '0006_bulkemail_audience'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bulkemail',
+            name='attachment',
+            field=models.FileField(blank=True, max_length=255, null=True, storage=core.storage.dedup_storage, upload_to='communications_attachments/', verbose_name='Adjuntar Archivo'),
+        ),
+    ]
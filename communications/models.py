@@ -1,6 +1,11 @@
+import os
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.utils.functional import cached_property
+
+from core.storage import dedup_storage
 
 class BulkEmail(models.Model):
     """
@@ -16,15 +21,34 @@ class BulkEmail(models.Model):
     # --- NUEVO CAMPO ---
     attachment = models.FileField(
         upload_to='communications_attachments/', 
+        storage=dedup_storage,
+        max_length=255,
         blank=True, 
         null=True, 
         verbose_name="Adjuntar Archivo"
     )
     # --- FIN NUEVO CAMPO ---
 
+    # Definición de la audiencia (ver communications.audiences), para poder recalcular los destinatarios
+    audience = models.JSONField(default=dict, blank=True, verbose_name="Audiencia")
+
     def __str__(self):
         return self.title
 
+    def resolve_audience(self):
+        """Ids de los usuarios que hoy pertenecen a la audiencia del mensaje (consulta perezosa)."""
+        from .audiences import resolve_audience
+        return resolve_audience(self.audience)
+
+    @property
+    def attachment_filename(self):
+        return os.path.basename(self.attachment.name) if self.attachment else ''
+
+    @cached_property
+    def audience_label(self):
+        from .audiences import describe_audience
+        return describe_audience(self.audience)
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Mensaje Masivo"
@@ -46,4 +70,30 @@ class EmailRecipient(models.Model):
 
     class Meta:
         unique_together = ['bulk_email', 'user'] # Evita enviar el mismo mensaje dos veces
-        ordering = ['-sent_at']
\ No newline at end of file
+        ordering = ['-sent_at']
+        indexes = [
+            models.Index(fields=['user', 'read_at'], name='comm_recipient_user_read_idx'),
+            # Contador de no leídos por apoderado
+            models.Index(
+                fields=['user'],
+                name='comm_recipient_unread_idx',
+                condition=models.Q(read_at__isnull=True),
+            ),
+        ]
+
+class UnreadCounter(models.Model):
+    """
+    Contador desnormalizado de mensajes no leídos por usuario, para que el
+    badge de "Mensajes" sea una lectura O(1). Lo mantiene communications/unread.py;
+    el comando reconcile_unread_counters corrige cualquier desviación.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="unread_counter")
+    unread_count = models.PositiveIntegerField(default=0, verbose_name="Mensajes no leídos")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username}: {self.unread_count} no leídos"
+
+    class Meta:
+        verbose_name = "Contador de No Leídos"
+        verbose_name_plural = "Contadores de No Leídos"
@@ -0,0 +1,10 @@
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .models import BulkEmail
+from .unread import discard_bulk_email
+
+
+@receiver(pre_delete, sender=BulkEmail)
+def discount_unread_on_delete(sender, instance, **kwargs):
+    discard_bulk_email(instance)
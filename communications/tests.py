@@ -1,3 +1,156 @@
-from django.test import TestCase
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+
+from finance.models import FeeDefinition, Invoice
+from players.models import Category, GuardianPlayer, Player
+from users.models import GuardianProfile
+
+from .audiences import InvalidAudience, build_audience, label_audiences, resolve_audience
+from .delivery import create_recipients, deliver_bulk_email
+from .models import BulkEmail, EmailRecipient
+from .unread import get_unread_count, mark_as_read, reconcile_counters, register_delivery
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    BULK_EMAIL_BATCH_SIZE=2,
+    BULK_EMAIL_MAX_ATTEMPTS=2,
+)
+class DeliverBulkEmailTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin_test', 'admin@example.com', 'x')
+        self.users = [User.objects.create_user(f'apoderado{i}', f'apoderado{i}@example.com', 'x') for i in range(5)]
+        self.no_email = User.objects.create_user('sin_email', '', 'x')
+        self.bulk_email = BulkEmail.objects.create(title='Aviso', body_html='<p>Hola</p>', created_by=self.admin)
+        create_recipients(self.bulk_email, [user.pk for user in [*self.users, self.no_email]])
+
+    def test_sends_one_message_per_recipient_in_batches(self):
+        sent, failed = deliver_bulk_email(self.bulk_email.pk)
+
+        self.assertEqual((sent, failed), (5, 1))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), sorted(user.email for user in self.users))
+        self.assertEqual(mail.outbox[0].subject, 'Aviso')
+        statuses = dict(EmailRecipient.objects.values_list('user__username', 'status'))
+        self.assertEqual(statuses.pop('sin_email'), 'fallido')
+        self.assertEqual(set(statuses.values()), {'enviado'})
+        self.bulk_email.refresh_from_db()
+        self.assertTrue(self.bulk_email.is_sent)
+
+    def test_second_run_sends_nothing(self):
+        deliver_bulk_email(self.bulk_email.pk)
+        mail.outbox.clear()
+
+        self.assertEqual(deliver_bulk_email(self.bulk_email.pk), (0, 0))
+        self.assertEqual(mail.outbox, [])
+
+    def test_failed_batch_is_retried_then_marked_failed(self):
+        backend = 'django.core.mail.backends.locmem.EmailBackend.send_messages'
+        # El primer lote falla una vez y se reintenta; el segundo falla en todos los intentos
+        with mock.patch(backend, autospec=True, side_effect=[OSError, 2, OSError, OSError, 1]), \
+                self.assertLogs('communications.delivery', 'ERROR') as logs:
+            sent, failed = deliver_bulk_email(self.bulk_email.pk)
+
+        self.assertEqual(len(logs.records), 3)
+        self.assertEqual((sent, failed), (3, 3))
+        self.assertEqual(EmailRecipient.objects.filter(status='enviado').count(), 3)
+        self.assertFalse(EmailRecipient.objects.filter(status__in=['pendiente', 'enviando']).exists())
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin_test', 'admin@example.com', 'x')
+        self.user = User.objects.create_user('apoderado', 'apoderado@example.com', 'x')
+
+    def _send(self, title):
+        bulk_email = BulkEmail.objects.create(title=title, body_html='-', created_by=self.admin)
+        create_recipients(bulk_email, [self.user.pk])
+        register_delivery(bulk_email)
+        return bulk_email
+
+    def test_counter_follows_new_messages_reads_and_deletes(self):
+        first = self._send('Primero')
+        self.assertEqual(get_unread_count(self.user), 1)  # crea el contador desde EmailRecipient
+
+        second = self._send('Segundo')
+        self._send('Tercero')
+        self.assertEqual(get_unread_count(self.user), 3)
+
+        self.assertEqual(mark_as_read(self.user, EmailRecipient.objects.filter(bulk_email=first)), 1)
+        # Volver a leer el mismo mensaje no descuenta de nuevo
+        self.assertEqual(mark_as_read(self.user, EmailRecipient.objects.filter(bulk_email=first)), 0)
+        self.assertEqual(get_unread_count(self.user), 2)
+
+        second.delete()
+        self.assertEqual(get_unread_count(self.user), 1)
+
+        self.assertEqual(mark_as_read(self.user), 1)
+        self.assertEqual(get_unread_count(self.user), 0)
+        self.assertEqual(reconcile_counters([self.user.pk]), (1, 0))
+
+
+class AudienceTests(TestCase):
+    def setUp(self):
+        self.sub12 = Category.objects.create(name='Sub-12')
+        self.sub14 = Category.objects.create(name='Sub-14')
+        # ana: una jugadora activa en cada categoría; berta: una lesionada en Sub-14; carla: inactiva como usuaria
+        self.ana, self.berta, self.carla = (self._guardian(name) for name in ('ana', 'berta', 'carla'))
+        self.carla.is_active = False
+        self.carla.save()
+        self._player(self.ana, self.sub12)
+        self._player(self.ana, self.sub14)
+        self._player(self.berta, self.sub14, status='injured')
+        self._player(self.carla, self.sub14)
+
+        fee = FeeDefinition.objects.create(name='Mensualidad', amount=10000, period='mensual')
+        for guardian, status in ((self.ana, 'pendiente'), (self.berta, 'atrasada'), (self.carla, 'atrasada')):
+            Invoice.objects.create(guardian=guardian, fee_definition=fee, amount=10000, due_date=date(2024, 3, 10), status=status)
+
+    def _guardian(self, username):
+        user = User.objects.create_user(username, f'{username}@example.com', 'x')
+        GuardianProfile.objects.create(user=user, phone='0', address='-')
+        return user
+
+    def _player(self, guardian, category, status='active'):
+        player = Player.objects.create(first_name=guardian.username, last_name='Test', birthdate=date(2012, 1, 1),
+                                       category=category, status=status)
+        GuardianPlayer.objects.create(guardian=guardian, player=player, relation='madre')
+
+    def _resolve(self, **data):
+        query = QueryDict(mutable=True)
+        for key, values in data.items():
+            query.setlist(key, values if isinstance(values, list) else [values])
+        return sorted(resolve_audience(build_audience(query)))
+
+    def test_categories_list_each_active_guardian_once(self):
+        category_ids = [str(self.sub12.pk), str(self.sub14.pk)]
+        self.assertEqual(self._resolve(recipient_type='multiple_categories', category=category_ids),
+                         [self.ana.pk, self.berta.pk])
+        self.assertEqual(self._resolve(recipient_type='multiple_categories', category=str(self.sub12.pk)), [self.ana.pk])
+
+    def test_player_status(self):
+        self.assertEqual(self._resolve(recipient_type='player_status', player_status='injured'), [self.berta.pk])
+
+    def test_outstanding_debt(self):
+        self.assertEqual(self._resolve(recipient_type='outstanding_debt'), [self.ana.pk, self.berta.pk])
+        self.assertEqual(self._resolve(recipient_type='outstanding_debt', overdue_only='on'), [self.berta.pk])
+
+    def test_incomplete_definitions_are_rejected(self):
+        with self.assertRaises(InvalidAudience):
+            self._resolve(recipient_type='multiple_categories')
+        with self.assertRaises(InvalidAudience):
+            self._resolve(recipient_type='player_status', player_status='desconocido')
+
+    def test_labels_are_resolved_with_one_category_query(self):
+        bulk_emails = [
+            BulkEmail(title='A', body_html='-', audience={'type': 'multiple_categories', 'category_ids': [self.sub14.pk, self.sub12.pk]}),
+            BulkEmail(title='B', body_html='-', audience={'type': 'outstanding_debt', 'overdue_only': True}),
+        ]
+        with self.assertNumQueries(1):
+            labels = [bulk_email.audience_label for bulk_email in label_audiences(bulk_emails)]
+
+        self.assertEqual(labels, ['Apoderados por Categoría: Sub-12, Sub-14', 'Apoderados con Deuda Pendiente (solo atrasadas)'])
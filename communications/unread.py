@@ -0,0 +1,73 @@
+"""
+Mantenimiento del contador de mensajes no leídos (UnreadCounter).
+
+Los contadores se crean de forma perezosa: la primera lectura calcula el
+valor real desde EmailRecipient y a partir de ahí se actualiza con UPDATEs
+atómicos (F expressions) al enviar y al leer mensajes.
+"""
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import EmailRecipient, UnreadCounter
+
+
+def get_unread_count(user):
+    """Cantidad de mensajes no leídos del usuario (lectura O(1) una vez creado el contador)."""
+    count = UnreadCounter.objects.filter(user=user).values_list('unread_count', flat=True).first()
+    if count is None:
+        count = EmailRecipient.objects.filter(user=user, read_at__isnull=True).count()
+        UnreadCounter.objects.get_or_create(user=user, defaults={'unread_count': count})
+    return count
+
+
+def register_delivery(bulk_email):
+    """Suma 1 al contador de cada destinatario de ``bulk_email`` (un solo UPDATE)."""
+    return UnreadCounter.objects.filter(
+        user_id__in=EmailRecipient.objects.filter(bulk_email=bulk_email, read_at__isnull=True).values('user_id')
+    ).update(unread_count=F('unread_count') + 1, updated_at=timezone.now())
+
+
+def mark_as_read(user, recipients=None):
+    """
+    Marca como leídos los mensajes de ``user`` (todos, o solo los del queryset
+    ``recipients``) y descuenta del contador exactamente los que cambiaron.
+    Devuelve la cantidad de mensajes marcados.
+    """
+    queryset = recipients if recipients is not None else EmailRecipient.objects.all()
+    now = timezone.now()
+    updated = queryset.filter(user=user, read_at__isnull=True).update(read_at=now)
+    if updated:
+        UnreadCounter.objects.filter(user=user).update(
+            unread_count=Greatest(F('unread_count') - updated, 0), updated_at=now
+        )
+    return updated
+
+
+def discard_bulk_email(bulk_email):
+    """Descuenta los no leídos de un mensaje masivo que se va a eliminar."""
+    return UnreadCounter.objects.filter(
+        user_id__in=EmailRecipient.objects.filter(bulk_email=bulk_email, read_at__isnull=True).values('user_id')
+    ).update(unread_count=Greatest(F('unread_count') - 1, 0), updated_at=timezone.now())
+
+
+def reconcile_counters(user_ids=None):
+    """
+    Recalcula los contadores existentes desde EmailRecipient y corrige los
+    que no coinciden. Devuelve (revisados, corregidos).
+    """
+    counters = UnreadCounter.objects.annotate(
+        actual=Count('user__received_messages', filter=Q(user__received_messages__read_at__isnull=True))
+    )
+    if user_ids is not None:
+        counters = counters.filter(user_id__in=user_ids)
+
+    checked = 0
+    drifted = []
+    for counter in counters.iterator(chunk_size=2000):
+        checked += 1
+        if counter.unread_count != counter.actual:
+            counter.unread_count = counter.actual
+            drifted.append(counter)
+    UnreadCounter.objects.bulk_update(drifted, ['unread_count'], batch_size=1000)
+    return checked, len(drifted)
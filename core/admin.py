@@ -1,3 +1,13 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import StoredBlob
+
+
+@admin.register(StoredBlob)
+class StoredBlobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'size', 'ref_count', 'created_at']
+    search_fields = ['digest', 'name']
+    readonly_fields = ['digest', 'name', 'size', 'ref_count', 'created_at']
+
+    def has_add_permission(self, request):
+        return False
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from .signals import connect_image_signals, connect_storage_signals
+        connect_image_signals()
+        connect_storage_signals()
@@ -0,0 +1,29 @@
+"""
+Ejecución de tareas en segundo plano dentro del mismo proceso.
+
+El proyecto no usa una cola de tareas externa; para trabajos puntuales que
+no deben bloquear la petición (asignaciones masivas, envíos de correo) se
+lanza un hilo daemon que cierra su conexión a la base de datos al terminar.
+"""
+import logging
+import threading
+
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+
+def run_in_background(func, *args, name=None, **kwargs):
+    """Ejecuta ``func(*args, **kwargs)`` en un hilo aparte y devuelve el hilo."""
+    def runner():
+        close_old_connections()
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            logger.exception('Error en tarea en segundo plano %s', name or func.__name__)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=runner, name=name or func.__name__, daemon=True)
+    thread.start()
+    return thread
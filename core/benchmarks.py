@@ -0,0 +1,206 @@
+"""
+Benchmark de las vistas principales con volúmenes de datos realistas.
+
+``manage.py benchmark_views`` siembra un volumen parametrizable (jugadoras,
+facturas, transacciones, destinatarios de correos masivos) con
+``core.datagen``, recorre las vistas de ``BENCHMARK_VIEWS`` con el ``Client`` de
+pruebas de Django y registra por vista:
+
+- consultas SQL (y su tiempo) del primer request, con caché fría, y de los siguientes;
+- latencia p50/p95/máx. de ``iterations`` requests en caliente;
+- memoria máxima asignada durante un request (``tracemalloc``).
+
+Todo ocurre dentro de una transacción que se revierte al terminar. El
+resultado es un JSON con claves ordenadas, pensado para guardarse y
+compararse (``diff``) entre commits.
+"""
+import math
+import platform
+import subprocess
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from .datagen import DataGenerator
+from .instrumentation import RequestState
+
+# Volúmenes predefinidos (se pueden sobrescribir por opción)
+PROFILES = {
+    'small': {'players': 100, 'invoices': 10_000, 'transactions': 1_000, 'recipients': 10_000},
+    'medium': {'players': 1_000, 'invoices': 100_000, 'transactions': 10_000, 'recipients': 100_000},
+    'large': {'players': 10_000, 'invoices': 100_000, 'transactions': 100_000, 'recipients': 1_000_000},
+}
+
+
+@dataclass(frozen=True)
+class BenchmarkView:
+    name: str               # nombre de la URL (app:nombre)
+    role: str = 'anonymous'  # 'anonymous', 'admin' o 'guardian'
+    needs_bulk_email: bool = False
+
+    def url(self, dataset):
+        args = [dataset.bulk_email.pk] if self.needs_bulk_email else []
+        return reverse(self.name, args=args)
+
+
+BENCHMARK_VIEWS = [
+    BenchmarkView('pages:landing'),
+    BenchmarkView('admin_panel:dashboard', role='admin'),
+    BenchmarkView('admin_panel:finances_dashboard', role='admin'),
+    BenchmarkView('admin_panel:players', role='admin'),
+    BenchmarkView('admin_panel:communication_status', role='admin', needs_bulk_email=True),
+    BenchmarkView('guardian:dashboard', role='guardian'),
+    BenchmarkView('guardian:payments', role='guardian'),
+    BenchmarkView('guardian:guardian_quotas_upcoming', role='guardian'),
+    BenchmarkView('guardian:guardian_quotas_paid', role='guardian'),
+    BenchmarkView('guardian:messages', role='guardian'),
+]
+
+
+class BenchmarkDataset:
+    """
+    Siembra los volúmenes pedidos con ``core.datagen.DataGenerator``: un
+    apoderado por cada dos jugadoras y los destinatarios repartidos en
+    correos masivos que llegan a todos los apoderados. Las vistas de
+    apoderado se recorren con el primero y el estado de envío con el último
+    correo.
+    """
+
+    def __init__(self, players, invoices, transactions, recipients, seed=1):
+        guardians = max(1, math.ceil(players / 2))
+        self.generator = DataGenerator({
+            'guardians': guardians, 'players': players, 'invoices': invoices, 'transactions': transactions,
+            'bulk_emails': max(1, math.ceil(recipients / guardians)), 'recipients': recipients,
+            'tickets': 0, 'replies': 0,
+        }, seed=seed, prefix='bench')
+
+    @property
+    def counts(self):
+        return self.generator.created
+
+    def seed(self):
+        from communications.models import BulkEmail
+
+        generator = self.generator
+        generator.generate()
+        self.admin = generator.admin
+        self.guardian = User.objects.get(pk=generator.guardian_ids[0])
+        self.bulk_email = BulkEmail.objects.get(pk=generator.bulk_email_ids[-1])
+        return self
+
+    def client_for(self, role):
+        # 'localhost' está en ALLOWED_HOSTS también fuera de DEBUG; los GET van con
+        # secure=True para no recibir la redirección de SECURE_SSL_REDIRECT
+        client = Client(SERVER_NAME='localhost')
+        if role == 'admin':
+            client.force_login(self.admin)
+        elif role == 'guardian':
+            client.force_login(self.guardian)
+        return client
+
+
+def _percentile(sorted_values, fraction):
+    """Percentil por rango más cercano."""
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _timed_get(client, url):
+    """(respuesta, ms, estado con las consultas ejecutadas) de un GET."""
+    state = RequestState()
+    with connection.execute_wrapper(state):
+        start = time.perf_counter()
+        response = client.get(url, secure=True)
+        elapsed = (time.perf_counter() - start) * 1000
+    return response, elapsed, state
+
+
+def benchmark_view(client, url, iterations):
+    """Mide un GET: caché fría, ``iterations`` repeticiones en caliente y memoria máxima."""
+    # Se cuentan las consultas con execute_wrapper: CaptureQueriesContext lee el
+    # log acotado de la conexión, que la siembra con DEBUG=True deja lleno
+    response, cold_ms, cold = _timed_get(client, url)
+
+    timings = []
+    queries = sql_ms = 0
+    for _ in range(iterations):
+        _, elapsed, state = _timed_get(client, url)
+        timings.append(elapsed)
+        queries = max(queries, state.queries)
+        sql_ms += state.sql_ms
+
+    # tracemalloc hace lento el request: se mide aparte de las latencias
+    tracemalloc.start()
+    try:
+        client.get(url, secure=True)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'status': response.status_code,
+        'cold_queries': cold.queries,
+        'cold_ms': round(cold_ms, 2),
+        'queries': queries,
+        'sql_ms': round(sql_ms / iterations, 2),
+        'p50_ms': round(_percentile(timings, 0.5), 2),
+        'p95_ms': round(_percentile(timings, 0.95), 2),
+        'max_ms': round(timings[-1], 2),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(volumes, views=None, iterations=20, seed=1, progress=None):
+    """
+    Siembra ``volumes`` (ver ``PROFILES``), mide cada vista y revierte los
+    datos. ``progress(mensaje)`` recibe avisos de avance.
+    """
+    views = views or BENCHMARK_VIEWS
+    progress = progress or (lambda message: None)
+    results = {}
+    with transaction.atomic():
+        started = time.perf_counter()
+        dataset = BenchmarkDataset(**volumes, seed=seed).seed()
+        seed_seconds = time.perf_counter() - started
+        progress(f'Datos sembrados en {seed_seconds:.1f}s: {dataset.counts}')
+        clients = {}
+        for view in views:
+            client = clients.get(view.role) or clients.setdefault(view.role, dataset.client_for(view.role))
+            results[view.name] = benchmark_view(client, view.url(dataset), iterations)
+            progress(f"{view.name}: p95 {results[view.name]['p95_ms']} ms, {results[view.name]['queries']} consultas")
+        transaction.set_rollback(True)
+
+    return {
+        'meta': {
+            'revision': _git_revision(),
+            'generated_at': timezone.now().isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'iterations': iterations,
+            'seed': seed,
+            'seed_seconds': round(seed_seconds, 1),
+        },
+        'volumes': volumes,
+        'rows': dataset.counts,
+        'views': results,
+    }
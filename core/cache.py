@@ -0,0 +1,143 @@
+"""
+Helpers sobre la caché por defecto (``settings.CACHES``).
+
+- Claves con espacio de nombres: ``make_key('landing', 'context')`` -> ``'landing:context'``.
+- Versionado por espacio de nombres: cada lectura/escritura usa la versión
+  actual del namespace; ``invalidate_namespace`` la incrementa y con eso
+  invalida de golpe todas sus claves (las viejas expiran solas por TTL).
+- Contadores de aciertos/fallos por namespace: se acumulan en memoria del
+  proceso (una lectura no escribe en la caché) y se vuelcan a la misma caché
+  cada ``CACHE_STATS_FLUSH_INTERVAL`` segundos, de modo que se comparten
+  entre workers cuando el backend es 'file' o 'db' (ver ``manage.py cache_stats``).
+"""
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Namespaces conocidos (se registran al importar los módulos que los usan)
+NAMESPACES = {}
+
+
+def register_namespace(namespace, description=''):
+    NAMESPACES[namespace] = description
+    return namespace
+
+
+def make_key(namespace, *parts):
+    return ':'.join([namespace, *(str(part) for part in parts)])
+
+
+def _version_key(namespace):
+    return f'_ns:{namespace}:version'
+
+
+def _counter_key(namespace, kind):
+    return f'_ns:{namespace}:{kind}'
+
+
+def get_namespace_version(namespace):
+    """
+    Versión vigente del namespace. Se inicializa con la hora actual para que,
+    si la clave de versión es desalojada, nunca se reutilice una versión vieja.
+    """
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        version = int(time.time())
+        if not cache.add(_version_key(namespace), version, None):
+            version = cache.get(_version_key(namespace), version)
+    return version
+
+
+def invalidate_namespace(namespace):
+    """Invalida todas las claves del namespace subiendo su versión."""
+    try:
+        return cache.incr(_version_key(namespace))
+    except ValueError:
+        # La clave de versión no existía: se crea directamente con una versión nueva
+        version = int(time.time()) + 1
+        cache.set(_version_key(namespace), version, None)
+        return version
+
+
+# Aciertos/fallos del proceso aún no volcados a la caché compartida
+_pending = Counter()
+_pending_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def flush_stats():
+    """Suma a la caché compartida los contadores acumulados por este proceso."""
+    global _last_flush
+    with _pending_lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    for (namespace, kind), amount in pending.items():
+        key = _counter_key(namespace, kind)
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            if not cache.add(key, amount, None):
+                cache.incr(key, amount)
+
+
+def _count(namespace, kind):
+    with _pending_lock:
+        _pending[namespace, kind] += 1
+        due = time.monotonic() - _last_flush >= settings.CACHE_STATS_FLUSH_INTERVAL
+    if due:
+        flush_stats()
+
+
+def cache_get(namespace, *parts, default=None):
+    value = cache.get(make_key(namespace, *parts), version=get_namespace_version(namespace))
+    _count(namespace, 'misses' if value is None else 'hits')
+    return default if value is None else value
+
+
+def cache_set(namespace, *parts, value, timeout=None):
+    cache.set(make_key(namespace, *parts), value, timeout, version=get_namespace_version(namespace))
+
+
+def cache_delete(namespace, *parts):
+    cache.delete(make_key(namespace, *parts), version=get_namespace_version(namespace))
+
+
+def get_or_build(namespace, *parts, builder, timeout=None):
+    """Devuelve el valor cacheado o lo construye con ``builder()`` y lo guarda."""
+    version = get_namespace_version(namespace)
+    key = make_key(namespace, *parts)
+    value = cache.get(key, version=version)
+    if value is not None:
+        _count(namespace, 'hits')
+        return value
+    _count(namespace, 'misses')
+    value = builder()
+    cache.set(key, value, timeout, version=version)
+    return value
+
+
+def get_stats(namespaces=None):
+    """{namespace: {'version', 'hits', 'misses', 'hit_ratio'}} para los namespaces indicados (o todos los registrados)."""
+    flush_stats()
+    stats = {}
+    for namespace in namespaces or sorted(NAMESPACES):
+        hits = cache.get(_counter_key(namespace, 'hits'), 0)
+        misses = cache.get(_counter_key(namespace, 'misses'), 0)
+        total = hits + misses
+        stats[namespace] = {
+            'version': cache.get(_version_key(namespace)),
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else None,
+        }
+    return stats
+
+
+def reset_stats(namespaces=None):
+    flush_stats()
+    for namespace in namespaces or NAMESPACES:
+        cache.delete_many([_counter_key(namespace, 'hits'), _counter_key(namespace, 'misses')])
@@ -0,0 +1,82 @@
+"""
+Respuestas condicionales (ETag / Last-Modified) para páginas públicas.
+
+El estado de una página se resume en una sola consulta: por cada modelo de
+origen se obtiene ``Max(<fecha>)`` y ``Count`` (el conteo detecta
+eliminaciones, que no mueven el máximo) dentro del mismo SELECT. Si el
+navegador ya tiene esa versión, Django responde 304 sin renderizar.
+
+Solo se aplica a visitantes anónimos sin mensajes pendientes: para usuarios
+autenticados la página incluye el menú de usuario y el token CSRF, y un 304
+dejaría sin mostrar los mensajes de ``django.contrib.messages`` (p. ej. el
+aviso de sesión cerrada), así que en esos casos se renderiza siempre.
+"""
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db.models import Count, Max, Value
+from django.views.decorators.http import condition
+
+from .stats import aggregate_subquery
+
+
+@dataclass(frozen=True)
+class ContentState:
+    last_modified: datetime
+    etag: str
+
+
+def get_content_state(sources):
+    """
+    ``sources`` es una lista de ``(queryset, campo_de_fecha)``. Devuelve el
+    ``ContentState`` de todas ellas calculado en una sola consulta.
+    """
+    (first_qs, first_field), *others = sources
+    annotations = {'max_0': Max(first_field), 'count_0': Count('pk')}
+    for i, (queryset, field) in enumerate(others, start=1):
+        annotations[f'max_{i}'] = aggregate_subquery(queryset, Max(field))
+        annotations[f'count_{i}'] = aggregate_subquery(queryset, Count('pk'))
+
+    # Agrupar por una constante evita el GROUP BY: siempre vuelve una fila
+    row = first_qs.order_by().annotate(_row=Value(1)).values('_row').annotate(**annotations).get()
+
+    timestamps = [row[f'max_{i}'] for i in range(len(sources)) if row[f'max_{i}'] is not None]
+    fingerprint = '|'.join(
+        [settings.RELEASE_VERSION]
+        + [f"{row[f'max_{i}']}/{row[f'count_{i}']}" for i in range(len(sources))]
+    )
+    return ContentState(
+        last_modified=max(timestamps) if timestamps else None,
+        etag=hashlib.md5(fingerprint.encode()).hexdigest(),
+    )
+
+
+def has_pending_messages(request):
+    """Si hay mensajes por mostrar; ``len`` los carga sin marcarlos como leídos."""
+    return bool(len(get_messages(request)))
+
+
+def conditional_page(get_sources):
+    """
+    Decorador de vista: ``get_sources(request)`` devuelve las fuentes de la
+    página (se evalúa por petición, para filtros que dependen de la hora).
+    """
+    def _state(request, *args, **kwargs):
+        if request.user.is_authenticated or has_pending_messages(request):
+            return None
+        if not hasattr(request, '_content_state'):
+            request._content_state = get_content_state(get_sources(request))
+        return request._content_state
+
+    def etag_func(request, *args, **kwargs):
+        state = _state(request)
+        return state.etag if state else None
+
+    def last_modified_func(request, *args, **kwargs):
+        state = _state(request)
+        return state.last_modified if state else None
+
+    return condition(etag_func=etag_func, last_modified_func=last_modified_func)
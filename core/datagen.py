@@ -0,0 +1,365 @@
+"""
+Generador de datos de volumen para pruebas de carga.
+
+``DataGenerator(counts, seed=1).generate()`` crea apoderados, jugadoras,
+facturas con sus pagos, transacciones, correos masivos con destinatarios y
+tickets con respuestas, todo con ``bulk_create`` por lotes:
+
+- La contraseña se hashea una sola vez y se comparte entre los usuarios
+  generados (el hash cuesta decenas de ms; por usuario serían horas).
+- Las filas se generan de forma perezosa y cada lote se inserta y se
+  descarta: en memoria solo quedan los ids que usan los pasos siguientes.
+- Un ``random.Random(seed)`` propio decide nombres, estados y fechas, así que
+  la misma semilla produce los mismos datos.
+
+``bulk_create`` no dispara señales, así que al final se reconstruyen los
+derivados (resumen mensual de transacciones, contadores de no leídos) y se
+invalida la caché de la landing.
+
+Lo usan ``manage.py generate_load_data`` y el benchmark de ``core.benchmarks``.
+"""
+import math
+import random
+import secrets
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+BATCH_SIZE = 5000
+
+DEFAULT_COUNTS = {
+    'guardians': 500,
+    'players': 1_000,
+    'invoices': 12_000,
+    'transactions': 5_000,
+    'bulk_emails': 50,
+    'recipients': 25_000,
+    'tickets': 1_000,
+    'replies': 3_000,
+}
+
+CATEGORY_NAMES = ['U-13', 'U-15', 'U-17', 'U-19', 'Adulto']
+MONTHLY_FEE = 30000
+
+FIRST_NAMES = [
+    'Sofía', 'Valentina', 'Isidora', 'Emilia', 'Antonia', 'Martina', 'Florencia', 'Agustina', 'Josefa', 'Catalina',
+    'Fernanda', 'Javiera', 'Constanza', 'Trinidad', 'Amanda', 'Maite', 'Renata', 'Colomba', 'Ignacia', 'Magdalena',
+]
+GUARDIAN_FIRST_NAMES = [
+    'Juan', 'Ana', 'Pedro', 'Carolina', 'Rodrigo', 'Paula', 'Cristián', 'Claudia', 'Felipe', 'Daniela',
+    'Mauricio', 'Marcela', 'Andrés', 'Lorena', 'Patricio', 'Verónica', 'Gonzalo', 'Macarena', 'Sergio', 'Pamela',
+]
+LAST_NAMES = [
+    'González', 'Muñoz', 'Rojas', 'Díaz', 'Pérez', 'Soto', 'Contreras', 'Silva', 'Martínez', 'Sepúlveda',
+    'Morales', 'Rodríguez', 'López', 'Fuentes', 'Hernández', 'Torres', 'Araya', 'Flores', 'Espinoza', 'Valenzuela',
+    'Castillo', 'Tapia', 'Reyes', 'Gutiérrez', 'Castro', 'Pizarro', 'Álvarez', 'Vásquez', 'Sánchez', 'Fernández',
+]
+TICKET_SUBJECTS = [
+    'Consulta sobre cuota mensual', 'Cambio de categoría', 'Problema con comprobante de pago',
+    'Horario de entrenamiento', 'Actualizar datos de contacto', 'Certificado de participación',
+]
+
+# Estados de facturas anteriores al mes en curso (las del mes en curso quedan pendientes)
+PAST_INVOICE_STATUSES = ['pagada'] * 7 + ['atrasada'] * 2 + ['en revisión']
+TRANSACTION_CATEGORIES = {
+    'ingreso': ['evento', 'donacion', 'entrada', 'cuota'],
+    'gasto': ['arriendo', 'arbitraje', 'proveedor', 'cuerpo_tecnico', 'equipamiento', 'transporte'],
+}
+
+
+def _batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class DataGenerator:
+    """
+    ``counts`` completa ``DEFAULT_COUNTS``. Los usuarios generados se llaman
+    ``<prefix>_guardian_<n>`` (y ``<prefix>_admin``); el prefijo debe estar libre.
+    Sin ``password`` se usa una contraseña aleatoria (queda en ``self.password``).
+    """
+
+    def __init__(self, counts=None, *, seed=1, prefix='load', password=None,
+                 batch_size=BATCH_SIZE, progress=None):
+        self.counts = {**DEFAULT_COUNTS, **(counts or {})}
+        self.random = random.Random(seed)
+        self.prefix = prefix
+        self.password = password or secrets.token_urlsafe(12)
+        self.batch_size = batch_size
+        self.progress = progress or (lambda message: None)
+        self.created = {}
+        self.validate()
+
+    def validate(self):
+        counts = self.counts
+        if any(value < 0 for value in counts.values()):
+            raise ValueError('Las cantidades no pueden ser negativas.')
+        needs = {
+            'players': 'guardians', 'invoices': 'players', 'recipients': 'bulk_emails', 'tickets': 'guardians',
+            'replies': 'tickets',
+        }
+        for model, dependency in needs.items():
+            if counts[model] and not counts[dependency]:
+                raise ValueError(f'Para generar {model} se necesita al menos un(a) de {dependency}.')
+        if counts['recipients'] > counts['bulk_emails'] * counts['guardians']:
+            raise ValueError('Cada apoderado recibe a lo más una vez cada correo: recipients <= bulk_emails * guardians.')
+        if User.objects.filter(username__startswith=f'{self.prefix}_').exists():
+            raise ValueError(f'Ya existen usuarios con el prefijo "{self.prefix}_"; usa otro prefijo.')
+
+    def _insert(self, model, rows, keep=None):
+        """
+        Inserta ``rows`` por lotes. ``keep(lote)`` se llama con cada lote ya
+        insertado (con sus pk) para que el paso guarde lo que necesita.
+        """
+        started = time.perf_counter()
+        total = 0
+        for batch in _batched(rows, self.batch_size):
+            model.objects.bulk_create(batch)
+            total += len(batch)
+            if keep:
+                keep(batch)
+        label = model._meta.label
+        self.created[label] = self.created.get(label, 0) + total
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed else 0
+        self.progress(f'{label}: {total} filas en {elapsed:.1f}s ({rate:,.0f}/s)')
+
+    def generate(self):
+        """Genera todo en orden de dependencias. Devuelve ``{modelo: filas creadas}``."""
+        self.now = timezone.now()
+        self.today = timezone.localdate()
+        self._create_reference_data()
+        self._create_guardians()
+        self._create_players()
+        self._create_invoices()
+        self._create_transactions()
+        self._create_bulk_emails()
+        self._create_tickets()
+        self._rebuild_derived()
+        return self.created
+
+    # --- Pasos ---
+    def _create_reference_data(self):
+        from finance.models import FeeDefinition
+        from players.models import Category
+        from users.models import AdminProfile
+
+        self.admin = User.objects.create_user(f'{self.prefix}_admin', f'{self.prefix}_admin@example.com', self.password,
+                                              first_name='Administración', last_name='Carga')
+        AdminProfile.objects.create(user=self.admin, position='Administrador')
+        self.category_ids = [Category.objects.get_or_create(name=name)[0].pk for name in CATEGORY_NAMES]
+        self.fee_ids = {
+            category_id: FeeDefinition.objects.get_or_create(
+                category_id=category_id, period='mensual', name=f'Cuota Mensual - {name}',
+                defaults={'amount': MONTHLY_FEE},
+            )[0].pk
+            for category_id, name in zip(self.category_ids, CATEGORY_NAMES)
+        }
+
+    def _create_guardians(self):
+        from users.models import GuardianProfile
+
+        rng = self.random
+        password = make_password(self.password)  # un solo hash para todos
+        self.guardian_ids = []
+
+        def users():
+            for i in range(self.counts['guardians']):
+                first, last = rng.choice(GUARDIAN_FIRST_NAMES), rng.choice(LAST_NAMES)
+                yield User(username=f'{self.prefix}_guardian_{i}', email=f'{self.prefix}_guardian_{i}@example.com',
+                           password=password, first_name=first, last_name=last, date_joined=self.now)
+
+        self._insert(User, users(), keep=lambda batch: self.guardian_ids.extend(user.pk for user in batch))
+        self._insert(GuardianProfile, (
+            GuardianProfile(user_id=user_id, phone=f'+569{rng.randint(10_000_000, 99_999_999)}',
+                            address=f'Calle {rng.randint(1, 999)}, Puerto Montt')
+            for user_id in self.guardian_ids
+        ))
+
+    def _create_players(self):
+        from players.models import GuardianPlayer, Player
+
+        rng = self.random
+        statuses = ['active'] * 8 + ['inactive', 'injured']
+        positions = [choice[0] for choice in Player.POSITION_CHOICES]
+        # (id, categoría, apoderado) de cada jugadora; la jugadora i es del apoderado i % apoderados
+        self.players = []
+
+        def players():
+            for i in range(self.counts['players']):
+                category_index = i % len(self.category_ids)
+                birth_year = self.today.year - 12 - 2 * category_index - rng.randint(0, 1)
+                yield Player(first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                             birthdate=date(birth_year, rng.randint(1, 12), rng.randint(1, 28)),
+                             category_id=self.category_ids[category_index], position=rng.choice(positions),
+                             status=rng.choice(statuses))
+
+        def keep(batch):
+            offset = len(self.players)
+            guardians = self.guardian_ids
+            self.players.extend(
+                (player.pk, player.category_id, guardians[(offset + i) % len(guardians)])
+                for i, player in enumerate(batch)
+            )
+
+        self._insert(Player, players(), keep=keep)
+        relations = ['madre', 'padre', 'tutor']
+        self._insert(GuardianPlayer, (
+            GuardianPlayer(guardian_id=guardian_id, player_id=player_id, relation=rng.choice(relations))
+            for player_id, _, guardian_id in self.players
+        ))
+
+    def _create_invoices(self):
+        from finance.models import Invoice, Payment
+
+        rng = self.random
+        target = self.counts['invoices']
+        if not target:
+            return
+        # Una factura mensual por jugadora, del mes en curso hacia atrás
+        months = math.ceil(target / len(self.players))
+
+        def invoices():
+            emitted = 0
+            for months_back in range(months):
+                year, month = divmod(self.today.year * 12 + self.today.month - 1 - months_back, 12)
+                due_date = date(year, month + 1, 5)
+                for player_id, category_id, guardian_id in self.players:
+                    if emitted == target:
+                        return
+                    emitted += 1
+                    yield Invoice(guardian_id=guardian_id, player_id=player_id, fee_definition_id=self.fee_ids[category_id],
+                                  amount=MONTHLY_FEE, due_date=due_date, billing_period=f'{year:04d}-{month + 1:02d}',
+                                  status='pendiente' if months_back == 0 else rng.choice(PAST_INVOICE_STATUSES))
+
+        payments = []
+
+        def keep(batch):
+            payments.extend(
+                Payment(invoice_id=invoice.pk, amount=invoice.amount, method='transferencia',
+                        paid_at=self.now - timedelta(days=(self.today - invoice.due_date).days + rng.randint(0, 4),
+                                                     hours=rng.randint(0, 12)),
+                        status='completado' if invoice.status == 'pagada' else 'pendiente')
+                for invoice in batch if invoice.status in ('pagada', 'en revisión')
+            )
+            if len(payments) >= self.batch_size:
+                self._insert_payments(payments)
+
+        self._insert(Invoice, invoices(), keep=keep)
+        self._insert_payments(payments)
+        self.progress(f"finance.Payment: {self.created.get('finance.Payment', 0)} filas (junto con las facturas)")
+
+    def _insert_payments(self, payments):
+        from finance.models import Payment
+
+        if payments:
+            Payment.objects.bulk_create(payments, batch_size=self.batch_size)
+            self.created['finance.Payment'] = self.created.get('finance.Payment', 0) + len(payments)
+            payments.clear()
+
+    def _create_transactions(self):
+        from finance.models import Transaction
+
+        rng = self.random
+        player_ids = [player_id for player_id, _, _ in self.players]
+
+        def transactions():
+            for i in range(self.counts['transactions']):
+                kind = 'gasto' if rng.random() < 0.4 else 'ingreso'
+                category = rng.choice(TRANSACTION_CATEGORIES[kind])
+                player_id = rng.choice(player_ids) if category == 'cuota' and player_ids else None
+                yield Transaction(type=kind, category=category, description=f'{category.capitalize()} #{i}',
+                                  amount=rng.randint(5, 500) * 1000, date=self.today - timedelta(days=rng.randint(0, 730)),
+                                  player_id=player_id)
+
+        self._insert(Transaction, transactions())
+
+    def _create_bulk_emails(self):
+        from communications.models import BulkEmail, EmailRecipient
+
+        rng = self.random
+        count = self.counts['bulk_emails']
+        self.bulk_email_ids = []
+        sent_at = {}
+
+        def bulk_emails():
+            for i in range(count):
+                yield BulkEmail(title=f'Comunicado {i + 1}', body_html=f'<p>Comunicado número {i + 1} del club.</p>',
+                                created_by=self.admin, is_sent=True,
+                                sent_at=self.now - timedelta(days=(count - i) * 3))
+
+        def keep(batch):
+            for bulk_email in batch:
+                self.bulk_email_ids.append(bulk_email.pk)
+                sent_at[bulk_email.pk] = bulk_email.sent_at
+
+        self._insert(BulkEmail, bulk_emails(), keep=keep)
+
+        target = self.counts['recipients']
+
+        def recipients():
+            # Los correos se llenan de a uno: los primeros llegan a todos los apoderados
+            emitted = 0
+            for bulk_email_id in self.bulk_email_ids:
+                for user_id in self.guardian_ids:
+                    if emitted == target:
+                        return
+                    emitted += 1
+                    read = rng.random() < 0.7
+                    yield EmailRecipient(bulk_email_id=bulk_email_id, user_id=user_id, status='enviado',
+                                         sent_at=sent_at[bulk_email_id],
+                                         read_at=sent_at[bulk_email_id] + timedelta(hours=rng.randint(1, 72)) if read else None)
+
+        self._insert(EmailRecipient, recipients())
+
+    def _create_tickets(self):
+        from tickets.models import Ticket, TicketReply
+
+        rng = self.random
+        tickets_count = self.counts['tickets']
+        target = self.counts['replies']
+        statuses = ['abierto', 'respondido', 'respondido', 'cerrado', 'cerrado', 'cerrado']
+        replies = []
+        state = {'emitted': 0, 'tickets': 0}
+
+        def tickets():
+            for _ in range(tickets_count):
+                yield Ticket(subject=rng.choice(TICKET_SUBJECTS), guardian_id=rng.choice(self.guardian_ids),
+                             status=rng.choice(statuses))
+
+        def keep(batch):
+            # Respuestas repartidas en partes iguales, alternando apoderado y administración
+            for ticket in batch:
+                state['tickets'] += 1
+                quota = target * state['tickets'] // tickets_count - state['emitted']
+                for n in range(quota):
+                    user_id = ticket.guardian_id if n % 2 == 0 else self.admin.pk
+                    replies.append(TicketReply(ticket_id=ticket.pk, user_id=user_id, message=f'Mensaje {n + 1} del ticket.'))
+                state['emitted'] += quota
+            TicketReply.objects.bulk_create(replies, batch_size=self.batch_size)
+            self.created['tickets.TicketReply'] = self.created.get('tickets.TicketReply', 0) + len(replies)
+            replies.clear()
+
+        self._insert(Ticket, tickets(), keep=keep)
+        self.progress(f"tickets.TicketReply: {self.created.get('tickets.TicketReply', 0)} filas (junto con los tickets)")
+
+    def _rebuild_derived(self):
+        from communications.unread import reconcile_counters
+        from finance.models import TransactionMonthlyRollup
+        from pages.landing_cache import invalidate_landing_cache
+
+        started = time.perf_counter()
+        TransactionMonthlyRollup.rebuild()
+        # Solo corrige los contadores existentes; los de los usuarios nuevos se crean al primer uso
+        reconcile_counters()
+        invalidate_landing_cache()
+        self.progress(f'Derivados reconstruidos en {time.perf_counter() - started:.1f}s')
@@ -0,0 +1,73 @@
+"""
+Catálogo de las consultas más frecuentes del sitio y del índice que
+deberían usar. Lo usa el comando explain_hot_queries para detectar
+regresiones cuando alguien cambia una vista o un índice.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from communications.models import EmailRecipient
+from finance.models import Invoice, Payment, Transaction
+from schedules.models import Match
+from users.models import Registration
+
+
+def get_hot_queries():
+    """Devuelve una lista de tuplas (descripción, índice esperado, queryset)."""
+    today = timezone.localdate()
+    now = timezone.now()
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return [
+        (
+            'Facturas atrasadas por barrer',
+            'finance_inv_status_due_idx',
+            Invoice.objects.filter(status='pendiente', due_date__lt=today),
+        ),
+        (
+            'Facturas por estado (dashboard)',
+            'finance_inv_status_due_idx',
+            Invoice.objects.filter(status='atrasada'),
+        ),
+        (
+            'Cuotas próximas de una jugadora',
+            'finance_inv_player_status_idx',
+            Invoice.objects.filter(player_id=1, status='pendiente', due_date__lte=today + timedelta(days=30)),
+        ),
+        (
+            'Pagos completados del mes',
+            'finance_pay_status_created_idx',
+            Payment.objects.filter(status='completado', created_at__gte=month_start),
+        ),
+        (
+            'Cola de pagos pendientes',
+            'finance_pay_pending_idx',
+            Payment.objects.filter(status='pendiente').order_by('paid_at'),
+        ),
+        (
+            'Mensajes no leídos de un apoderado',
+            'comm_recipient_unread_idx',
+            EmailRecipient.objects.filter(user_id=1, read_at__isnull=True),
+        ),
+        (
+            'Próximos partidos de una categoría',
+            'sched_match_cat_starts_idx',
+            Match.objects.filter(category_id=1, starts_at__gte=now).order_by('starts_at'),
+        ),
+        (
+            'Transacciones por tipo y mes',
+            'finance_tx_type_date_idx',
+            Transaction.objects.filter(type='ingreso', date__gte=today.replace(day=1)),
+        ),
+        (
+            'Inscripciones pendientes recientes',
+            'users_reg_status_created_idx',
+            Registration.objects.filter(status='pending').order_by('-created_at'),
+        ),
+    ]
+
+
+def plan_uses_index(plan):
+    """Indica si un plan de EXPLAIN (PostgreSQL o SQLite) utiliza algún índice."""
+    plan_upper = plan.upper()
+    return any(marker in plan_upper for marker in ('INDEX SCAN', 'INDEX ONLY SCAN', 'USING INDEX', 'USING COVERING INDEX'))
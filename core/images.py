@@ -0,0 +1,150 @@
+"""
+Derivados redimensionados de las imágenes subidas (fotos, logos, noticias).
+
+Por cada imagen original se generan variantes de ancho fijo
+(``IMAGE_VARIANT_WIDTHS``) en WebP y en un formato de respaldo (JPEG, o PNG
+si la imagen tiene transparencia). Se guardan junto al original:
+
+    players/foto.jpg  ->  players/_variants/foto_320w.webp
+                          players/_variants/foto_320w.jpg
+
+Las variantes se generan en segundo plano al guardar el modelo (ver
+``core.signals``) o con ``manage.py generate_image_variants``, y se borran al
+reemplazar la imagen o borrar la fila. Mientras no existan, los helpers de
+plantilla devuelven la imagen original; las plantillas sirven el WebP con
+``<picture><source type="image/webp">`` y el formato de respaldo en ``<img>``.
+"""
+import hashlib
+import io
+import logging
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .cache import cache_delete, cache_get, cache_set, register_namespace
+
+logger = logging.getLogger(__name__)
+
+IMAGES_NAMESPACE = register_namespace('images', 'Variantes disponibles por imagen')
+
+# (modelo, campo) cuyas imágenes tienen variantes
+IMAGE_FIELDS = [
+    ('players.Player', 'photo'),
+    ('sponsors.Sponsor', 'logo'),
+    ('pages.LandingNews', 'image'),
+]
+
+VARIANTS_DIR = '_variants'
+FALLBACK_FORMATS = {'jpg': 'JPEG', 'png': 'PNG'}
+
+
+def _cache_part(name):
+    # Los nombres de archivo pueden traer espacios o tildes: no sirven como clave de caché
+    return hashlib.md5(name.encode()).hexdigest()
+
+
+def _widths():
+    return sorted(settings.IMAGE_VARIANT_WIDTHS)
+
+
+def variant_name(name, width, ext):
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, VARIANTS_DIR, f'{stem}_{width}w.{ext}')
+
+
+def _has_alpha(img):
+    return img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+
+
+def _encode(img, fmt):
+    buffer = io.BytesIO()
+    if fmt == 'WEBP':
+        img.save(buffer, 'WEBP', quality=settings.IMAGE_VARIANT_QUALITY, method=4)
+    elif fmt == 'JPEG':
+        img.save(buffer, 'JPEG', quality=settings.IMAGE_VARIANT_QUALITY, optimize=True, progressive=True)
+    else:
+        img.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def generate_variants(name, force=False, storage=None):
+    """
+    Genera las variantes que falten de la imagen ``name`` (ruta dentro del
+    storage). Devuelve la lista de archivos escritos.
+    """
+    storage = storage or default_storage
+    widths = _widths()
+    written = []
+    try:
+        with storage.open(name, 'rb') as fh:
+            img = Image.open(fh)
+            # En JPEG, draft() decodifica directamente a una escala reducida:
+            # una foto de 12 MP no se descomprime completa para sacar 1024 px.
+            img.draft('RGB', (widths[-1], widths[-1]))
+            img = ImageOps.exif_transpose(img)
+            img.load()
+    except (FileNotFoundError, UnidentifiedImageError, OSError) as e:
+        logger.warning('No se pudieron generar variantes de %s: %s', name, e)
+        return written
+
+    alpha = _has_alpha(img)
+    img = img.convert('RGBA' if alpha else 'RGB')
+    fallback_ext = 'png' if alpha else 'jpg'
+
+    for width in widths:
+        if width >= img.width:
+            break
+        height = round(img.height * width / img.width)
+        resized = img.resize((width, height), Image.Resampling.LANCZOS)
+        for ext, fmt in (('webp', 'WEBP'), (fallback_ext, FALLBACK_FORMATS[fallback_ext])):
+            target = variant_name(name, width, ext)
+            if storage.exists(target):
+                if not force:
+                    continue
+                storage.delete(target)
+            storage.save(target, ContentFile(_encode(resized, fmt)))
+            written.append(target)
+
+    cache_delete(IMAGES_NAMESPACE, _cache_part(name))
+    return written
+
+
+def delete_variants(name, storage=None):
+    storage = storage or default_storage
+    for width in _widths():
+        for ext in ('webp', *FALLBACK_FORMATS):
+            target = variant_name(name, width, ext)
+            if storage.exists(target):
+                storage.delete(target)
+    cache_delete(IMAGES_NAMESPACE, _cache_part(name))
+
+
+def get_variants(name):
+    """
+    Variantes existentes de ``name``: ``{'webp': [(ancho, url)], 'fallback': [(ancho, url)]}``.
+    El resultado se cachea para no consultar el storage en cada render.
+    """
+    variants = cache_get(IMAGES_NAMESPACE, _cache_part(name))
+    if variants is not None:
+        return variants
+
+    variants = {'webp': [], 'fallback': []}
+    for width in _widths():
+        webp = variant_name(name, width, 'webp')
+        if not default_storage.exists(webp):
+            # Si falta un ancho, no existen los mayores (se generan de menor a mayor)
+            break
+        variants['webp'].append((width, default_storage.url(webp)))
+        for ext in FALLBACK_FORMATS:
+            fallback = variant_name(name, width, ext)
+            if default_storage.exists(fallback):
+                variants['fallback'].append((width, default_storage.url(fallback)))
+                break
+    # Con caché local por proceso, otros workers se enteran de las variantes nuevas al expirar la entrada
+    timeout = 3600 if variants['webp'] else 60
+    cache_set(IMAGES_NAMESPACE, _cache_part(name), value=variants, timeout=timeout)
+    return variants
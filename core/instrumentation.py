@@ -0,0 +1,304 @@
+"""
+Métricas por vista: consultas SQL, tiempo de SQL, de plantillas y total.
+
+``core.middleware.RequestMetricsMiddleware`` mide cada request y lo agrega
+aquí, en histogramas en memoria agrupados por nombre de URL
+(``admin_panel:finances_dashboard``, ``guardian:dashboard``...):
+
+- Las consultas se capturan con ``connection.execute_wrapper`` (funciona con
+  ``DEBUG=False``; no usa ``connection.queries``).
+- El tiempo de plantillas se mide envolviendo el render del backend de
+  Django (solo la plantilla de nivel superior, sin contar dos veces los
+  ``include``). Incluye las consultas perezosas que se disparan al renderizar.
+- Las consultas idénticas repetidas en un mismo request (misma SQL con
+  distintos parámetros) se registran como posibles N+1 de la vista.
+
+Cada proceso guarda sus histogramas y cada ``REQUEST_METRICS_FLUSH_INTERVAL``
+segundos publica una copia en la caché (namespace ``metrics``). El endpoint
+del panel y ``manage.py request_metrics`` combinan las copias de todos los
+procesos; con la caché 'locmem' solo se ve el proceso actual, así que en
+producción conviene ``CACHE_BACKEND=file`` o ``db``.
+"""
+import contextvars
+import os
+import re
+import socket
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from django.conf import settings
+from django.utils import timezone
+
+from .cache import cache_get, cache_set, get_namespace_version, invalidate_namespace, register_namespace
+
+METRICS_NAMESPACE = register_namespace('metrics', 'Métricas de requests por proceso')
+SNAPSHOT_TIMEOUT = 24 * 3600
+
+# Límites superiores de cada cubeta (el último tramo es "más que eso")
+MS_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+MAX_DUPLICATE_SIGNATURES = 20
+
+_PROCESS_ID = f'{socket.gethostname()}:{os.getpid()}'
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+_IN_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """Firma de una consulta: las listas ``IN (%s, %s, ...)`` se colapsan y se compactan los espacios."""
+    return _WHITESPACE.sub(' ', _IN_LIST.sub('(...)', sql)).strip()
+
+
+class Histogram:
+    def __init__(self, bounds, counts=None, total=0.0, maximum=0.0):
+        self.bounds = tuple(bounds)
+        self.counts = list(counts) if counts else [0] * (len(self.bounds) + 1)
+        self.total = total
+        self.maximum = maximum
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def add(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+
+    def percentile(self, fraction):
+        """Estimación: límite superior de la cubeta donde cae el percentil (o el máximo observado)."""
+        count = self.count
+        if not count:
+            return 0
+        target = fraction * count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return min(self.bounds[i], self.maximum) if i < len(self.bounds) else self.maximum
+        return self.maximum
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def to_dict(self):
+        return {'bounds': list(self.bounds), 'counts': self.counts, 'total': self.total, 'max': self.maximum}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['bounds'], data['counts'], data['total'], data['max'])
+
+
+class ViewStats:
+    def __init__(self):
+        self.wall_ms = Histogram(MS_BUCKETS)
+        self.sql_ms = Histogram(MS_BUCKETS)
+        self.template_ms = Histogram(MS_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.duplicates = {}   # {firma SQL: {'requests': n, 'max_repeats': m}}
+
+    @property
+    def requests(self):
+        return self.wall_ms.count
+
+    def add_duplicate(self, signature, repeats, requests=1):
+        entry = self.duplicates.get(signature)
+        if entry is None:
+            if len(self.duplicates) >= MAX_DUPLICATE_SIGNATURES:
+                return
+            entry = self.duplicates[signature] = {'requests': 0, 'max_repeats': 0}
+        entry['requests'] += requests
+        entry['max_repeats'] = max(entry['max_repeats'], repeats)
+
+    def merge(self, other):
+        for name in ('wall_ms', 'sql_ms', 'template_ms', 'queries'):
+            getattr(self, name).merge(getattr(other, name))
+        for signature, entry in other.duplicates.items():
+            self.add_duplicate(signature, entry['max_repeats'], entry['requests'])
+
+    def to_dict(self):
+        return {
+            'wall_ms': self.wall_ms.to_dict(), 'sql_ms': self.sql_ms.to_dict(),
+            'template_ms': self.template_ms.to_dict(), 'queries': self.queries.to_dict(),
+            'duplicates': self.duplicates,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        for name in ('wall_ms', 'sql_ms', 'template_ms', 'queries'):
+            setattr(stats, name, Histogram.from_dict(data[name]))
+        stats.duplicates = {signature: dict(entry) for signature, entry in data['duplicates'].items()}
+        return stats
+
+    def summary(self):
+        return {
+            'requests': self.requests,
+            'wall_ms': {'p50': round(self.wall_ms.percentile(0.5), 1), 'p95': round(self.wall_ms.percentile(0.95), 1),
+                        'mean': round(self.wall_ms.mean, 1), 'max': round(self.wall_ms.maximum, 1)},
+            'queries': {'p50': self.queries.percentile(0.5), 'p95': self.queries.percentile(0.95),
+                        'mean': round(self.queries.mean, 1), 'max': self.queries.maximum},
+            'sql_ms': {'mean': round(self.sql_ms.mean, 1), 'p95': round(self.sql_ms.percentile(0.95), 1)},
+            'template_ms': {'mean': round(self.template_ms.mean, 1),
+                            'p95': round(self.template_ms.percentile(0.95), 1)},
+            'duplicates': sorted(
+                ({'sql': signature, **entry} for signature, entry in self.duplicates.items()),
+                key=lambda entry: (-entry['requests'], -entry['max_repeats']),
+            ),
+        }
+
+
+class RequestState:
+    """Medición de un request en curso (vive en un ContextVar)."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.template_depth = 0
+        self.signatures = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        # Firma de connection.execute_wrapper
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - start) * 1000
+            self.queries += 1
+            signature = normalize_sql(sql)
+            self.signatures[signature] = self.signatures.get(signature, 0) + 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.views = {}
+        self._last_flush = time.monotonic()
+        self._version = None
+
+    def record(self, view_name, state, wall_ms):
+        threshold = settings.REQUEST_METRICS_DUPLICATE_THRESHOLD
+        with self._lock:
+            stats = self.views.get(view_name)
+            if stats is None:
+                stats = self.views[view_name] = ViewStats()
+            stats.wall_ms.add(wall_ms)
+            stats.sql_ms.add(state.sql_ms)
+            stats.template_ms.add(state.template_ms)
+            stats.queries.add(state.queries)
+            for signature, repeats in state.signatures.items():
+                if repeats >= threshold:
+                    stats.add_duplicate(signature, repeats)
+            due = time.monotonic() - self._last_flush >= settings.REQUEST_METRICS_FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in self.views.items()}
+
+    def flush(self):
+        """Publica los histogramas de este proceso en la caché compartida."""
+        self._last_flush = time.monotonic()
+        version = get_namespace_version(METRICS_NAMESPACE)
+        if self._version is not None and version != self._version:
+            # Alguien ejecutó reset_metrics(): se descarta lo acumulado antes de publicar
+            self.reset()
+        self._version = version
+        cache_set(METRICS_NAMESPACE, 'process', _PROCESS_ID, value=self.snapshot(), timeout=SNAPSHOT_TIMEOUT)
+        processes = cache_get(METRICS_NAMESPACE, 'processes', default=[])
+        if _PROCESS_ID not in processes:
+            # Registro aproximado: dos procesos que se anotan a la vez pueden pisarse
+            # hasta su siguiente publicación, que vuelve a anotarlos
+            cache_set(METRICS_NAMESPACE, 'processes', value=[*processes, _PROCESS_ID], timeout=SNAPSHOT_TIMEOUT)
+
+    def reset(self):
+        with self._lock:
+            self.views = {}
+
+
+registry = MetricsRegistry()
+
+
+def current_request_state():
+    return _current.get()
+
+
+def start_request():
+    state = RequestState()
+    return state, _current.set(state)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+def install_template_timer():
+    """Envuelve el render de plantillas del backend Django para medir su tiempo (una sola vez)."""
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, '_request_metrics', False):
+        return
+    original = Template.render
+
+    @wraps(original)
+    def render(self, context=None, request=None):
+        state = _current.get()
+        if state is None:
+            return original(self, context, request)
+        state.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            state.template_depth -= 1
+            if state.template_depth == 0:
+                state.template_ms += (time.perf_counter() - start) * 1000
+
+    render._request_metrics = True
+    Template.render = render
+
+
+def collect_metrics():
+    """Combina las métricas publicadas por todos los procesos (más las de este, al día)."""
+    registry.flush()
+    merged = {}
+    processes = cache_get(METRICS_NAMESPACE, 'processes', default=[])
+    found = 0
+    for process_id in processes:
+        snapshot = cache_get(METRICS_NAMESPACE, 'process', process_id)
+        if snapshot is None:
+            continue
+        found += 1
+        for view_name, data in snapshot.items():
+            stats = ViewStats.from_dict(data)
+            if view_name in merged:
+                merged[view_name].merge(stats)
+            else:
+                merged[view_name] = stats
+    return {
+        'generated_at': timezone.now().isoformat(),
+        'processes': found,
+        'duplicate_threshold': settings.REQUEST_METRICS_DUPLICATE_THRESHOLD,
+        'views': {
+            name: stats.summary()
+            for name, stats in sorted(merged.items(), key=lambda item: -item[1].wall_ms.total)
+        },
+    }
+
+
+def reset_metrics():
+    """Borra las métricas de este proceso y las publicadas por todos."""
+    registry.reset()
+    invalidate_namespace(METRICS_NAMESPACE)
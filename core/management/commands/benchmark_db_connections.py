@@ -0,0 +1,89 @@
+import copy
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.db.utils import load_backend
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[max(0, round(fraction * len(sorted_values)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el costo de obtener una conexión a la base de datos por request: abriendo una '
+        'conexión nueva cada vez versus la configuración actual (persistente, pgbouncer o pool).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Requests simulados por escenario.')
+        parser.add_argument('--database', default='default', help='Alias de la base de datos.')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests debe ser al menos 1.')
+        alias = options['database']
+        if alias not in connections:
+            raise CommandError(f'No existe la base de datos "{alias}".')
+        connection = connections[alias]
+        settings_dict = connection.settings_dict
+        pool = settings_dict.get('OPTIONS', {}).get('pool')
+        self.stdout.write(
+            f"{connection.vendor} en {settings_dict.get('HOST') or '(local)'}: "
+            f"CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']}, "
+            f"CONN_HEALTH_CHECKS={settings_dict['CONN_HEALTH_CHECKS']}, "
+            f"pool={'sí' if pool else 'no'}"
+        )
+
+        direct = self._direct_connection(connection)
+        scenarios = [
+            ('Conexión nueva por request', direct, lambda: direct.close()),
+            # Lo mismo que hace Django al terminar cada request (signal request_finished)
+            ('Configuración actual', connection, lambda: close_old_connections()),
+        ]
+        rows = []
+        for label, conn, between_requests in scenarios:
+            self._request(conn)  # calentamiento (DNS, TLS, pool)
+            timings = []
+            for _ in range(options['requests']):
+                between_requests()
+                close_old_connections()  # signal request_started
+                timings.append(self._request(conn))
+            timings.sort()
+            rows.append((label, timings))
+        direct.close()
+        connection.close()
+
+        self.stdout.write(f"\n{'Escenario':<30} {'p50 ms':>8} {'p95 ms':>8} {'media ms':>9}")
+        for label, timings in rows:
+            self.stdout.write(
+                f'{label:<30} {_percentile(timings, 0.5):>8.2f} {_percentile(timings, 0.95):>8.2f} '
+                f'{statistics.mean(timings):>9.2f}'
+            )
+        baseline, current = (statistics.mean(timings) for _, timings in rows)
+        self.stdout.write(self.style.SUCCESS(
+            f'\nAhorro por request con la configuración actual: {baseline - current:.2f} ms '
+            f'({baseline / current if current else 0:.1f}x)'
+        ))
+
+    def _direct_connection(self, connection):
+        """
+        Conexión aparte con los mismos datos pero sin pool ni persistencia: con
+        DB_POOL='psycopg', ``close()`` solo devolvería la conexión al pool y la
+        línea base mediría préstamos del pool en vez de conexiones nuevas.
+        """
+        settings_dict = copy.deepcopy(connection.settings_dict)
+        settings_dict['OPTIONS'].pop('pool', None)
+        settings_dict['CONN_MAX_AGE'] = 0
+        backend = load_backend(settings_dict['ENGINE'])
+        return backend.DatabaseWrapper(settings_dict, alias=f'{connection.alias}_directa')
+
+    def _request(self, connection):
+        """Tiempo (ms) de obtener la conexión y ejecutar la primera consulta de un request."""
+        start = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        return (time.perf_counter() - start) * 1000
@@ -0,0 +1,64 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import BENCHMARK_VIEWS, PROFILES, run_benchmarks
+from core.management.safety import add_production_argument, ensure_safe_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Siembra un volumen de datos (en una transacción que se revierte), recorre las vistas '
+        'principales y guarda consultas, latencia p50/p95 y memoria máxima por vista en un JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('views', nargs='*', help='Nombres de URL a medir (por defecto, todas).')
+        parser.add_argument('--profile', choices=sorted(PROFILES), default='small', help='Volumen predefinido.')
+        for volume in ('players', 'invoices', 'transactions', 'recipients'):
+            parser.add_argument(f'--{volume}', type=int, help=f'Sobrescribe la cantidad de {volume} del perfil.')
+        parser.add_argument('--iterations', type=int, default=20, help='Requests en caliente por vista.')
+        parser.add_argument('--seed', type=int, default=1, help='Semilla de los datos generados.')
+        parser.add_argument('--output', help='Archivo JSON de resultados (por defecto, benchmark-<perfil>.json).')
+        add_production_argument(parser)
+
+    def handle(self, *args, **options):
+        ensure_safe_database(options)
+        views = [view for view in BENCHMARK_VIEWS if not options['views'] or view.name in options['views']]
+        if not views:
+            raise CommandError('Ninguna vista coincide con los nombres indicados.')
+        if options['iterations'] < 1:
+            raise CommandError('--iterations debe ser al menos 1.')
+
+        volumes = dict(PROFILES[options['profile']])
+        for volume in volumes:
+            if options[volume] is not None:
+                volumes[volume] = options[volume]
+        if volumes['players'] < 1:
+            raise CommandError('Se necesita al menos una jugadora.')
+
+        self.stdout.write(f"Perfil {options['profile']}: {volumes}")
+        report = run_benchmarks(
+            volumes, views=views, iterations=options['iterations'], seed=options['seed'],
+            progress=self.stdout.write,
+        )
+        report['meta']['profile'] = options['profile']
+
+        failed = [name for name, result in report['views'].items() if result['status'] != 200]
+        output = options['output'] or f"benchmark-{options['profile']}.json"
+        with open(output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, ensure_ascii=False, indent=2, sort_keys=True)
+            handle.write('\n')
+
+        self.stdout.write(
+            f"\n{'Vista':<40} {'Consultas':>9} {'Fría ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'Memoria KiB':>12}"
+        )
+        for name, result in report['views'].items():
+            line = (
+                f"{name:<40} {result['queries']:>9} {result['cold_ms']:>8} {result['p50_ms']:>8} "
+                f"{result['p95_ms']:>8} {result['peak_kib']:>12}"
+            )
+            self.stdout.write(self.style.ERROR(f"{line} (HTTP {result['status']})") if name in failed else line)
+        self.stdout.write(self.style.SUCCESS(f'\nResultados guardados en {output}'))
+        if failed:
+            raise CommandError(f'{len(failed)} vistas no respondieron 200.')
@@ -0,0 +1,36 @@
+from django.core.cache import cache, caches
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cache import NAMESPACES, get_stats, invalidate_namespace, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Muestra aciertos/fallos de la caché por namespace y permite invalidarla.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('namespaces', nargs='*', help='Namespaces a mostrar (por defecto, todos los registrados).')
+        parser.add_argument('--invalidate', action='store_true', help='Sube la versión de los namespaces indicados (invalida sus claves).')
+        parser.add_argument('--reset', action='store_true', help='Reinicia los contadores de aciertos/fallos.')
+        parser.add_argument('--clear', action='store_true', help='Vacía la caché completa.')
+
+    def handle(self, *args, **options):
+        namespaces = options['namespaces'] or sorted(NAMESPACES)
+        unknown = set(namespaces) - set(NAMESPACES)
+        if unknown:
+            raise CommandError(f"Namespaces desconocidos: {', '.join(sorted(unknown))}. Registrados: {', '.join(sorted(NAMESPACES))}")
+
+        if options['clear']:
+            cache.clear()
+            self.stdout.write(self.style.WARNING('Caché vaciada.'))
+        if options['invalidate']:
+            for namespace in namespaces:
+                self.stdout.write(f'{namespace}: nueva versión {invalidate_namespace(namespace)}')
+        if options['reset']:
+            reset_stats(namespaces)
+            self.stdout.write('Contadores reiniciados.')
+
+        self.stdout.write(f"Backend: {caches['default'].__class__.__name__}")
+        self.stdout.write(f"{'Namespace':<20}{'Versión':>12}{'Aciertos':>10}{'Fallos':>10}{'Ratio':>8}")
+        for namespace, row in get_stats(namespaces).items():
+            ratio = f"{row['hit_ratio']:.0%}" if row['hit_ratio'] is not None else '-'
+            self.stdout.write(f"{namespace:<20}{row['version'] or '-':>12}{row['hits']:>10}{row['misses']:>10}{ratio:>8}")
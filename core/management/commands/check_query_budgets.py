@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.management.safety import add_production_argument, ensure_safe_database
+from core.query_budget import SCALES, VIEW_BUDGETS, check_budgets
+
+
+class Command(BaseCommand):
+    help = (
+        'Verifica que las vistas de listado ejecuten el mismo número de consultas con '
+        '10 y con 1.000 filas (sin N+1). Los datos se siembran en una transacción que se revierte.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('views', nargs='*', help='Nombres de URL a verificar (por defecto, todas).')
+        parser.add_argument('--scales', type=int, nargs='+', default=list(SCALES), help='Cantidades de filas a probar.')
+        add_production_argument(parser)
+
+    def handle(self, *args, **options):
+        ensure_safe_database(options)
+        budgets = [b for b in VIEW_BUDGETS if not options['views'] or b.name in options['views']]
+        if not budgets:
+            raise CommandError('Ninguna vista coincide con los nombres indicados.')
+
+        failures = 0
+        for budget, by_scale, error in check_budgets(budgets, scales=sorted(options['scales'])):
+            detail = ', '.join(f'{rows} filas: {count}' for rows, count in by_scale.items())
+            line = f'{budget.name:<40} {detail} (máx. {budget.max_queries})'
+            if error:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f'{line} -> {error}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+        if failures:
+            raise CommandError(f'{failures} vistas fuera de presupuesto.')
@@ -0,0 +1,94 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from core.models import StoredBlob
+from core.storage import BLOBS_DIR, DEDUP_FILE_FIELDS, blob_name_for, hash_file
+
+
+class Command(BaseCommand):
+    help = (
+        'Migra los comprobantes, documentos y adjuntos existentes al almacenamiento '
+        'deduplicado: calcula el hash de cada archivo en paralelo y deja una sola copia por contenido.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Hilos para calcular los hashes (trabajo de E/S).')
+        parser.add_argument('--dry-run', action='store_true', help='Solo informa cuánto espacio se ahorraría.')
+
+    def handle(self, *args, **options):
+        storage = FileSystemStorage()  # Acceso directo a los archivos, sin contar referencias
+
+        # 1. Archivos que aún no están en blobs/: {nombre: [(modelo, campo, max_length), ...]}
+        references = defaultdict(list)
+        for model_label, field_name in DEDUP_FILE_FIELDS:
+            model = apps.get_model(model_label)
+            max_length = model._meta.get_field(field_name).max_length
+            names = (
+                model.objects.exclude(**{f'{field_name}__startswith': f'{BLOBS_DIR}/'})
+                .exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                .values_list(field_name, flat=True)
+            )
+            for name in names:
+                references[name].append((model, field_name, max_length))
+
+        if not references:
+            self.stdout.write('No hay archivos por migrar.')
+            return
+
+        # 2. Hash en paralelo (la lectura de disco domina y hashlib libera el GIL)
+        def digest_of(name):
+            try:
+                with storage.open(name, 'rb') as fh:
+                    return name, hash_file(fh)
+            except FileNotFoundError:
+                return name, None
+
+        self.stdout.write(f"Calculando hash de {len(references)} archivos con {options['workers']} hilos...")
+        by_digest = defaultdict(list)
+        missing = []
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for name, result in pool.map(digest_of, references):
+                if result is None:
+                    missing.append(name)
+                else:
+                    by_digest[result].append(name)
+
+        for name in missing:
+            self.stdout.write(self.style.WARNING(f'  Falta en disco, se omite: {name}'))
+
+        total_bytes = sum(size * len(names) for (_, size), names in by_digest.items())
+        unique_bytes = sum(size for (_, size) in by_digest)
+        self.stdout.write(
+            f'{sum(len(n) for n in by_digest.values())} archivos, {len(by_digest)} contenidos únicos; '
+            f'ahorro estimado: {(total_bytes - unique_bytes) / (1024 * 1024):.1f} MB.'
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Modo prueba: no se modificó nada.'))
+            return
+
+        # 3. Una copia por contenido, filas apuntando al blob y originales eliminados
+        for (digest, size), names in by_digest.items():
+            ref_total = sum(len(references[name]) for name in names)
+            shortest = min(max_length for name in names for _, _, max_length in references[name])
+            with transaction.atomic():
+                blob, _ = StoredBlob.objects.select_for_update().get_or_create(
+                    digest=digest,
+                    defaults={'name': blob_name_for(digest, names[0], shortest), 'size': size},
+                )
+                if not storage.exists(blob.name):
+                    with storage.open(names[0], 'rb') as fh:
+                        storage._save(blob.name, fh)
+                for name in names:
+                    for model, field_name, _ in references[name]:
+                        model.objects.filter(**{field_name: name}).update(**{field_name: blob.name})
+                StoredBlob.objects.filter(pk=digest).update(ref_count=F('ref_count') + ref_total)
+            for name in names:
+                storage.delete(name)
+
+        self.stdout.write(self.style.SUCCESS(f'Listo: {len(by_digest)} blobs en {BLOBS_DIR}/.'))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.hot_queries import get_hot_queries, plan_uses_index
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta EXPLAIN sobre las consultas más frecuentes e indica si usan un índice.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-seqscan',
+            action='store_true',
+            help='(PostgreSQL) Desactiva enable_seqscan para comprobar que el índice es utilizable aunque la tabla sea pequeña.',
+        )
+        parser.add_argument(
+            '--verbose-plan',
+            action='store_true',
+            help='Muestra el plan completo de cada consulta.',
+        )
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Termina con error si alguna consulta no usa índice (útil en CI).',
+        )
+
+    def handle(self, *args, **options):
+        is_postgres = connection.vendor == 'postgresql'
+        if options['no_seqscan'] and not is_postgres:
+            self.stdout.write(self.style.WARNING('--no-seqscan solo aplica a PostgreSQL; se ignora.'))
+
+        hot_queries = get_hot_queries()
+        without_index = []
+        with transaction.atomic():
+            if options['no_seqscan'] and is_postgres:
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for description, expected_index, queryset in hot_queries:
+                plan = queryset.explain()
+                uses_index = plan_uses_index(plan)
+                uses_expected = expected_index in plan
+                if uses_expected:
+                    status = self.style.SUCCESS('OK   ')
+                elif uses_index:
+                    status = self.style.WARNING('OTRO ')
+                else:
+                    status = self.style.ERROR('SEQ  ')
+                    without_index.append(description)
+                self.stdout.write(f'{status} {description} (esperado: {expected_index})')
+                if options['verbose_plan'] or not uses_index:
+                    for line in plan.splitlines():
+                        self.stdout.write(f'        {line}')
+
+        total = len(hot_queries)
+        self.stdout.write(f'\n{total - len(without_index)}/{total} consultas usan índice.')
+        if without_index and options['strict']:
+            raise CommandError('Consultas sin índice: ' + ', '.join(without_index))
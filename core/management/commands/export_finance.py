@@ -0,0 +1,59 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finance.exports import EXPORT_FORMATS, EXPORTS, InvalidExportFilter, export_filename, stream_export, validate_params
+
+
+class Command(BaseCommand):
+    help = (
+        'Exporta transacciones, facturas o pagos a CSV/XLSX en streaming, '
+        'con los mismos filtros de la pantalla de finanzas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(EXPORTS), help='Datos a exportar.')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--output', help='Archivo de salida (por defecto, nombre con la fecha de hoy; "-" para stdout).')
+        parser.add_argument('--type', help='Tipo de transacción (ingreso/gasto).')
+        parser.add_argument('--category', help='Categoría de la transacción, o id de la categoría de jugadoras en facturas.')
+        parser.add_argument('--status', help='Estado de la factura o del pago.')
+        parser.add_argument('--method', help='Método de pago.')
+        parser.add_argument('--date-from', help='Desde (AAAA-MM-DD).')
+        parser.add_argument('--date-to', help='Hasta (AAAA-MM-DD).')
+        parser.add_argument('--search', help='Texto a buscar.')
+
+    def handle(self, *args, **options):
+        spec = EXPORTS[options['dataset']]
+        fmt = options['format']
+        params = {
+            key: options[key]
+            for key in ('type', 'category', 'status', 'method', 'date_from', 'date_to', 'search')
+            if options[key]
+        }
+        try:
+            validate_params(spec, params)
+        except InvalidExportFilter as exc:
+            raise CommandError(str(exc))
+        output = options['output'] or export_filename(spec, fmt)
+
+        if output == '-':
+            if fmt != 'csv':
+                raise CommandError('El formato XLSX no se puede escribir en la salida estándar; usa --output.')
+            for chunk in stream_export(spec, params, fmt):
+                sys.stdout.write(chunk)
+            return
+
+        rows = 0
+        if fmt == 'csv':
+            with open(output, 'w', encoding='utf-8', newline='') as fh:
+                for chunk in stream_export(spec, params, fmt):
+                    fh.write(chunk)
+                    rows += 1
+            rows -= 1  # encabezado
+        else:
+            with open(output, 'wb') as fh:
+                for chunk in stream_export(spec, params, fmt):
+                    fh.write(chunk)
+        detail = f'{rows} filas, ' if fmt == 'csv' else ''
+        self.stdout.write(self.style.SUCCESS(f'Exportación lista ({detail}{output}).'))
@@ -0,0 +1,55 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.images import IMAGE_FIELDS
+
+
+def _init_worker():
+    # Cada proceso del pool necesita su propia configuración de Django
+    import django
+    django.setup()
+
+
+def _process(name, force):
+    from core.images import generate_variants
+    return name, len(generate_variants(name, force=force))
+
+
+class Command(BaseCommand):
+    help = 'Genera las variantes redimensionadas (WebP/JPEG) de las imágenes ya subidas, en paralelo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Procesos en paralelo.')
+        parser.add_argument('--force', action='store_true', help='Regenera también las variantes existentes.')
+        parser.add_argument('--model', choices=[label for label, _ in IMAGE_FIELDS], help='Solo las imágenes de este modelo.')
+
+    def handle(self, *args, **options):
+        names = set()
+        for model_label, field_name in IMAGE_FIELDS:
+            if options['model'] and options['model'] != model_label:
+                continue
+            model = apps.get_model(model_label)
+            names.update(
+                model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                .values_list(field_name, flat=True)
+            )
+
+        if not names:
+            self.stdout.write('No hay imágenes para procesar.')
+            return
+        if options['workers'] < 1:
+            raise CommandError('--workers debe ser al menos 1.')
+
+        self.stdout.write(f"Procesando {len(names)} imágenes con {options['workers']} procesos...")
+        total = 0
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+            futures = [pool.submit(_process, name, options['force']) for name in sorted(names)]
+            for future in as_completed(futures):
+                name, written = future.result()
+                total += written
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'  {name}: {written} variantes')
+        self.stdout.write(self.style.SUCCESS(f'Listo: {total} variantes generadas.'))
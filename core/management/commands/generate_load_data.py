@@ -0,0 +1,50 @@
+import secrets
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.datagen import BATCH_SIZE, DEFAULT_COUNTS, DataGenerator
+from core.management.safety import add_production_argument, ensure_safe_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera datos de volumen para pruebas de carga (apoderados, jugadoras, facturas, pagos, '
+        'transacciones, correos masivos y tickets) con inserciones por lotes y semilla fija.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_COUNTS.items():
+            parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=int, default=default,
+                                help=f'Cantidad de {name} (por defecto {default}).')
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='Multiplica las cantidades (p. ej. 100 para millones de filas). El número '
+                                 'de correos masivos no se escala: sus destinatarios crecen con los apoderados.')
+        parser.add_argument('--seed', type=int, default=1, help='Semilla: la misma semilla genera los mismos datos.')
+        parser.add_argument('--prefix', default='load', help='Prefijo de los usuarios generados (debe estar libre).')
+        parser.add_argument('--password', help='Contraseña de todos los usuarios generados (por defecto, una aleatoria).')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Filas por INSERT.')
+        add_production_argument(parser)
+
+    def handle(self, *args, **options):
+        ensure_safe_database(options)
+        if options['scale'] <= 0 or options['batch_size'] < 1:
+            raise CommandError('--scale y --batch-size deben ser positivos.')
+        counts = {
+            name: options[name] if name == 'bulk_emails' else round(options[name] * options['scale'])
+            for name in DEFAULT_COUNTS
+        }
+        password = options['password'] or secrets.token_urlsafe(12)
+        self.stdout.write(f"Generando (semilla {options['seed']}): {counts}")
+        try:
+            generator = DataGenerator(
+                counts, seed=options['seed'], prefix=options['prefix'], password=password,
+                batch_size=options['batch_size'], progress=self.stdout.write,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        created = generator.generate()
+        self.stdout.write(self.style.SUCCESS(
+            f'Listo: {sum(created.values())} filas. Administrador: {options["prefix"]}_admin, '
+            f'apoderados: {options["prefix"]}_guardian_<n> (contraseña "{password}").'
+        ))
@@ -1,103 +1,69 @@
-from django.core.management.base import BaseCommand
+import time
+
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
-from django.db import IntegrityError
-# --- INICIO DE CORRECCIÓN ---
-# Importamos los modelos desde sus apps correctas
-from finance.models import FeeDefinition, Invoice
-from players.models import Player, GuardianPlayer
-# --- FIN DE CORRECCIÓN ---
+
+from finance.billing import DEFAULT_BATCH_SIZE, generate_monthly_invoices
+
 
 class Command(BaseCommand):
     help = 'Genera las facturas (Invoices) mensuales para todas las jugadoras activas.'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--month', type=int, help='Mes a facturar (1-12). Por defecto, el mes actual.')
+        parser.add_argument('--year', type=int, help='Año a facturar. Por defecto, el año actual.')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Calcula las facturas que se crearían sin escribir en la base de datos.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Tamaño de lote para bulk_create (por defecto {DEFAULT_BATCH_SIZE}).',
+        )
+
     def handle(self, *args, **options):
-        # 1. Definir el mes y año actual
-        today = timezone.now().date()
-        current_month = today.month
-        current_year = today.year
-        
-        # Opcional: Definir una fecha de vencimiento estándar (ej. el día 10 del mes)
-        try:
-            due_date = today.replace(day=10)
-        except ValueError:
-            # Si hoy es día > 28 y el mes es febrero, etc.
-            # Simplemente tomamos el último día del mes actual.
-            next_month = today.replace(day=28) + timezone.timedelta(days=4)
-            due_date = next_month - timezone.timedelta(days=next_month.day)
+        # 1. Definir el período a facturar (mes actual o el indicado para backfill)
+        today = timezone.localdate()
+        current_month = options['month'] or today.month
+        current_year = options['year'] or today.year
+        if not 1 <= current_month <= 12:
+            raise CommandError('--month debe estar entre 1 y 12.')
 
-        self.stdout.write(self.style.NOTICE(f"Iniciando generación de cuotas para {current_month}/{current_year}..."))
+        dry_run = options['dry_run']
+        prefix = '[DRY-RUN] ' if dry_run else ''
+        self.stdout.write(self.style.NOTICE(f"{prefix}Iniciando generación de cuotas para {current_month}/{current_year}..."))
 
-        # 2. Obtener todas las definiciones de cuotas que son 'mensual'
-        monthly_fees = FeeDefinition.objects.filter(period='mensual')
-        
-        if not monthly_fees.exists():
+        # 2. Generar todas las facturas del período en pocas consultas
+        started = time.perf_counter()
+        result = generate_monthly_invoices(
+            year=current_year,
+            month=current_month,
+            dry_run=dry_run,
+            batch_size=options['batch_size'],
+        )
+        elapsed = time.perf_counter() - started
+
+        if not result.fees:
             self.stdout.write(self.style.WARNING("No hay definiciones de cuotas 'mensuales' configuradas. Saliendo."))
             return
 
-        invoices_created_total = 0
-        players_skipped_total = 0
-
-        # 3. Iterar sobre cada tipo de cuota mensual (ej. "Mensualidad U15", "Mensualidad U17")
-        for fee_def in monthly_fees:
+        # 3. Reporte por cuota
+        for fee_result in result.fees:
+            fee_def = fee_result.fee_definition
             self.stdout.write(self.style.NOTICE(f"Procesando cuota: '{fee_def.name}'..."))
-            
-            # 4. Encontrar a todas las jugadoras que deben pagar esta cuota
-            players_to_bill = Player.objects.filter(status='active')
-            
-            # Si la cuota es específica de una categoría (ej. "Mensualidad U15")
-            if fee_def.category:
-                players_to_bill = players_to_bill.filter(category=fee_def.category)
-            
-            if not players_to_bill.exists():
-                self.stdout.write(f"  - No hay jugadoras activas en la categoría '{fee_def.category.name if fee_def.category else 'N/A'}' para esta cuota.")
-                continue
-
-            invoices_created_fee = 0
-            players_skipped_fee = 0
-
-            # 5. Iterar sobre las jugadoras y crear la factura si no existe
-            for player in players_to_bill:
-                
-                # 6. (CLAVE) Verificar si ya existe una factura para este jugador, esta cuota Y este mes/año
-                invoice_exists = Invoice.objects.filter(
-                    player=player,
-                    fee_definition=fee_def,
-                    created_at__year=current_year, # Factura creada este año
-                    created_at__month=current_month # Factura creada este mes
-                ).exists()
-                
-                if not invoice_exists:
-                    # 7. Encontrar al apoderado principal
-                    guardian_link = GuardianPlayer.objects.filter(player=player).first()
-                    
-                    if guardian_link:
-                        try:
-                            Invoice.objects.create(
-                                guardian=guardian_link.guardian,
-                                player=player,
-                                fee_definition=fee_def,
-                                amount=fee_def.amount,
-                                due_date=due_date,
-                                status='pendiente'
-                            )
-                            invoices_created_fee += 1
-                        except IntegrityError:
-                            players_skipped_fee += 1
-                    else:
-                        self.stdout.write(self.style.WARNING(f"  - OMITIDO (Jugadora sin apoderado): {player.get_full_name()}"))
-                        players_skipped_fee += 1
-                else:
-                    players_skipped_fee += 1
-            
-            self.stdout.write(self.style.SUCCESS(f"  - Facturas creadas para '{fee_def.name}': {invoices_created_fee}"))
-            self.stdout.write(f"  - Jugadoras omitidas (ya facturadas): {players_skipped_fee}")
-            
-            invoices_created_total += invoices_created_fee
-            players_skipped_total += players_skipped_fee
+            for player in fee_result.without_guardian:
+                self.stdout.write(self.style.WARNING(f"  - OMITIDO (Jugadora sin apoderado): {player.get_full_name()}"))
+            self.stdout.write(self.style.SUCCESS(f"  - Facturas {'a crear' if dry_run else 'creadas'} para '{fee_def.name}': {fee_result.created}"))
+            self.stdout.write(f"  - Jugadoras omitidas (ya facturadas): {fee_result.already_billed}")
 
         # --- Reporte Final ---
         self.stdout.write(self.style.SUCCESS("\n======================================="))
-        self.stdout.write(self.style.SUCCESS("PROCESO DE FACTURACIÓN MENSUAL COMPLETADO"))
-        self.stdout.write(f"  Total de facturas nuevas creadas: {invoices_created_total}")
-        self.stdout.write(f"  Total de jugadoras omitidas: {players_skipped_total}")
-        self.stdout.write(self.style.SUCCESS("======================================="))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(f"{prefix}PROCESO DE FACTURACIÓN MENSUAL COMPLETADO"))
+        self.stdout.write(f"  Vencimiento: {result.due_date.strftime('%d/%m/%Y')}")
+        self.stdout.write(f"  Total de facturas nuevas {'a crear' if dry_run else 'creadas'}: {result.created}")
+        self.stdout.write(f"  Total de jugadoras omitidas: {result.skipped}")
+        self.stdout.write(f"  Tiempo total: {elapsed:.2f}s")
+        self.stdout.write(self.style.SUCCESS("======================================="))
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from players.imports import IMPORT_COLUMNS, ImportFileError, apply_import, plan_import
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa jugadoras y apoderados desde un CSV. Valida el archivo completo '
+        'y solo guarda si no hay errores (todo en una transacción).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='Archivo CSV (UTF-8, separado por coma o punto y coma).')
+        parser.add_argument('--dry-run', action='store_true', help='Solo valida y muestra el resumen.')
+        parser.add_argument('--columns', action='store_true', help='Muestra las columnas reconocidas y termina.')
+
+    def handle(self, *args, **options):
+        if options['columns'] or not options['path']:
+            for column, description in IMPORT_COLUMNS.items():
+                self.stdout.write(f'  {column:<22} {description}')
+            return
+
+        try:
+            with open(options['path'], 'rb') as fh:
+                plan = plan_import(fh, max_rows=settings.PLAYER_IMPORT_MAX_ROWS)
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+
+        if not plan.is_valid:
+            for error in plan.errors:
+                for message in error.messages:
+                    self.stdout.write(self.style.ERROR(f'  Línea {error.line}: {message}'))
+            raise CommandError(f'{len(plan.errors)} filas con errores; no se importó nada.')
+
+        self.stdout.write(
+            f'{len(plan.rows)} filas válidas: {plan.players_to_create} jugadoras nuevas, '
+            f'{plan.players_to_update} a actualizar, {plan.guardians_to_create} apoderados nuevos.'
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Modo prueba: no se guardó nada.'))
+            return
+
+        result = apply_import(plan)
+        self.stdout.write(self.style.SUCCESS(
+            f'Importación lista: {result.players_created} creadas, {result.players_updated} actualizadas, '
+            f'{result.guardians_created} apoderados nuevos, {result.links_created} vínculos.'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from finance.overdue import mark_overdue_invoices
+
+
+class Command(BaseCommand):
+    help = "Marca como 'atrasada' todas las facturas pendientes cuya fecha de vencimiento ya pasó."
+
+    def handle(self, *args, **options):
+        run = mark_overdue_invoices(triggered_by='command')
+        self.stdout.write(self.style.SUCCESS(
+            f"Facturas marcadas como atrasadas: {run.updated_count} (vencidas antes del "
+            f"{run.cutoff_date.strftime('%d/%m/%Y')}, {run.duration_ms} ms)."
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from finance.models import Transaction, TransactionMonthlyRollup
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye desde cero el resumen mensual de transacciones (TransactionMonthlyRollup).'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("Reconstruyendo resumen mensual de transacciones..."))
+        started = timezone.now()
+
+        buckets = TransactionMonthlyRollup.rebuild()
+
+        elapsed = (timezone.now() - started).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f"Resumen reconstruido: {buckets} buckets a partir de {Transaction.objects.count()} transacciones ({elapsed:.2f}s)."
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from communications.unread import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores de mensajes no leídos y corrige los que estén desfasados.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help='Solo este usuario (id). Se puede repetir.')
+
+    def handle(self, *args, **options):
+        checked, fixed = reconcile_counters(options['user_ids'])
+        style = self.style.WARNING if fixed else self.style.SUCCESS
+        self.stdout.write(style(f"Contadores revisados: {checked}. Corregidos: {fixed}."))
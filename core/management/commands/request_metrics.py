@@ -0,0 +1,73 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.instrumentation import collect_metrics, reset_metrics
+
+
+class Command(BaseCommand):
+    help = (
+        'Muestra las métricas por vista (requests, latencia p50/p95, consultas SQL, tiempo '
+        'de SQL y plantillas) y las consultas repetidas (posibles N+1) de todos los procesos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('views', nargs='*', help='Nombres de URL a mostrar (por defecto, todas).')
+        parser.add_argument('--json', action='store_true', help='Salida en JSON.')
+        parser.add_argument('--sort', choices=['total', 'p95', 'queries', 'requests'], default='total',
+                            help='Orden de la tabla (por defecto, tiempo total acumulado).')
+        parser.add_argument('--reset', action='store_true', help='Borra las métricas acumuladas.')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            reset_metrics()
+            self.stdout.write(self.style.SUCCESS('Métricas reiniciadas.'))
+            return
+
+        metrics = collect_metrics()
+        views = metrics['views']
+        if options['views']:
+            views = {name: data for name, data in views.items() if name in options['views']}
+
+        if options['json']:
+            self.stdout.write(json.dumps({**metrics, 'views': views}, ensure_ascii=False, indent=2))
+            return
+
+        if not views:
+            self.stdout.write('Sin métricas todavía (¿caché compartida "file" o "db"?).')
+            return
+
+        sort_keys = {
+            'total': None,  # collect_metrics ya viene ordenado por tiempo total
+            'p95': lambda item: -item[1]['wall_ms']['p95'],
+            'queries': lambda item: -item[1]['queries']['mean'],
+            'requests': lambda item: -item[1]['requests'],
+        }
+        items = list(views.items())
+        if sort_keys[options['sort']]:
+            items.sort(key=sort_keys[options['sort']])
+
+        self.stdout.write(f"{metrics['processes']} procesos, generado {metrics['generated_at']}")
+        self.stdout.write(
+            f"{'Vista':<45} {'Req':>6} {'p50 ms':>8} {'p95 ms':>8} {'máx ms':>8} "
+            f"{'SQL/req':>8} {'SQL ms':>8} {'Plant. ms':>9}"
+        )
+        for name, data in items:
+            wall, queries = data['wall_ms'], data['queries']
+            self.stdout.write(
+                f"{name:<45} {data['requests']:>6} {wall['p50']:>8} {wall['p95']:>8} {wall['max']:>8} "
+                f"{queries['mean']:>8} {data['sql_ms']['mean']:>8} {data['template_ms']['mean']:>9}"
+            )
+
+        flagged = [(name, data['duplicates']) for name, data in items if data['duplicates']]
+        if flagged:
+            self.stdout.write('')
+            self.stdout.write(self.style.WARNING(
+                f"Consultas repetidas en un mismo request (>= {metrics['duplicate_threshold']} veces):"
+            ))
+            for name, duplicates in flagged:
+                self.stdout.write(f'  {name}')
+                for entry in duplicates:
+                    self.stdout.write(
+                        f"    {entry['requests']} requests, hasta {entry['max_repeats']}x: {entry['sql'][:160]}"
+                    )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from communications.delivery import deliver_bulk_email, deliver_pending_bulk_emails
+
+
+class Command(BaseCommand):
+    help = 'Envía por correo los mensajes masivos con destinatarios pendientes (reutilizando una conexión SMTP).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--message', type=int, help='Solo el mensaje masivo con este id.')
+        parser.add_argument('--batch-size', type=int, help='Correos por lote (por defecto BULK_EMAIL_BATCH_SIZE).')
+
+    def handle(self, *args, **options):
+        if options['message']:
+            results = {options['message']: deliver_bulk_email(options['message'], batch_size=options['batch_size'])}
+        else:
+            results = deliver_pending_bulk_emails(batch_size=options['batch_size'])
+
+        if not results:
+            self.stdout.write('No hay mensajes pendientes de envío.')
+            return
+        for bulk_id, (sent, failed) in results.items():
+            style = self.style.WARNING if failed else self.style.SUCCESS
+            self.stdout.write(style(f'Mensaje #{bulk_id}: {sent} enviados, {failed} fallidos.'))
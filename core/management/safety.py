@@ -0,0 +1,44 @@
+"""
+Protección de los comandos que siembran datos masivos (``generate_load_data``,
+``benchmark_views``, ``check_query_budgets``): solo corren con ``DEBUG`` y
+una base local (SQLite o PostgreSQL en este equipo), salvo que se pase
+``--i-know-this-is-production``.
+"""
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRODUCTION_FLAG = '--i-know-this-is-production'
+LOCAL_DATABASE_HOSTS = {'', 'localhost', '127.0.0.1', '::1'}
+
+
+def add_production_argument(parser):
+    parser.add_argument(
+        PRODUCTION_FLAG, action='store_true', dest='allow_production',
+        help='Permite correr con DEBUG=False o contra una base de datos remota.',
+    )
+
+
+def is_local_database(using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        return True
+    host = connection.settings_dict.get('HOST') or ''
+    # HOST que empieza con '/' = socket Unix local de PostgreSQL
+    return host in LOCAL_DATABASE_HOSTS or host.startswith('/')
+
+
+def ensure_safe_database(options, using=DEFAULT_DB_ALIAS):
+    """Lanza ``CommandError`` si el entorno parece producción y no se pasó ``--i-know-this-is-production``."""
+    if options.get('allow_production'):
+        return
+    problems = []
+    if not settings.DEBUG:
+        problems.append('DEBUG está desactivado')
+    if not is_local_database(using):
+        problems.append(f"la base de datos está en {connections[using].settings_dict.get('HOST')}")
+    if problems:
+        raise CommandError(
+            f"Este comando inserta datos masivos y {' y '.join(problems)}. "
+            f'Si de verdad es lo que quieres, repite con {PRODUCTION_FLAG}.'
+        )
@@ -0,0 +1,37 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .instrumentation import finish_request, install_template_timer, registry, start_request
+
+
+class RequestMetricsMiddleware:
+    """
+    Mide cada request (consultas, tiempo de SQL, de plantillas y total) y lo
+    agrega por nombre de URL en ``core.instrumentation``. Va antes de los
+    middlewares de sesión y autenticación para incluir sus consultas.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install_template_timer()
+
+    def __call__(self, request):
+        state, token = start_request()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(state))
+                response = self.get_response(request)
+        finally:
+            wall_ms = (time.perf_counter() - start) * 1000
+            finish_request(token)
+        match = getattr(request, 'resolver_match', None)
+        registry.record(match.view_name if match else '<sin ruta>', state, wall_ms)
+        return response
@@ -0,0 +1,28 @@
+# Generated by Django 5.0 on 2026-10-17 13:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='SHA-256')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Ruta en el almacenamiento')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Tamaño (bytes)')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Referencias')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Archivo Deduplicado',
+                'verbose_name_plural': 'Archivos Deduplicados',
+            },
+        ),
+    ]
@@ -1,3 +1,21 @@
 from django.db import models
 
-# Create your models here.
+
+class StoredBlob(models.Model):
+    """
+    Archivo único del almacenamiento deduplicado (ver core.storage). Varias
+    filas (comprobantes, documentos, adjuntos) pueden apuntar al mismo blob;
+    ``ref_count`` indica cuántas, y el archivo se borra al llegar a cero.
+    """
+    digest = models.CharField(max_length=64, primary_key=True, verbose_name='SHA-256')
+    name = models.CharField(max_length=255, unique=True, verbose_name='Ruta en el almacenamiento')
+    size = models.PositiveBigIntegerField(verbose_name='Tamaño (bytes)')
+    ref_count = models.PositiveIntegerField(default=0, verbose_name='Referencias')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Archivo Deduplicado'
+        verbose_name_plural = 'Archivos Deduplicados'
+
+    def __str__(self):
+        return f'{self.name} ({self.ref_count} refs)'
@@ -0,0 +1,178 @@
+"""
+Paginación por cursor (keyset) para los listados grandes del panel.
+
+``Paginator`` de Django hace un ``COUNT(*)`` y salta filas con ``OFFSET``:
+la página 500 obliga a la base de datos a leer y descartar todo lo anterior.
+Aquí cada página se pide "a partir de" los valores de orden de la última
+fila vista. La comparación de tuplas se expande a OR (sirve también con
+órdenes mixtos ASC/DESC) y se le antepone una cota redundante sobre la
+primera columna, que es la que permite al planificador recorrer el índice
+por rango en vez de evaluar el OR fila por fila:
+
+    WHERE date <= :fecha AND (date < :fecha OR (date = :fecha AND id < :id))
+    ORDER BY date DESC, id DESC LIMIT 26
+
+Con un índice sobre las columnas de orden, cualquier página cuesta lo mismo
+que la primera. A cambio no hay total ni números de página: solo
+"Anterior"/"Siguiente".
+
+El cursor que viaja en la URL va firmado (``django.core.signing``): es opaco
+para el usuario y un valor alterado se trata como la primera página. El
+orden debe terminar en una columna única (normalmente ``id``) para que no
+haya empates entre páginas, y sus columnas no pueden ser nulas.
+"""
+import json
+from datetime import date, datetime, time
+from functools import reduce
+from operator import or_
+
+from django.core import signing
+from django.db.models import Q
+from django.utils.http import urlencode
+
+CURSOR_PARAM = 'cursor'
+_SALT = 'core.pagination'
+
+
+class _CursorSerializer:
+    """JSON compacto que conserva los microsegundos (DjangoJSONEncoder los trunca)."""
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(',', ':'), default=_encode_value).encode('latin-1')
+
+    def loads(self, data):
+        return json.loads(data.decode('latin-1'))
+
+
+def _encode_value(value):
+    # Fechas en ISO (con microsegundos y zona horaria); Decimal, UUID, etc. como texto
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+class CursorPage:
+    """Una página de resultados con los enlaces a la anterior y la siguiente."""
+
+    def __init__(self, object_list, *, has_next, has_previous, next_cursor, previous_cursor, params=None):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self._params = params
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def _query_with(self, cursor):
+        params = self._params.copy() if self._params is not None else {}
+        params.pop('page', None)  # enlaces antiguos con número de página
+        params[CURSOR_PARAM] = cursor
+        return params.urlencode() if hasattr(params, 'urlencode') else urlencode(params)
+
+    @property
+    def next_query(self):
+        """Querystring (con los filtros actuales) de la página siguiente."""
+        return self._query_with(self.next_cursor) if self.has_next else ''
+
+    @property
+    def previous_query(self):
+        return self._query_with(self.previous_cursor) if self.has_previous else ''
+
+
+class CursorPaginator:
+    """
+    ``CursorPaginator(queryset, ordering=('-date', '-id'), per_page=25).get_page(cursor)``
+
+    ``ordering`` reemplaza el orden del queryset; la última columna debe ser única.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.fields = [column.lstrip('-') for column in self.ordering]
+        self.descending = [column.startswith('-') for column in self.ordering]
+        self.per_page = per_page
+
+    # --- Cursores ---
+    def _encode(self, obj, direction):
+        values = [getattr(obj, field) for field in self.fields]
+        return signing.dumps(
+            {'d': direction, 'v': values}, salt=_SALT, serializer=_CursorSerializer, compress=True,
+        )
+
+    def _decode(self, cursor):
+        if not cursor:
+            return None
+        try:
+            data = signing.loads(cursor, salt=_SALT, serializer=_CursorSerializer)
+        except signing.BadSignature:
+            return None
+        if not isinstance(data, dict) or data.get('d') not in ('n', 'p') or len(data.get('v') or []) != len(self.fields):
+            return None
+        return data['d'], data['v']
+
+    # --- Consulta ---
+    def _after(self, values, backwards):
+        """Filas estrictamente después de ``values`` en el orden (o antes, si ``backwards``)."""
+        conditions = []
+        for i, (field, descending) in enumerate(zip(self.fields, self.descending)):
+            lookup = 'lt' if descending != backwards else 'gt'
+            equal = {self.fields[j]: values[j] for j in range(i)}
+            conditions.append(Q(**equal, **{f'{field}__{lookup}': values[i]}))
+        # Cota redundante sobre la primera columna: acota el rango del índice
+        leading = 'lte' if self.descending[0] != backwards else 'gte'
+        return Q(**{f'{self.fields[0]}__{leading}': values[0]}) & reduce(or_, conditions)
+
+    def _reversed_ordering(self):
+        return [field if descending else f'-{field}' for field, descending in zip(self.fields, self.descending)]
+
+    def get_page(self, cursor=None, params=None):
+        """
+        Devuelve la página que sigue (o precede) al cursor; sin cursor, la
+        primera. ``params`` (normalmente ``request.GET``) se usa para armar los
+        enlaces conservando los filtros.
+        """
+        decoded = self._decode(cursor)
+        direction, values = decoded if decoded else ('n', None)
+        backwards = direction == 'p'
+
+        qs = self.queryset.order_by(*(self._reversed_ordering() if backwards else self.ordering))
+        if values is not None:
+            qs = qs.filter(self._after(values, backwards))
+        rows = list(qs[:self.per_page + 1])  # una fila extra indica si hay más
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if backwards:
+            rows.reverse()
+            has_previous, has_next = has_more, True
+        else:
+            has_previous, has_next = values is not None, has_more
+
+        return CursorPage(
+            rows,
+            has_next=has_next and bool(rows),
+            has_previous=has_previous and bool(rows),
+            next_cursor=self._encode(rows[-1], 'n') if rows else None,
+            previous_cursor=self._encode(rows[0], 'p') if rows else None,
+            params=params,
+        )
+
+
+def paginate_keyset(request, queryset, ordering, per_page):
+    """Atajo para vistas: lee el cursor de ``request.GET`` y conserva el resto de los filtros."""
+    return CursorPaginator(queryset, ordering, per_page).get_page(request.GET.get(CURSOR_PARAM), params=request.GET)
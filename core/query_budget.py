@@ -0,0 +1,208 @@
+"""
+Presupuesto de consultas SQL por vista de listado.
+
+Cada vista de ``VIEW_BUDGETS`` debe ejecutar la misma cantidad de consultas
+con 10 filas que con 1.000: si una plantilla empieza a acceder a una
+relación sin ``select_related``/``prefetch_related`` (N+1), el número crece
+con las filas y la verificación falla.
+
+Se usa de dos formas:
+
+* En tests, con ``QueryBudgetTestMixin`` (``assertNumQueries`` por escala)::
+
+      class ListViewsTests(QueryBudgetTestMixin, TestCase):
+          def test_list_views_have_fixed_query_count(self):
+              self.assertQueryBudgets()
+
+* Sin tests, con ``manage.py check_query_budgets``, que siembra los datos
+  dentro de una transacción y la revierte al terminar.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+SCALES = (10, 1000)
+
+
+@dataclass(frozen=True)
+class ViewBudget:
+    name: str               # nombre de la URL (app:nombre)
+    max_queries: int        # tope de consultas por request, independiente de las filas
+    role: str = 'admin'     # 'admin' o 'guardian'
+    query: str = ''
+    needs_bulk_email: bool = False
+
+    def url(self, fixture):
+        args = [fixture.bulk_email.pk] if self.needs_bulk_email else []
+        url = reverse(self.name, args=args)
+        return f'{url}?{self.query}' if self.query else url
+
+
+VIEW_BUDGETS = [
+    ViewBudget('admin_panel:manage_pending_payments', max_queries=6),
+    ViewBudget('admin_panel:communication_status', max_queries=7, needs_bulk_email=True),
+    ViewBudget('admin_panel:admin_tickets_list', max_queries=6, query='status=todos'),
+    ViewBudget('admin_panel:finances_dashboard', max_queries=12),
+    ViewBudget('admin_panel:players', max_queries=8),
+    ViewBudget('guardian:payments', max_queries=12, role='guardian'),
+]
+
+
+class BudgetFixture:
+    """
+    Datos mínimos para las vistas de ``VIEW_BUDGETS``. ``grow(n)`` completa
+    hasta ``n`` filas de cada listado (pagos pendientes, destinatarios,
+    tickets, transacciones, jugadoras) con inserciones por lotes.
+    """
+
+    def __init__(self):
+        from communications.models import BulkEmail
+        from finance.models import FeeDefinition
+        from players.models import Category
+        from users.models import AdminProfile, GuardianProfile
+
+        self.admin = User.objects.create_user('budget_admin', 'budget_admin@example.com', 'x')
+        AdminProfile.objects.create(user=self.admin, position='Presupuesto de consultas')
+        self.guardian = User.objects.create_user('budget_guardian', 'budget_guardian@example.com', 'x')
+        GuardianProfile.objects.create(user=self.guardian, phone='0', address='-')
+        self.category, _ = Category.objects.get_or_create(name='Budget')
+        self.fee = FeeDefinition.objects.create(name='Budget', amount=1000, period='mensual', category=self.category)
+        self.bulk_email = BulkEmail.objects.create(title='Budget', body_html='-', created_by=self.admin)
+        self.rows = 0
+
+    def grow(self, rows):
+        from communications.models import EmailRecipient
+        from finance.models import Invoice, Payment, Transaction
+        from players.models import GuardianPlayer, Player
+        from sponsors.models import Sponsor
+        from tickets.models import Ticket, TicketReply
+
+        new = range(self.rows, rows)
+        if not new:
+            return
+        today = timezone.localdate()
+        now = timezone.now()
+
+        players = Player.objects.bulk_create([
+            Player(first_name=f'Budget{i}', last_name='Player', birthdate=date(2010, 1, 1), category=self.category)
+            for i in new
+        ])
+        GuardianPlayer.objects.bulk_create([
+            GuardianPlayer(guardian=self.guardian, player=player, relation='tutor') for player in players
+        ])
+        invoices = Invoice.objects.bulk_create([
+            Invoice(guardian=self.guardian, player=player, fee_definition=self.fee, amount=1000,
+                    due_date=today + timedelta(days=10), billing_period=today.strftime('%Y-%m'))
+            for player in players
+        ])
+        Payment.objects.bulk_create([
+            Payment(invoice=invoice, amount=1000, paid_at=now, method='transferencia') for invoice in invoices
+        ])
+
+        sponsor = Sponsor.objects.order_by('pk').first()
+        Transaction.objects.bulk_create([
+            Transaction(type='ingreso', category='cuota', description=f'Budget {i}', amount=1000, date=today,
+                        player=player, sponsor=sponsor if i % 2 else None)
+            for i, player in zip(new, players)
+        ])
+
+        users = User.objects.bulk_create([
+            User(username=f'budget_user_{i}', email=f'budget_user_{i}@example.com', first_name='Budget', last_name=str(i))
+            for i in new
+        ])
+        EmailRecipient.objects.bulk_create([
+            EmailRecipient(bulk_email=self.bulk_email, user=user, status='enviado', sent_at=now) for user in users
+        ])
+
+        tickets = Ticket.objects.bulk_create([
+            Ticket(subject=f'Budget {i}', guardian=self.guardian) for i in new
+        ])
+        TicketReply.objects.bulk_create([
+            TicketReply(ticket=ticket, user=self.admin, message='-') for ticket in tickets
+        ])
+        self.rows = rows
+
+    def client_for(self, role):
+        # 'localhost' está en ALLOWED_HOSTS también fuera de DEBUG (check_query_budgets no usa el runner de tests);
+        # los GET van con secure=True para no recibir la redirección de SECURE_SSL_REDIRECT
+        client = Client(SERVER_NAME='localhost')
+        client.force_login(self.admin if role == 'admin' else self.guardian)
+        return client
+
+
+def measure(client, url):
+    """
+    (código de respuesta, consultas ejecutadas) de un GET. Antes se hace un
+    GET de calentamiento: la primera visita crea contadores y llena cachés,
+    y eso no depende de las filas.
+    """
+    client.get(url, secure=True)
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, secure=True)
+    return response.status_code, ctx.captured_queries
+
+
+def check_budgets(budgets=None, scales=SCALES):
+    """
+    Siembra los datos a cada escala, mide cada vista y revierte todo.
+    Devuelve ``[(budget, {escala: consultas}, error o None)]``.
+    """
+    budgets = budgets or VIEW_BUDGETS
+    results = []
+    with transaction.atomic():
+        fixture = BudgetFixture()
+        counts = {budget.name: {} for budget in budgets}
+        statuses = {}
+        for rows in scales:
+            fixture.grow(rows)
+            for budget in budgets:
+                status, queries = measure(fixture.client_for(budget.role), budget.url(fixture))
+                counts[budget.name][rows] = len(queries)
+                statuses.setdefault(budget.name, status)
+        for budget in budgets:
+            by_scale = counts[budget.name]
+            error = None
+            if statuses[budget.name] != 200:
+                error = f'respondió {statuses[budget.name]}'
+            elif len(set(by_scale.values())) > 1:
+                error = 'el número de consultas crece con las filas (N+1)'
+            elif max(by_scale.values()) > budget.max_queries:
+                error = f'supera el presupuesto de {budget.max_queries}'
+            results.append((budget, by_scale, error))
+        transaction.set_rollback(True)
+    return results
+
+
+class QueryBudgetTestMixin:
+    """Para ``django.test.TestCase``: aserciones de presupuesto con ``assertNumQueries``."""
+
+    def assertQueryBudgets(self, budgets=None, scales=SCALES):
+        """
+        Siembra cada escala una sola vez y verifica todas las vistas: en la
+        primera se fija el número de consultas (dentro del presupuesto) y en
+        las siguientes se exige exactamente el mismo con ``assertNumQueries``.
+        """
+        budgets = budgets or VIEW_BUDGETS
+        fixture = BudgetFixture()
+        expected = {}
+        for rows in scales:
+            fixture.grow(rows)
+            for budget in budgets:
+                with self.subTest(view=budget.name, rows=rows):
+                    client = fixture.client_for(budget.role)
+                    url = budget.url(fixture)
+                    if budget.name not in expected:
+                        status, queries = measure(client, url)
+                        self.assertEqual(status, 200, f'{budget.name} respondió {status}')
+                        expected[budget.name] = len(queries)
+                        self.assertLessEqual(len(queries), budget.max_queries, f'{budget.name} supera su presupuesto')
+                        continue
+                    client.get(url, secure=True)  # calentamiento, como en measure()
+                    with self.assertNumQueries(expected[budget.name]):
+                        client.get(url, secure=True)
@@ -0,0 +1,110 @@
+"""
+Signals de core:
+- generación de variantes de imagen al guardar los modelos de core.images.IMAGE_FIELDS,
+  y borrado de las variantes de la imagen anterior al reemplazarla o borrar la fila;
+- liberación de referencias del almacenamiento deduplicado al borrar filas o
+  reemplazar el archivo (core.storage).
+"""
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .background import run_in_background
+from .images import IMAGE_FIELDS, delete_variants, generate_variants, get_variants
+from .storage import DEDUP_FILE_FIELDS
+
+
+def _previous_attr(field_name):
+    return f'_previous_{field_name}'
+
+
+def _make_snapshot_handler(field_name):
+    """
+    pre_save: guarda en la instancia el nombre de archivo que tiene hoy la fila
+    en la base y si este save sube un archivo nuevo (aún no guardado en el storage).
+    """
+    def handler(sender, instance, update_fields=None, **kwargs):
+        previous = None
+        if not instance._state.adding and instance.pk is not None and (update_fields is None or field_name in update_fields):
+            previous = sender._default_manager.filter(pk=instance.pk).values_list(field_name, flat=True).first()
+        field_file = getattr(instance, field_name)
+        uploading = bool(field_file) and not field_file._committed
+        setattr(instance, _previous_attr(field_name), (previous, uploading))
+    return handler
+
+
+def replaced_file_name(instance, field_name):
+    """Nombre del archivo que ``instance`` dejó de usar en este save, o None si no cambió."""
+    previous, uploading = instance.__dict__.pop(_previous_attr(field_name), (None, False))
+    # Con almacenamiento deduplicado, subir el mismo contenido devuelve el mismo nombre
+    # pero suma una referencia: la anterior se libera igual
+    if previous and (uploading or previous != getattr(instance, field_name).name):
+        return previous
+    return None
+
+
+def connect_file_tracking(model, field_name, release, dispatch_uid):
+    """
+    Llama a ``release(sender, nombre)`` con el archivo que una fila de ``model``
+    deja de usar: al reemplazar ``field_name`` (diff pre_save/post_save) o al borrarla.
+    """
+    def saved(sender, instance, **kwargs):
+        previous = replaced_file_name(instance, field_name)
+        if previous:
+            release(sender, previous)
+
+    def deleted(sender, instance, **kwargs):
+        name = getattr(instance, field_name).name
+        if name:
+            release(sender, name)
+
+    pre_save.connect(_make_snapshot_handler(field_name), sender=model, weak=False, dispatch_uid=f'{dispatch_uid}_snapshot')
+    post_save.connect(saved, sender=model, weak=False, dispatch_uid=f'{dispatch_uid}_replace')
+    post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=f'{dispatch_uid}_delete')
+
+
+def _make_handler(field_name):
+    def handler(sender, instance, **kwargs):
+        name = getattr(instance, field_name).name
+        if not name or get_variants(name)['webp']:
+            return
+        # Tras el commit, para que el hilo vea el archivo y la fila ya guardados
+        transaction.on_commit(lambda: run_in_background(generate_variants, name, name='generate_variants'))
+    return handler
+
+
+def _make_variants_release(field_name):
+    def release(sender, name):
+        # Otra fila puede seguir usando la misma imagen (p. ej. datos copiados)
+        if sender._default_manager.filter(**{field_name: name}).exists():
+            return
+        transaction.on_commit(lambda: delete_variants(name))
+    return release
+
+
+def connect_image_signals():
+    for model_label, field_name in IMAGE_FIELDS:
+        model = apps.get_model(model_label)
+        post_save.connect(
+            _make_handler(field_name), sender=model, weak=False,
+            dispatch_uid=f'image_variants_{model_label}_{field_name}',
+        )
+        connect_file_tracking(
+            model, field_name, _make_variants_release(field_name),
+            dispatch_uid=f'image_variants_release_{model_label}_{field_name}',
+        )
+
+
+def _make_release_handler(field_name):
+    def release(sender, name):
+        sender._meta.get_field(field_name).storage.delete(name)
+    return release
+
+
+def connect_storage_signals():
+    for model_label, field_name in DEDUP_FILE_FIELDS:
+        model = apps.get_model(model_label)
+        connect_file_tracking(
+            model, field_name, _make_release_handler(field_name),
+            dispatch_uid=f'dedup_release_{model_label}_{field_name}',
+        )
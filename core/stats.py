@@ -0,0 +1,99 @@
+"""
+Estadísticas agregadas para el panel de administración.
+
+Todos los KPIs del dashboard se calculan en una sola consulta: las sumas de
+facturas usan agregación condicional (``Sum(..., filter=Q(...))``) y los
+conteos del resto de las tablas se resuelven como subconsultas escalares
+dentro del mismo SELECT.
+"""
+from dataclasses import dataclass, asdict
+from decimal import Decimal
+
+from django.db.models import Count, Q, Subquery, Sum, Value
+from django.utils import timezone
+
+from finance.models import Invoice, Payment
+from players.models import Player
+from sponsors.models import Sponsor
+from users.models import GuardianProfile, Registration
+
+
+@dataclass(frozen=True)
+class DashboardStats:
+    """Resultado tipado con los KPIs del panel de administración."""
+    total_players: int
+    total_guardians: int
+    active_sponsors: int
+    pending_registrations: int
+    monthly_registrations: int
+    monthly_payments: int
+    total_paid_quotas: Decimal
+    total_pending_quotas: Decimal   # pendiente + en revisión
+    total_overdue_quotas: Decimal
+    total_outstanding_quotas: Decimal  # pendiente + atrasada (reporte financiero)
+    total_funds: Decimal
+
+    def as_dict(self):
+        return asdict(self)
+
+
+def aggregate_subquery(queryset, expression):
+    """
+    Subconsulta escalar con un único agregado sobre ``queryset``.
+
+    Agrupar por una constante hace que Django no emita GROUP BY, por lo que
+    la subconsulta siempre devuelve exactamente una fila (aunque la tabla
+    esté vacía).
+    """
+    return Subquery(
+        queryset.order_by()
+        .annotate(_row=Value(1))
+        .values('_row')
+        .annotate(value=expression)
+        .values('value')
+    )
+
+
+def get_dashboard_stats():
+    """Calcula todos los KPIs del dashboard en un solo viaje a la base de datos."""
+    now = timezone.now()
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    row = (
+        Invoice.objects.order_by()
+        .annotate(_row=Value(1))
+        .values('_row')
+        .annotate(
+            total_paid_quotas=Sum('amount', filter=Q(status='pagada')),
+            total_pending_quotas=Sum('amount', filter=Q(status__in=['pendiente', 'en revisión'])),
+            total_overdue_quotas=Sum('amount', filter=Q(status='atrasada')),
+            total_outstanding_quotas=Sum('amount', filter=Q(status__in=['pendiente', 'atrasada'])),
+            total_funds=aggregate_subquery(
+                Payment.objects.all(), Sum('amount', filter=Q(status='completado'))
+            ),
+            monthly_payments=aggregate_subquery(
+                Payment.objects.all(), Count('pk', filter=Q(status='completado', created_at__gte=month_start))
+            ),
+            pending_registrations=aggregate_subquery(
+                Registration.objects.all(), Count('pk', filter=Q(status='pending'))
+            ),
+            monthly_registrations=aggregate_subquery(
+                Registration.objects.all(), Count('pk', filter=Q(created_at__gte=month_start))
+            ),
+            total_players=aggregate_subquery(Player.objects.all(), Count('pk')),
+            total_guardians=aggregate_subquery(GuardianProfile.objects.all(), Count('pk')),
+            active_sponsors=aggregate_subquery(Sponsor.objects.all(), Count('pk', filter=Q(is_visible=True))),
+        )
+        .get()
+    )
+    row.pop('_row')
+
+    money_fields = {
+        'total_paid_quotas', 'total_pending_quotas', 'total_overdue_quotas',
+        'total_outstanding_quotas', 'total_funds',
+    }
+    values = {
+        key: (value or Decimal('0')) if key in money_fields else (value or 0)
+        for key, value in row.items()
+    }
+    return DashboardStats(**values)
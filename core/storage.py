@@ -0,0 +1,100 @@
+"""
+Almacenamiento deduplicado por contenido para comprobantes de pago,
+documentos de jugadoras y adjuntos de comunicaciones.
+
+Cada archivo se guarda una sola vez bajo su hash SHA-256:
+
+    blobs/3f/3fa9...c1/comprobante.jpg
+
+(el nombre legible es el de la primera subida). Subir el mismo contenido de
+nuevo solo incrementa ``StoredBlob.ref_count`` y devuelve la misma ruta;
+``delete`` decrementa el contador y borra el archivo físico recién cuando
+ya nadie lo referencia (tras el commit); los archivos sin ``StoredBlob``
+(anteriores a la deduplicación) nunca se borran. ``core.signals`` libera la
+referencia al borrar la fila o al reemplazar el archivo.
+"""
+import hashlib
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.text import get_valid_filename
+
+BLOBS_DIR = 'blobs'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(file_obj):
+    """SHA-256 y tamaño de un archivo abierto, leído por bloques."""
+    digest = hashlib.sha256()
+    size = 0
+    if hasattr(file_obj, 'seek'):
+        file_obj.seek(0)
+    for chunk in iter(lambda: file_obj.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+        size += len(chunk)
+    if hasattr(file_obj, 'seek'):
+        file_obj.seek(0)
+    return digest.hexdigest(), size
+
+
+# (modelo, campo) que usan este almacenamiento
+DEDUP_FILE_FIELDS = [
+    ('finance.Payment', 'payment_proof'),
+    ('players.PlayerDocument', 'file'),
+    ('communications.BulkEmail', 'attachment'),
+]
+
+
+def blob_name_for(digest, original_name, max_length=None):
+    directory = posixpath.join(BLOBS_DIR, digest[:2], digest)
+    filename = get_valid_filename(posixpath.basename(original_name)) or 'archivo'
+    if max_length:
+        # Se acorta el nombre legible (no el hash) para respetar el max_length del campo
+        stem, ext = posixpath.splitext(filename)
+        available = max_length - len(directory) - 1 - len(ext)
+        filename = stem[:max(available, 1)] + ext
+    return posixpath.join(directory, filename)
+
+
+class DedupFileSystemStorage(FileSystemStorage):
+    """``FileSystemStorage`` con deduplicación por contenido y conteo de referencias."""
+
+    def save(self, name, content, max_length=None):
+        from .models import StoredBlob
+
+        if name is None:
+            name = content.name
+        digest, size = hash_file(content)
+        with transaction.atomic():
+            blob, created = StoredBlob.objects.select_for_update().get_or_create(
+                digest=digest,
+                defaults={'name': blob_name_for(digest, name, max_length), 'size': size, 'ref_count': 1},
+            )
+            if not created:
+                StoredBlob.objects.filter(pk=digest).update(ref_count=F('ref_count') + 1)
+            # Misma ruta = mismo contenido: si el archivo ya está en disco no se reescribe
+            if not super().exists(blob.name):
+                super()._save(blob.name, content)
+        return blob.name
+
+    def delete(self, name):
+        from .models import StoredBlob
+
+        with transaction.atomic():
+            blob = StoredBlob.objects.select_for_update().filter(name=name).first()
+            if blob is None:
+                # Archivo anterior a la deduplicación (sin StoredBlob): otras filas pueden
+                # seguir apuntando a él hasta correr dedupe_media, así que no se toca
+                return
+            if blob.ref_count > 1:
+                StoredBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+                return
+            blob.delete()
+            transaction.on_commit(lambda: super(DedupFileSystemStorage, self).delete(name))
+
+
+def dedup_storage():
+    """Callable para ``FileField(storage=...)`` (evita serializar la instancia en las migraciones)."""
+    return DedupFileSystemStorage()
@@ -0,0 +1,61 @@
+"""
+Filtros para servir las variantes redimensionadas de core.images.
+
+    {% load images %}
+    <picture>
+        {% with webp=player.photo|srcset:'webp' %}{% if webp %}
+        <source type="image/webp" srcset="{{ webp }}" sizes="(max-width: 576px) 50vw, 25vw">
+        {% endif %}{% endwith %}
+        <img src="{{ player.photo|thumbnail_url:320 }}"
+             srcset="{{ player.photo|srcset }}" sizes="(max-width: 576px) 50vw, 25vw">
+    </picture>
+
+Para un ancho fijo, ``webp_thumbnail_url`` da la variante WebP equivalente a
+``thumbnail_url`` (o '' si no existe, y entonces se omite el ``<source>``).
+"""
+from django import template
+
+from core.images import get_variants
+
+register = template.Library()
+
+
+def _name(field_file):
+    return getattr(field_file, 'name', None)
+
+
+@register.filter
+def thumbnail_url(field_file, width):
+    """URL de la variante más chica con al menos ``width`` px (o la mayor disponible, o el original)."""
+    name = _name(field_file)
+    if not name:
+        return ''
+    variants = get_variants(name)['fallback']
+    width = int(width)
+    for variant_width, url in variants:
+        if variant_width >= width:
+            return url
+    return field_file.url
+
+
+@register.filter
+def webp_thumbnail_url(field_file, width):
+    """URL de la variante WebP más chica con al menos ``width`` px, o '' si no hay."""
+    name = _name(field_file)
+    if not name:
+        return ''
+    width = int(width)
+    for variant_width, url in get_variants(name)['webp']:
+        if variant_width >= width:
+            return url
+    return ''
+
+
+@register.filter
+def srcset(field_file, fmt='fallback'):
+    """Valor para el atributo ``srcset`` (``fmt`` = 'fallback' o 'webp')."""
+    name = _name(field_file)
+    if not name:
+        return ''
+    return ', '.join(f'{url} {width}w' for width, url in get_variants(name)[fmt])
+
@@ -1,3 +1,143 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from finance.models import Transaction
+from players.models import Category, Player, PlayerDocument
+
+from .models import StoredBlob
+from .pagination import CursorPaginator
+from .query_budget import QueryBudgetTestMixin
+
+# Las plantillas usan {% static %}: sin collectstatic no existe el manifiesto de WhiteNoise
+PLAIN_STATIC_STORAGES = {
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGES)
+class ListViewQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    def test_list_views_have_fixed_query_count(self):
+        self.assertQueryBudgets()
+
+
+class DedupStorageRefCountTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        category = Category.objects.create(name='Sub-14')
+        self.player = Player.objects.create(first_name='Ana', last_name='Test', birthdate=date(2011, 1, 1), category=category)
+        self.storage = PlayerDocument._meta.get_field('file').storage
+
+    def _document(self, content, name='certificado.pdf'):
+        return PlayerDocument.objects.create(player=self.player, title='Certificado',
+                                             file=SimpleUploadedFile(name, content))
+
+    def _refs(self):
+        return dict(StoredBlob.objects.values_list('name', 'ref_count'))
+
+    def test_same_content_is_stored_once(self):
+        first = self._document(b'contenido')
+        second = self._document(b'contenido', name='otro-nombre.pdf')
+
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(self._refs(), {first.file.name: 2})
+        self.assertTrue(self.storage.exists(first.file.name))
+
+    def test_deleting_rows_releases_the_blob_only_after_the_last_reference(self):
+        first = self._document(b'contenido')
+        second = self._document(b'contenido')
+        name = first.file.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self._refs(), {name: 1})
+        self.assertTrue(self.storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertEqual(self._refs(), {})
+        self.assertFalse(self.storage.exists(name))
+
+    def test_replacing_the_file_releases_the_previous_blob(self):
+        document = self._document(b'version 1')
+        old_name = document.file.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            document.file = SimpleUploadedFile('certificado.pdf', b'version 2')
+            document.save()
+
+        self.assertEqual(self._refs(), {document.file.name: 1})
+        self.assertFalse(self.storage.exists(old_name))
+
+    def test_reuploading_the_same_content_keeps_a_single_reference(self):
+        document = self._document(b'contenido')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            document.file = SimpleUploadedFile('certificado.pdf', b'contenido')
+            document.save()
+
+        self.assertEqual(self._refs(), {document.file.name: 1})
+        self.assertTrue(self.storage.exists(document.file.name))
+
+    def test_files_without_a_blob_row_are_never_deleted(self):
+        legacy_name = self.storage.save('player_documents/antiguo.pdf', SimpleUploadedFile('antiguo.pdf', b'x'))
+        StoredBlob.objects.filter(name=legacy_name).delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.storage.delete(legacy_name)
+
+        self.assertTrue(self.storage.exists(legacy_name))
+
+
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        # Cuatro transacciones por día: casi todas las páginas cortan en medio de un empate de fecha
+        for day in range(5):
+            for _ in range(4):
+                Transaction.objects.create(type='ingreso', category='evento', description='Entrada', amount=1000,
+                                           date=date(2024, 3, 1) + timedelta(days=day))
+
+    def _walk(self, ordering, per_page=3):
+        """Recorre todas las páginas hacia adelante y luego vuelve hacia atrás."""
+        paginator = CursorPaginator(Transaction.objects.all(), ordering, per_page)
+        pages = [paginator.get_page()]
+        while pages[-1].has_next:
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        backwards = [pages[-1]]
+        while backwards[-1].has_previous:
+            backwards.append(paginator.get_page(backwards[-1].previous_cursor))
+        return [[t.pk for t in page] for page in pages], [[t.pk for t in page] for page in reversed(backwards)]
+
+    def test_next_and_previous_round_trip_across_ties(self):
+        for ordering in [('-date', '-id'), ('date', '-id')]:
+            with self.subTest(ordering=ordering):
+                forward, backward = self._walk(ordering)
+                expected = list(Transaction.objects.order_by(*ordering).values_list('pk', flat=True))
+
+                self.assertEqual(sum(forward, []), expected)
+                self.assertEqual([len(page) for page in forward], [3] * 6 + [2])
+                self.assertEqual(backward, forward)
+
+    def test_first_and_last_pages_have_no_link_outwards(self):
+        paginator = CursorPaginator(Transaction.objects.all(), ('-date', '-id'), 10)
+        first = paginator.get_page()
+        last = paginator.get_page(first.next_cursor)
+
+        self.assertEqual((first.has_previous, first.has_next), (False, True))
+        self.assertEqual((last.has_previous, last.has_next), (True, False))
+        self.assertEqual(list(paginator.get_page(last.previous_cursor)), list(first))
+
+    def test_tampered_cursor_falls_back_to_the_first_page(self):
+        paginator = CursorPaginator(Transaction.objects.all(), ('-date', '-id'), 5)
+        cursor = paginator.get_page().next_cursor
+
+        self.assertEqual(list(paginator.get_page(cursor[:-2] + 'xx')), list(paginator.get_page()))
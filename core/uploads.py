@@ -0,0 +1,179 @@
+"""
+Validación y compresión de archivos subidos (comprobantes de pago y
+documentos de jugadoras).
+
+1. ``validate_uploads`` instala en la vista un upload handler que revisa el
+   archivo mientras llega: por la firma de los primeros bytes rechaza lo que
+   no sea del tipo permitido y corta apenas se supera el tamaño máximo, sin
+   terminar de guardarlo en memoria ni en disco.
+2. ``process_upload`` elimina los metadatos EXIF de las imágenes, las achica
+   a ``UPLOAD_IMAGE_MAX_DIMENSION`` y las recomprime. Los PDF se guardan tal
+   cual. Devuelve los tamaños original y final para registrarlos.
+"""
+import io
+import posixpath
+from dataclasses import dataclass
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+IMAGE_KINDS = ('jpeg', 'png', 'gif', 'webp')
+DOCUMENT_KINDS = IMAGE_KINDS + ('pdf',)
+
+
+class UploadRejected(ValueError):
+    """El archivo subido no cumple las reglas de tipo o tamaño."""
+
+
+def sniff_kind(head):
+    """Tipo real del archivo según sus primeros bytes (None si no se reconoce)."""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    if head.startswith(b'%PDF-'):
+        return 'pdf'
+    return None
+
+
+@dataclass(frozen=True)
+class UploadRule:
+    kinds: tuple
+    max_size: int
+
+    @property
+    def max_size_mb(self):
+        return self.max_size // (1024 * 1024)
+
+    def describe_kinds(self):
+        return ', '.join(kind.upper() for kind in self.kinds)
+
+
+def image_rule():
+    return UploadRule(kinds=IMAGE_KINDS, max_size=settings.UPLOAD_MAX_IMAGE_SIZE)
+
+
+def document_rule():
+    return UploadRule(kinds=DOCUMENT_KINDS, max_size=settings.UPLOAD_MAX_DOCUMENT_SIZE)
+
+
+class ValidatingUploadHandler(FileUploadHandler):
+    """
+    Upload handler que solo inspecciona los datos y los deja pasar a los
+    handlers siguientes. Si un archivo no cumple su regla, anota el motivo en
+    ``request.upload_errors`` y lo descarta con ``SkipFile``.
+    """
+
+    def __init__(self, request, rules):
+        super().__init__(request)
+        self.rules = rules
+        if not hasattr(request, 'upload_errors'):
+            request.upload_errors = {}
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.rule = self.rules.get(field_name)
+        self.received = 0
+        if self.rule and content_length and content_length > self.rule.max_size:
+            self._reject(f'El archivo supera el máximo de {self.rule.max_size_mb} MB.')
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.rule:
+            if start == 0 and sniff_kind(raw_data[:16]) not in self.rule.kinds:
+                self._reject(f'Formato no permitido. Sube un archivo {self.rule.describe_kinds()}.')
+            self.received += len(raw_data)
+            if self.received > self.rule.max_size:
+                self._reject(f'El archivo supera el máximo de {self.rule.max_size_mb} MB.')
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+    def _reject(self, message):
+        self.request.upload_errors[self.field_name] = message
+        raise SkipFile()
+
+
+def validate_uploads(**rules):
+    """
+    Decorador de vista: ``@validate_uploads(payment_proof=image_rule())``.
+    Las reglas se pasan como funciones para leer los límites de settings en
+    cada petición. La vista queda ``csrf_exempt`` para que el middleware CSRF
+    no lea el cuerpo antes de instalar el handler; la verificación CSRF se
+    hace aquí mismo. Debe ir *debajo* de ``login_required``/``user_passes_test``
+    (``functools.wraps`` propaga ``csrf_exempt`` hacia afuera), para que un
+    anónimo no haga leer ni procesar archivos antes de la autenticación.
+    """
+    def decorator(view):
+        protected = csrf_protect(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            resolved = {field: rule() for field, rule in rules.items()}
+            request.upload_handlers.insert(0, ValidatingUploadHandler(request, resolved))
+            return protected(request, *args, **kwargs)
+        return csrf_exempt(wrapper)
+    return decorator
+
+
+def upload_error(request, field_name):
+    """Motivo por el que el handler descartó el archivo de ``field_name`` (o None)."""
+    return getattr(request, 'upload_errors', {}).get(field_name)
+
+
+@dataclass
+class ProcessedUpload:
+    file: object
+    original_size: int
+    stored_size: int
+
+
+def _compress_image(uploaded):
+    try:
+        img = Image.open(uploaded)
+        max_dimension = settings.UPLOAD_IMAGE_MAX_DIMENSION
+        img.draft('RGB', (max_dimension, max_dimension))
+        img = ImageOps.exif_transpose(img)
+        img.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise UploadRejected('El archivo no es una imagen válida.')
+
+    img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    has_alpha = img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+    buffer = io.BytesIO()
+    # Al guardar sin pasar exif= se descartan los metadatos (GPS, cámara, etc.)
+    if has_alpha:
+        img.convert('RGBA').save(buffer, 'PNG', optimize=True)
+        ext = 'png'
+    else:
+        img.convert('RGB').save(buffer, 'JPEG', quality=settings.UPLOAD_IMAGE_QUALITY, optimize=True, progressive=True)
+        ext = 'jpg'
+    stem = posixpath.splitext(posixpath.basename(uploaded.name))[0]
+    return ContentFile(buffer.getvalue(), name=f'{stem}.{ext}')
+
+
+def process_upload(uploaded, rule):
+    """
+    Valida (de nuevo, por si el archivo no pasó por el handler) y comprime
+    ``uploaded``. Lanza ``UploadRejected`` si no cumple ``rule``.
+    """
+    if uploaded.size > rule.max_size:
+        raise UploadRejected(f'El archivo supera el máximo de {rule.max_size_mb} MB.')
+    uploaded.seek(0)
+    kind = sniff_kind(uploaded.read(16))
+    uploaded.seek(0)
+    if kind not in rule.kinds:
+        raise UploadRejected(f'Formato no permitido. Sube un archivo {rule.describe_kinds()}.')
+
+    if kind == 'pdf':
+        return ProcessedUpload(file=uploaded, original_size=uploaded.size, stored_size=uploaded.size)
+    compressed = _compress_image(uploaded)
+    return ProcessedUpload(file=compressed, original_size=uploaded.size, stored_size=compressed.size)
@@ -3,7 +3,7 @@ from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.urls import reverse
 from django.http import HttpResponseRedirect
-from .models import FeeDefinition, Invoice, Payment
+from .models import FeeDefinition, Invoice, Payment, OverdueSweepRun
 
 
 @admin.register(FeeDefinition)
@@ -22,7 +22,7 @@ class FeeDefinitionAdmin(admin.ModelAdmin):
 
 @admin.register(Invoice)
 class InvoiceAdmin(admin.ModelAdmin):
-    # Modificado: 'is_overdue_display' ya no es necesario si 'save' maneja el estado
+    # El estado 'atrasada' lo mantiene el barrido periódico (comando mark_overdue_invoices)
     list_display = ['get_guardian_name', 'get_player_name', 'amount', 'due_date', 'status']
     list_filter = ['status', 'due_date', 'created_at']
     search_fields = ['guardian__first_name', 'guardian__last_name', 'player__first_name', 'player__last_name']
@@ -81,9 +81,10 @@ class PaymentAdmin(admin.ModelAdmin):
             'fields': ('invoice', 'amount', 'paid_at', 'method')
         }),
         ('Estado y Comprobante', {
-            'fields': ('status', 'notes', 'payment_proof')
+            'fields': ('status', 'notes', 'payment_proof', 'proof_original_size', 'proof_stored_size')
         })
     )
+    readonly_fields = ['proof_original_size', 'proof_stored_size']
     
     actions = ['mark_as_completed', 'mark_as_failed']
     
@@ -116,4 +117,15 @@ class PaymentAdmin(admin.ModelAdmin):
             payment.invoice.status = 'pendiente' # O 'atrasada' si ya venció
             payment.invoice.save()
         self.message_user(request, f'{updated} pagos marcados como fallidos (y facturas revertidas).')
-    mark_as_failed.short_description = 'Marcar como fallido'
\ No newline at end of file
+    mark_as_failed.short_description = 'Marcar como fallido'
+
+
+@admin.register(OverdueSweepRun)
+class OverdueSweepRunAdmin(admin.ModelAdmin):
+    list_display = ['ran_at', 'cutoff_date', 'updated_count', 'duration_ms', 'triggered_by']
+    list_filter = ['triggered_by']
+    date_hierarchy = 'ran_at'
+    readonly_fields = ['ran_at', 'cutoff_date', 'updated_count', 'duration_ms', 'triggered_by']
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,258 @@
+"""
+Generación masiva de facturas (Invoices) basada en conjuntos.
+
+En lugar de consultar por cada jugadora si ya tiene factura y quién es su
+apoderado, se precalcula todo en unas pocas consultas y se inserta con
+``bulk_create(ignore_conflicts=True)`` por lotes dentro de una transacción.
+La restricción única sobre ``Invoice.billing_period`` hace que generar dos
+veces el mismo período sea idempotente.
+"""
+import calendar
+from dataclasses import dataclass, field
+from datetime import date
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+
+from players.models import Player, GuardianPlayer
+from .models import FeeDefinition, Invoice
+
+
+DEFAULT_BATCH_SIZE = 500
+
+
+@dataclass
+class FeeGenerationResult:
+    """Resultado de la generación para una definición de cuota."""
+    fee_definition: FeeDefinition
+    created: int = 0
+    already_billed: int = 0
+    without_guardian: list = field(default_factory=list)  # Jugadoras omitidas por no tener apoderado
+
+    @property
+    def skipped(self):
+        return self.already_billed + len(self.without_guardian)
+
+
+@dataclass
+class InvoiceGenerationResult:
+    """Resultado global de una corrida de facturación mensual."""
+    year: int
+    month: int
+    due_date: date
+    dry_run: bool = False
+    fees: list = field(default_factory=list)
+
+    @property
+    def created(self):
+        return sum(fee.created for fee in self.fees)
+
+    @property
+    def skipped(self):
+        return sum(fee.skipped for fee in self.fees)
+
+
+def default_due_date(year, month, day=10):
+    """Fecha de vencimiento estándar: el día ``day`` del mes (o el último día si no existe)."""
+    last_day = calendar.monthrange(year, month)[1]
+    return date(year, month, min(day, last_day))
+
+
+def primary_guardians(player_ids):
+    """
+    Resuelve el apoderado principal (el primer vínculo registrado) de cada
+    jugadora en una sola consulta. Devuelve {player_id: guardian_id}.
+    """
+    guardians = {}
+    links = (
+        GuardianPlayer.objects.filter(player_id__in=player_ids)
+        .order_by('player_id', 'pk')
+        .values_list('player_id', 'guardian_id')
+    )
+    for player_id, guardian_id in links:
+        guardians.setdefault(player_id, guardian_id)
+    return guardians
+
+
+def billed_pairs(fee_definitions, billing_period):
+    """Pares (player_id, fee_definition_id) ya facturados en el período, en una sola consulta."""
+    return set(
+        Invoice.objects.filter(fee_definition__in=fee_definitions, billing_period=billing_period)
+        .values_list('player_id', 'fee_definition_id')
+    )
+
+
+def _period_counts(fee_definition_ids, billing_period):
+    """{fee_definition_id: facturas del período} en una sola consulta."""
+    return Counter(dict(
+        Invoice.objects.filter(fee_definition_id__in=fee_definition_ids, billing_period=billing_period)
+        .order_by()
+        .values_list('fee_definition_id')
+        .annotate(count=Count('pk'))
+    ))
+
+
+def insert_invoices(invoices, billing_period, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Inserta ``invoices`` (todas del mismo período) con ``ignore_conflicts`` y
+    devuelve {fee_definition_id: facturas realmente creadas}. Las filas que
+    chocan con la restricción única (p. ej. de una corrida concurrente) no se
+    cuentan: se compara el total del período antes y después de insertar.
+    """
+    fee_ids = {invoice.fee_definition_id for invoice in invoices}
+    with transaction.atomic():
+        before = _period_counts(fee_ids, billing_period)
+        Invoice.objects.bulk_create(invoices, batch_size=batch_size, ignore_conflicts=True)
+        after = _period_counts(fee_ids, billing_period)
+    return {fee_id: after[fee_id] - before[fee_id] for fee_id in fee_ids}
+
+
+def generate_monthly_invoices(year=None, month=None, due_date=None, dry_run=False, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Genera las facturas de todas las cuotas 'mensual' para las jugadoras
+    activas en el período indicado (por defecto, el mes actual).
+
+    Con ``dry_run=True`` calcula el resultado sin escribir en la base de datos.
+    """
+    today = timezone.localdate()
+    year = year or today.year
+    month = month or today.month
+    due_date = due_date or default_due_date(year, month)
+    result = InvoiceGenerationResult(year=year, month=month, due_date=due_date, dry_run=dry_run)
+
+    monthly_fees = list(FeeDefinition.objects.filter(period='mensual').select_related('category'))
+    if not monthly_fees:
+        return result
+
+    players = list(
+        Player.objects.filter(status='active')
+        .only('id', 'category_id', 'first_name', 'last_name', 'nickname')
+        .order_by('id')
+    )
+    guardians = primary_guardians([p.id for p in players])
+    billing_period = f'{year:04d}-{month:02d}'
+    already_billed = billed_pairs(monthly_fees, billing_period)
+    # Misma regla que el barrido de atrasadas: si la fecha ya pasó, la factura nace atrasada
+    status = 'atrasada' if due_date < today else 'pendiente'
+
+    to_create = []
+    for fee_def in monthly_fees:
+        fee_result = FeeGenerationResult(fee_definition=fee_def)
+        result.fees.append(fee_result)
+        for player in players:
+            if fee_def.category_id and player.category_id != fee_def.category_id:
+                continue
+            if (player.id, fee_def.id) in already_billed:
+                fee_result.already_billed += 1
+                continue
+            guardian_id = guardians.get(player.id)
+            if guardian_id is None:
+                fee_result.without_guardian.append(player)
+                continue
+            to_create.append(Invoice(
+                guardian_id=guardian_id,
+                player_id=player.id,
+                fee_definition=fee_def,
+                amount=fee_def.amount,
+                due_date=due_date,
+                status=status,
+                billing_period=billing_period,
+            ))
+            fee_result.created += 1
+
+    if not dry_run and to_create:
+        # La restricción única (player, fee_definition, billing_period) hace que
+        # una segunda corrida concurrente simplemente ignore las filas repetidas;
+        # esas filas pasan de "creadas" a "ya facturadas".
+        created = insert_invoices(to_create, billing_period, batch_size=batch_size)
+        for fee_result in result.fees:
+            inserted = created.get(fee_result.fee_definition.id, 0)
+            fee_result.already_billed += fee_result.created - inserted
+            fee_result.created = inserted
+
+    return result
+
+
+@dataclass
+class FeeAssignmentPlan:
+    """Previsualización de la asignación de una cuota a una categoría."""
+    fee_definition: FeeDefinition
+    category: object
+    due_date: date
+    billing_period: str
+    targets: dict = field(default_factory=dict)  # {player_id: guardian_id} a facturar
+    already_invoiced: int = 0
+
+    @property
+    def count(self):
+        return len(self.targets)
+
+    @property
+    def total_amount(self):
+        return self.fee_definition.amount * self.count
+
+
+def plan_fee_assignment(fee_definition, category, due_date):
+    """
+    Resuelve en una sola consulta las jugadoras activas de la categoría con
+    su apoderado principal, marcando (anti-join) las que ya tienen esta cuota
+    en el período. No escribe nada.
+    """
+    billing_period = fee_definition.billing_period_for(due_date)
+    plan = FeeAssignmentPlan(
+        fee_definition=fee_definition,
+        category=category,
+        due_date=due_date,
+        billing_period=billing_period,
+    )
+    already_billed = Invoice.objects.filter(
+        player_id=OuterRef('player_id'),
+        fee_definition=fee_definition,
+        billing_period=billing_period,
+    )
+    links = (
+        GuardianPlayer.objects.filter(player__category=category, player__status='active')
+        .annotate(already_billed=Exists(already_billed))
+        .order_by('player_id', 'pk')
+        .values_list('player_id', 'guardian_id', 'already_billed')
+    )
+    skipped = set()
+    for player_id, guardian_id, is_billed in links:
+        if is_billed:
+            skipped.add(player_id)
+        else:
+            plan.targets.setdefault(player_id, guardian_id)
+    plan.already_invoiced = len(skipped)
+    return plan
+
+
+def apply_fee_assignment(plan, batch_size=DEFAULT_BATCH_SIZE):
+    """Inserta las facturas de un plan por lotes. Devuelve la cantidad de facturas realmente creadas."""
+    if not plan.targets:
+        return 0
+    # Misma regla que el barrido de atrasadas: si la fecha ya pasó, la factura nace atrasada
+    status = 'atrasada' if plan.due_date < timezone.localdate() else 'pendiente'
+    invoices = [
+        Invoice(
+            guardian_id=guardian_id,
+            player_id=player_id,
+            fee_definition=plan.fee_definition,
+            amount=plan.fee_definition.amount,
+            due_date=plan.due_date,
+            status=status,
+            billing_period=plan.billing_period,
+        )
+        for player_id, guardian_id in plan.targets.items()
+    ]
+    created = insert_invoices(invoices, plan.billing_period, batch_size=batch_size)
+    return created.get(plan.fee_definition.id, 0)
+
+
+def assign_fee_to_category(fee_definition, category, due_date, batch_size=DEFAULT_BATCH_SIZE):
+    """Planifica y aplica la asignación en un solo paso (uso en segundo plano o desde consola)."""
+    plan = plan_fee_assignment(fee_definition, category, due_date)
+    apply_fee_assignment(plan, batch_size=batch_size)
+    return plan
@@ -0,0 +1,301 @@
+"""
+Exportación de transacciones, facturas y pagos a CSV/XLSX en streaming.
+
+Las filas se leen con ``values_list(...).iterator(chunk_size=...)`` (cursor
+del lado del servidor en PostgreSQL) y se escriben a medida que se generan,
+de modo que una exportación de varios años usa memoria constante. El XLSX
+se arma como un ZIP en streaming (sin dependencias externas).
+
+Los filtros son los mismos que envía la pantalla de finanzas
+(``type``, ``category``, ``date_from``, ``date_to``, ``search``) más
+``status``/``method`` para facturas y pagos. ``validate_params`` revisa los
+filtros antes de empezar a responder: un error dentro del generador llegaría
+con el 200 y los encabezados ya enviados.
+"""
+import csv
+import zipfile
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Invoice, Payment, Transaction
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+
+# Prefijos con los que Excel/LibreOffice interpretan una celda de texto como fórmula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class InvalidExportFilter(ValueError):
+    """Filtro con un valor que no se puede aplicar (p. ej. ``category`` no numérica en facturas)."""
+
+
+def _date_param(params, key):
+    """Fecha del filtro ``key``; una fecha mal formada o inexistente (2024-02-30) se ignora."""
+    value = params.get(key)
+    if not isinstance(value, str):
+        return value or None
+    try:
+        return parse_date(value) if value else None
+    except ValueError:
+        return None
+
+
+def filter_transactions(params):
+    qs = Transaction.objects.all()
+    if params.get('type'):
+        qs = qs.filter(type=params['type'])
+    if params.get('category'):
+        qs = qs.filter(category=params['category'])
+    if _date_param(params, 'date_from'):
+        qs = qs.filter(date__gte=_date_param(params, 'date_from'))
+    if _date_param(params, 'date_to'):
+        qs = qs.filter(date__lte=_date_param(params, 'date_to'))
+    if params.get('search'):
+        qs = qs.filter(description__icontains=params['search'])
+    return qs.order_by('-date', '-id')
+
+
+def _player_search(search, prefix=''):
+    return (
+        Q(**{f'{prefix}player__first_name__icontains': search})
+        | Q(**{f'{prefix}player__last_name__icontains': search})
+    )
+
+
+def filter_invoices(params):
+    qs = Invoice.objects.all()
+    if params.get('status'):
+        qs = qs.filter(status=params['status'])
+    if params.get('category'):
+        qs = qs.filter(player__category_id=params['category'])
+    if _date_param(params, 'date_from'):
+        qs = qs.filter(due_date__gte=_date_param(params, 'date_from'))
+    if _date_param(params, 'date_to'):
+        qs = qs.filter(due_date__lte=_date_param(params, 'date_to'))
+    if params.get('search'):
+        qs = qs.filter(_player_search(params['search']))
+    return qs.order_by('-due_date', '-id')
+
+
+def filter_payments(params):
+    qs = Payment.objects.all()
+    if params.get('status'):
+        qs = qs.filter(status=params['status'])
+    if params.get('method'):
+        qs = qs.filter(method=params['method'])
+    if _date_param(params, 'date_from'):
+        qs = qs.filter(paid_at__date__gte=_date_param(params, 'date_from'))
+    if _date_param(params, 'date_to'):
+        qs = qs.filter(paid_at__date__lte=_date_param(params, 'date_to'))
+    if params.get('search'):
+        qs = qs.filter(_player_search(params['search'], 'invoice__') | Q(notes__icontains=params['search']))
+    return qs.order_by('-paid_at', '-id')
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    filename: str
+    queryset: object            # función params -> queryset filtrado
+    columns: tuple              # (encabezado, campo para values_list)
+    choices: dict               # {campo: dict de choices} para mostrar etiquetas legibles
+    id_params: tuple = ()       # filtros que son ids numéricos
+
+
+EXPORTS = {
+    'transactions': ExportSpec(
+        filename='transacciones',
+        queryset=filter_transactions,
+        columns=(
+            ('ID', 'id'), ('Fecha', 'date'), ('Tipo', 'type'), ('Categoría', 'category'),
+            ('Descripción', 'description'), ('Monto', 'amount'), ('Tipo de aporte', 'contribution_type'),
+            ('Auspiciador', 'sponsor__name'), ('Jugadora (nombre)', 'player__first_name'),
+            ('Jugadora (apellido)', 'player__last_name'),
+        ),
+        choices={
+            'type': dict(Transaction.TYPE_CHOICES),
+            'category': dict(Transaction.CATEGORY_CHOICES),
+            'contribution_type': dict(Transaction.CONTRIBUTION_CHOICES),
+        },
+    ),
+    'invoices': ExportSpec(
+        filename='facturas',
+        queryset=filter_invoices,
+        columns=(
+            ('ID', 'id'), ('Vencimiento', 'due_date'), ('Período', 'billing_period'), ('Estado', 'status'),
+            ('Cuota', 'fee_definition__name'), ('Monto', 'amount'),
+            ('Jugadora (nombre)', 'player__first_name'), ('Jugadora (apellido)', 'player__last_name'),
+            ('Categoría', 'player__category__name'), ('Apoderado (email)', 'guardian__email'),
+        ),
+        choices={'status': dict(Invoice.STATUS_CHOICES)},
+        id_params=('category',),
+    ),
+    'payments': ExportSpec(
+        filename='pagos',
+        queryset=filter_payments,
+        columns=(
+            ('ID', 'id'), ('Fecha de pago', 'paid_at'), ('Estado', 'status'), ('Método', 'method'),
+            ('Monto', 'amount'), ('Factura', 'invoice_id'), ('Cuota', 'invoice__fee_definition__name'),
+            ('Jugadora (nombre)', 'invoice__player__first_name'),
+            ('Jugadora (apellido)', 'invoice__player__last_name'), ('Notas', 'notes'),
+        ),
+        choices={'status': dict(Payment.STATUS_CHOICES), 'method': dict(Payment.METHOD_CHOICES)},
+    ),
+}
+
+
+def validate_params(spec, params):
+    """Lanza ``InvalidExportFilter`` si un filtro de ``spec.id_params`` no es un id numérico."""
+    for key in spec.id_params:
+        value = params.get(key)
+        if value and not str(value).isdigit():
+            raise InvalidExportFilter(f'El filtro "{key}" debe ser un id numérico (se recibió "{value}").')
+
+
+def iter_rows(spec, params, chunk_size=EXPORT_CHUNK_SIZE):
+    """Filas ya formateadas (etiquetas de choices, fechas locales) leídas por bloques."""
+    fields = [field for _, field in spec.columns]
+    labels = [spec.choices.get(field) for field in fields]
+    rows = spec.queryset(params).values_list(*fields).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield [
+            choices.get(value, value) if choices and value is not None else _plain(value)
+            for value, choices in zip(row, labels)
+        ]
+
+
+def _safe_text(value):
+    """Antepone ' a los textos que una planilla ejecutaría como fórmula (inyección CSV)."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        value = timezone.localtime(value).replace(tzinfo=None) if timezone.is_aware(value) else value
+        return value.replace(microsecond=0)
+    return value
+
+
+class _Echo:
+    """Pseudo-archivo para csv.writer: devuelve la línea en vez de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(spec, params):
+    writer = csv.writer(_Echo())
+    # BOM para que Excel reconozca UTF-8 (tildes y ñ)
+    yield '\ufeff' + writer.writerow([header for header, _ in spec.columns])
+    for row in iter_rows(spec, params):
+        yield writer.writerow(['' if value is None else _safe_text(value) for value in row])
+
+
+class _ZipStream:
+    """Destino de ``zipfile`` sin ``seek``: acumula lo escrito hasta que el generador lo entrega."""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+_XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_cell(value):
+    if value is None or value == '':
+        return '<c/>'
+    if isinstance(value, bool):
+        value = 'Sí' if value else 'No'
+    elif isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    elif isinstance(value, datetime):
+        value = value.strftime('%Y-%m-%d %H:%M')
+    elif isinstance(value, date):
+        value = value.isoformat()
+    return f'<c t="inlineStr"><is><t>{escape(str(_safe_text(value)))}</t></is></c>'
+
+
+def stream_xlsx(spec, params, flush_every=500):
+    buffer = _ZipStream()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            zf.writestr(name, content)
+        zf.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(spec.filename.capitalize())}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        ))
+        yield buffer.pop()
+
+        with zf.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            header = ''.join(_xlsx_cell(title) for title, _ in spec.columns)
+            sheet.write(f'<row>{header}</row>'.encode())
+            for i, row in enumerate(iter_rows(spec, params), start=1):
+                sheet.write(f"<row>{''.join(_xlsx_cell(value) for value in row)}</row>".encode())
+                if i % flush_every == 0:
+                    yield buffer.pop()
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.pop()
+
+
+def export_filename(spec, fmt):
+    return f'{spec.filename}_{timezone.localdate():%Y%m%d}.{fmt}'
+
+
+def stream_export(spec, params, fmt):
+    """Generador de bytes/texto del formato pedido."""
+    return stream_csv(spec, params) if fmt == 'csv' else stream_xlsx(spec, params)
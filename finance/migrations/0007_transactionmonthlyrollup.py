@@ -0,0 +1,69 @@
+# Generated by Django 5.0 on 2026-10-17 13:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def build_rollup(apps, schema_editor):
+    Transaction = apps.get_model('finance', 'Transaction')
+    TransactionMonthlyRollup = apps.get_model('finance', 'TransactionMonthlyRollup')
+    rows = (
+        Transaction.objects.order_by()
+        .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+        .values('year', 'month', 'type', 'category', 'contribution_type', 'sponsor_id')
+        .annotate(total=Sum('amount'), count=Count('pk'))
+    )
+    TransactionMonthlyRollup.objects.bulk_create(
+        [
+            TransactionMonthlyRollup(
+                year=row['year'],
+                month=row['month'],
+                type=row['type'],
+                category=row['category'],
+                contribution_type=row['contribution_type'],
+                sponsor_id=row['sponsor_id'],
+                total=row['total'] or 0,
+                transaction_count=row['count'],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0006_transaction_contribution_type_transaction_sponsor_and_more'),
+        ('sponsors', '0002_remove_sponsor_active_remove_sponsor_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Año')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='Mes')),
+                ('type', models.CharField(choices=[('ingreso', 'Ingreso'), ('gasto', 'Gasto')], max_length=10, verbose_name='Tipo')),
+                ('category', models.CharField(choices=[('sponsor', 'Auspiciador'), ('evento', 'Evento'), ('donacion', 'Donación'), ('entrada', 'Entradas'), ('cuota', 'Cuota Social/Deportiva'), ('arriendo', 'Arriendo Gimnasio'), ('arbitraje', 'Pago Árbitros'), ('proveedor', 'Pago Proveedores'), ('cuerpo_tecnico', 'Cuerpo Técnico'), ('equipamiento', 'Equipamiento'), ('transporte', 'Transporte'), ('otros', 'Otros')], max_length=20, verbose_name='Categoría')),
+                ('contribution_type', models.CharField(choices=[('monetary', 'Monetario (Dinero)'), ('goods', 'Implementos / Especies / Servicios')], max_length=10, verbose_name='Tipo de Aporte')),
+                ('total', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='Total')),
+                ('transaction_count', models.PositiveIntegerField(default=0, verbose_name='Cantidad de Transacciones')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sponsor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='monthly_rollups', to='sponsors.sponsor', verbose_name='Auspiciador')),
+            ],
+            options={
+                'verbose_name': 'Resumen Mensual de Transacciones',
+                'verbose_name_plural': 'Resúmenes Mensuales de Transacciones',
+                'ordering': ['-year', '-month'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='transactionmonthlyrollup',
+            constraint=models.UniqueConstraint(fields=('year', 'month', 'type', 'category', 'contribution_type', 'sponsor'), name='finance_rollup_unique_bucket'),
+        ),
+        migrations.RunPython(build_rollup, migrations.RunPython.noop),
+    ]
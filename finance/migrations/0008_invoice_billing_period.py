@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-17 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0007_transactionmonthlyrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='billing_period',
+            field=models.CharField(blank=True, editable=False, max_length=7, null=True, verbose_name='Período de facturación'),
+        ),
+    ]
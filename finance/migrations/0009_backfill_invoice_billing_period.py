@@ -0,0 +1,51 @@
+from django.db import migrations
+
+
+def billing_period_for(period, due_date):
+    # Copia de FeeDefinition.billing_period_for (los modelos históricos no tienen métodos)
+    if period == 'mensual':
+        return f'{due_date.year:04d}-{due_date.month:02d}'
+    if period == 'anual':
+        return f'{due_date.year:04d}'
+    return 'unico'
+
+
+def backfill_billing_period(apps, schema_editor):
+    """
+    Asigna el período a las facturas existentes. Si ya hay duplicados para
+    (jugadora, cuota, período) solo la primera recibe el período; el resto
+    queda en NULL para no violar la restricción única y se puede revisar a mano.
+    """
+    Invoice = apps.get_model('finance', 'Invoice')
+    seen = set()
+    pending = []
+    invoices = (
+        Invoice.objects.filter(billing_period__isnull=True)
+        .select_related('fee_definition')
+        .order_by('player_id', 'fee_definition_id', 'pk')
+        .only('pk', 'player_id', 'due_date', 'fee_definition__period')
+    )
+    for invoice in invoices.iterator(chunk_size=2000):
+        key = billing_period_for(invoice.fee_definition.period, invoice.due_date)
+        identity = (invoice.player_id, invoice.fee_definition_id, key)
+        if invoice.player_id is not None and identity in seen:
+            continue
+        seen.add(identity)
+        invoice.billing_period = key
+        pending.append(invoice)
+        if len(pending) >= 1000:
+            Invoice.objects.bulk_update(pending, ['billing_period'])
+            pending = []
+    if pending:
+        Invoice.objects.bulk_update(pending, ['billing_period'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0008_invoice_billing_period'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_billing_period, migrations.RunPython.noop),
+    ]
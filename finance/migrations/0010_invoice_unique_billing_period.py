@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-17 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0009_backfill_invoice_billing_period'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='invoice',
+            constraint=models.UniqueConstraint(fields=('player', 'fee_definition', 'billing_period'), name='finance_invoice_unique_billing_period'),
+        ),
+    ]
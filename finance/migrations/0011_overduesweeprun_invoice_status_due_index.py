@@ -0,0 +1,36 @@
+# Generated by Django 5.0 on 2026-10-17 13:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0010_invoice_unique_billing_period'),
+        ('players', '0006_playerdocument'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OverdueSweepRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ran_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de ejecución')),
+                ('cutoff_date', models.DateField(verbose_name='Vencidas antes de')),
+                ('updated_count', models.PositiveIntegerField(default=0, verbose_name='Facturas marcadas como atrasadas')),
+                ('duration_ms', models.PositiveIntegerField(default=0, verbose_name='Duración (ms)')),
+                ('triggered_by', models.CharField(choices=[('command', 'Comando'), ('scheduler', 'Programador en proceso')], default='command', max_length=10, verbose_name='Origen')),
+            ],
+            options={
+                'verbose_name': 'Barrido de Facturas Atrasadas',
+                'verbose_name_plural': 'Barridos de Facturas Atrasadas',
+                'ordering': ['-ran_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['status', 'due_date'], name='finance_inv_status_due_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0 on 2026-10-17 13:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0011_overduesweeprun_invoice_status_due_index'),
+        ('players', '0006_playerdocument'),
+        ('sponsors', '0002_remove_sponsor_active_remove_sponsor_updated_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['player', 'status', 'due_date'], name='finance_inv_player_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', 'created_at'], name='finance_pay_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('status', 'pendiente')), fields=['paid_at'], name='finance_pay_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['type', 'date'], name='finance_tx_type_date_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-17 13:25
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0013_payment_proof_sizes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='payment_proof',
+            field=models.ImageField(max_length=255, null=True, storage=core.storage.dedup_storage, upload_to='payment_proofs/', verbose_name='Comprobante de Pago'),
+        ),
+    ]
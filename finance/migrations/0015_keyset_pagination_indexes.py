@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-17 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0014_dedup_storage_payment_proof'),
+        ('players', '0009_keyset_pagination_indexes'),
+        ('sponsors', '0003_sponsor_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['-date', '-id'], name='finance_tx_date_id_idx'),
+        ),
+    ]
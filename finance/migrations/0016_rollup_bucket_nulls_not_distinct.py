@@ -0,0 +1,22 @@
+# Generated by Django 5.0 on 2026-10-17 13:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0015_keyset_pagination_indexes'),
+        ('sponsors', '0003_sponsor_updated_at'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='transactionmonthlyrollup',
+            name='finance_rollup_unique_bucket',
+        ),
+        migrations.AddConstraint(
+            model_name='transactionmonthlyrollup',
+            constraint=models.UniqueConstraint(fields=('year', 'month', 'type', 'category', 'contribution_type', 'sponsor'), name='finance_rollup_unique_bucket', nulls_distinct=False),
+        ),
+    ]
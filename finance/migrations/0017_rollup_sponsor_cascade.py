@@ -0,0 +1,20 @@
+# Generated by Django 5.0 on 2026-10-17 14:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0016_rollup_bucket_nulls_not_distinct'),
+        ('sponsors', '0003_sponsor_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transactionmonthlyrollup',
+            name='sponsor',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to='sponsors.sponsor', verbose_name='Auspiciador'),
+        ),
+    ]
@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import models, transaction as db_transaction
+from django.utils.dateparse import parse_date
 from django.contrib.auth.models import User
 from players.models import Category, Player
 from decimal import Decimal
 from sponsors.models import Sponsor
+from core.storage import dedup_storage
 
 
 class FeeDefinition(models.Model):
@@ -29,6 +31,18 @@ class FeeDefinition(models.Model):
         category_name = self.category.name if self.category else 'General'
         return f'{self.name} - {category_name} (${self.amount})'
 
+    def billing_period_for(self, due_date):
+        """
+        Clave del período de facturación para una fecha de vencimiento:
+        'AAAA-MM' para cuotas mensuales, 'AAAA' para anuales y 'unico' para
+        pagos únicos (solo se cobran una vez por jugadora).
+        """
+        if self.period == 'mensual':
+            return f'{due_date.year:04d}-{due_date.month:02d}'
+        if self.period == 'anual':
+            return f'{due_date.year:04d}'
+        return 'unico'
+
 
 class Invoice(models.Model):
     """Facturas de cuotas"""
@@ -45,6 +59,9 @@ class Invoice(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Monto')
     due_date = models.DateField(verbose_name='Fecha de vencimiento')
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='pendiente', verbose_name='Estado') # Ajustado max_length
+    # Período que cubre la factura (ver FeeDefinition.billing_period_for).
+    # Garantiza una sola factura por jugadora, cuota y período.
+    billing_period = models.CharField(max_length=7, blank=True, null=True, editable=False, verbose_name='Período de facturación')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -52,6 +69,18 @@ class Invoice(models.Model):
         verbose_name = 'Factura'
         verbose_name_plural = 'Facturas'
         ordering = ['-due_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['player', 'fee_definition', 'billing_period'],
+                name='finance_invoice_unique_billing_period',
+            ),
+        ]
+        indexes = [
+            # Usado por el barrido de facturas atrasadas (status='pendiente' AND due_date < hoy)
+            models.Index(fields=['status', 'due_date'], name='finance_inv_status_due_idx'),
+            # Cuotas de las jugadoras de un apoderado filtradas por estado y vencimiento
+            models.Index(fields=['player', 'status', 'due_date'], name='finance_inv_player_status_idx'),
+        ]
 
     def __str__(self):
         player_name = f' - {self.player.get_full_name()}' if self.player else ''
@@ -63,9 +92,10 @@ class Invoice(models.Model):
         return self.due_date < date.today() and self.status == 'pendiente'
 
     def save(self, *args, **kwargs):
-        # Auto-actualizar estado si está atrasada (pero no si está en revisión o pagada)
-        if self.is_overdue and self.status == 'pendiente':
-            self.status = 'atrasada'
+        # El paso de 'pendiente' a 'atrasada' lo hace el barrido periódico
+        # (finance/overdue.py, comando mark_overdue_invoices), no el guardado.
+        if not self.billing_period and self.fee_definition_id and self.due_date:
+            self.billing_period = self.fee_definition.billing_period_for(self.due_date)
         super().save(*args, **kwargs)
 
 
@@ -95,6 +125,8 @@ class Payment(models.Model):
     # --- NUEVOS CAMPOS ---
     payment_proof = models.ImageField(
         upload_to='payment_proofs/', 
+        storage=dedup_storage,
+        max_length=255,
         null=True, 
         blank=False, # Requerido para este flujo
         verbose_name='Comprobante de Pago'
@@ -104,6 +136,9 @@ class Payment(models.Model):
         null=True, 
         verbose_name='Notas (Nro. Transacción)'
     )
+    # Tamaños del comprobante antes y después de comprimirlo (core.uploads)
+    proof_original_size = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name='Tamaño original (bytes)')
+    proof_stored_size = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name='Tamaño almacenado (bytes)')
     # --- FIN NUEVOS CAMPOS ---
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -113,10 +148,42 @@ class Payment(models.Model):
         verbose_name = 'Pago'
         verbose_name_plural = 'Pagos'
         ordering = ['-paid_at']
+        indexes = [
+            # Dashboard: pagos completados del mes
+            models.Index(fields=['status', 'created_at'], name='finance_pay_status_created_idx'),
+            # Cola de revisión (manage_pending_payments): solo pagos pendientes
+            models.Index(
+                fields=['paid_at'],
+                name='finance_pay_pending_idx',
+                condition=models.Q(status='pendiente'),
+            ),
+        ]
 
     def __str__(self):
         return f'Pago {self.id} - ${self.amount} ({self.get_status_display()})'
 
+class OverdueSweepRun(models.Model):
+    """Registro de cada ejecución del barrido de facturas atrasadas."""
+    TRIGGER_CHOICES = [
+        ('command', 'Comando'),
+        ('scheduler', 'Programador en proceso'),
+    ]
+
+    ran_at = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de ejecución')
+    cutoff_date = models.DateField(verbose_name='Vencidas antes de')
+    updated_count = models.PositiveIntegerField(default=0, verbose_name='Facturas marcadas como atrasadas')
+    duration_ms = models.PositiveIntegerField(default=0, verbose_name='Duración (ms)')
+    triggered_by = models.CharField(max_length=10, choices=TRIGGER_CHOICES, default='command', verbose_name='Origen')
+
+    class Meta:
+        verbose_name = 'Barrido de Facturas Atrasadas'
+        verbose_name_plural = 'Barridos de Facturas Atrasadas'
+        ordering = ['-ran_at']
+
+    def __str__(self):
+        return f'Barrido {self.ran_at:%d/%m/%Y %H:%M} - {self.updated_count} facturas ({self.duration_ms} ms)'
+
+
 class Transaction(models.Model):
     """
     Modelo para registrar transacciones financieras generales
@@ -189,9 +256,144 @@ class Transaction(models.Model):
         verbose_name = 'Transacción'
         verbose_name_plural = 'Transacciones'
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['type', 'date'], name='finance_tx_type_date_idx'),
+            # Paginación por cursor del listado de finanzas (core.pagination)
+            models.Index(fields=['-date', '-id'], name='finance_tx_date_id_idx'),
+        ]
 
     def __str__(self):
         prefix = ""
         if self.sponsor:
             prefix = f"[Sponsor: {self.sponsor.name}] "
-        return f"{prefix}[{self.get_type_display()}] {self.description} - ${self.amount}"
\ No newline at end of file
+        return f"{prefix}[{self.get_type_display()}] {self.description} - ${self.amount}"
+
+class TransactionMonthlyRollup(models.Model):
+    """
+    Resumen mensual materializado de Transaction, usado por los gráficos de
+    admin_finances. Se mantiene al día con señales (finance/signals.py) y se
+    puede reconstruir con el comando rebuild_finance_rollup.
+    """
+    year = models.PositiveSmallIntegerField(verbose_name='Año')
+    month = models.PositiveSmallIntegerField(verbose_name='Mes')
+    type = models.CharField(max_length=10, choices=Transaction.TYPE_CHOICES, verbose_name='Tipo')
+    category = models.CharField(max_length=20, choices=Transaction.CATEGORY_CHOICES, verbose_name='Categoría')
+    contribution_type = models.CharField(max_length=10, choices=Transaction.CONTRIBUTION_CHOICES, verbose_name='Tipo de Aporte')
+    # CASCADE: al borrar el auspiciador sus transacciones quedan sin sponsor y
+    # finance/signals.py recalcula los buckets de sponsor NULL de esos meses
+    sponsor = models.ForeignKey(
+        Sponsor,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name='Auspiciador',
+        related_name='monthly_rollups'
+    )
+    total = models.DecimalField(max_digits=14, decimal_places=0, default=0, verbose_name='Total')
+    transaction_count = models.PositiveIntegerField(default=0, verbose_name='Cantidad de Transacciones')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Campos que identifican un "bucket" del resumen
+    KEY_FIELDS = ('year', 'month', 'type', 'category', 'contribution_type', 'sponsor_id')
+
+    class Meta:
+        verbose_name = 'Resumen Mensual de Transacciones'
+        verbose_name_plural = 'Resúmenes Mensuales de Transacciones'
+        ordering = ['-year', '-month']
+        constraints = [
+            # nulls_distinct=False: la mayoría de los buckets no tienen auspiciador y,
+            # sin esto, PostgreSQL no impide duplicar los de sponsor NULL (PG15+)
+            models.UniqueConstraint(
+                fields=['year', 'month', 'type', 'category', 'contribution_type', 'sponsor'],
+                name='finance_rollup_unique_bucket',
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.month:02d}/{self.year} [{self.get_type_display()}] {self.get_category_display()} - ${self.total}'
+
+    @staticmethod
+    def key_for(transaction):
+        """Devuelve la clave del bucket al que pertenece una Transaction."""
+        tx_date = transaction.date
+        if isinstance(tx_date, str):
+            # add_transaction crea la transacción con la fecha tal como llega en el JSON
+            tx_date = parse_date(tx_date)
+        return (
+            tx_date.year,
+            tx_date.month,
+            transaction.type,
+            transaction.category,
+            transaction.contribution_type,
+            transaction.sponsor_id,
+        )
+
+    @classmethod
+    def refresh_bucket(cls, key):
+        """
+        Recalcula un único bucket a partir de las transacciones que le
+        corresponden. Es idempotente, por lo que sirve tanto para altas como
+        para ediciones (que pueden mover una transacción de bucket) y bajas.
+        """
+        year, month, type_, category, contribution_type, sponsor_id = key
+        lookup = {
+            'year': year,
+            'month': month,
+            'type': type_,
+            'category': category,
+            'contribution_type': contribution_type,
+            'sponsor_id': sponsor_id,
+        }
+        source = Transaction.objects.filter(
+            date__year=year,
+            date__month=month,
+            type=type_,
+            category=category,
+            contribution_type=contribution_type,
+            sponsor_id=sponsor_id,
+        )
+
+        with db_transaction.atomic():
+            # Se bloquea (o crea) la fila del bucket antes de sumar: dos guardados
+            # concurrentes del mismo bucket se serializan y el segundo suma ya con
+            # la transacción del primero, en vez de borrar y crear en paralelo.
+            bucket, _ = cls.objects.select_for_update().get_or_create(**lookup)
+            totals = source.aggregate(total=models.Sum('amount'), count=models.Count('pk'))
+            if not totals['count']:
+                bucket.delete()
+                return
+            bucket.total = totals['total'] or 0
+            bucket.transaction_count = totals['count']
+            bucket.save(update_fields=['total', 'transaction_count', 'updated_at'])
+
+    @classmethod
+    def rebuild(cls):
+        """Reconstruye todo el resumen desde cero. Devuelve la cantidad de buckets."""
+        from django.db.models.functions import ExtractMonth, ExtractYear
+
+        rows = (
+            Transaction.objects.order_by()
+            .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+            .values('year', 'month', 'type', 'category', 'contribution_type', 'sponsor_id')
+            .annotate(total=models.Sum('amount'), count=models.Count('pk'))
+        )
+        with db_transaction.atomic():
+            cls.objects.all().delete()
+            created = cls.objects.bulk_create(
+                [
+                    cls(
+                        year=row['year'],
+                        month=row['month'],
+                        type=row['type'],
+                        category=row['category'],
+                        contribution_type=row['contribution_type'],
+                        sponsor_id=row['sponsor_id'],
+                        total=row['total'] or 0,
+                        transaction_count=row['count'],
+                    )
+                    for row in rows
+                ],
+                batch_size=1000,
+            )
+        return len(created)
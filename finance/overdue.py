@@ -0,0 +1,101 @@
+"""
+Barrido de facturas atrasadas.
+
+Todas las facturas 'pendiente' con fecha de vencimiento pasada se mueven a
+'atrasada' con un único UPDATE (apoyado en el índice status + due_date), de
+modo que el resto de las vistas puede filtrar por estado con una simple
+igualdad.
+
+Por defecto cada proceso web lanza el programador en un hilo
+(``OVERDUE_SWEEP_INTERVAL``). Con varios workers de gunicorn todos lo
+lanzan, pero solo uno barre por intervalo: el barrido programado toma un
+advisory lock de PostgreSQL y se salta si otro proceso barrió hace poco.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import Invoice, OverdueSweepRun
+
+logger = logging.getLogger(__name__)
+
+_scheduler_lock = threading.Lock()
+_scheduler_thread = None
+
+# Clave del advisory lock del barrido programado (cualquier entero fijo del proyecto)
+SWEEP_LOCK_ID = 7_341_001
+
+
+def mark_overdue_invoices(today=None, triggered_by='command'):
+    """Marca como atrasadas las facturas vencidas y registra la ejecución."""
+    today = today or timezone.localdate()
+    started = time.perf_counter()
+    updated = Invoice.objects.filter(status='pendiente', due_date__lt=today).update(
+        status='atrasada', updated_at=timezone.now()
+    )
+    duration_ms = int((time.perf_counter() - started) * 1000)
+    return OverdueSweepRun.objects.create(
+        cutoff_date=today,
+        updated_count=updated,
+        duration_ms=duration_ms,
+        triggered_by=triggered_by,
+    )
+
+
+def _try_sweep_lock():
+    """Advisory lock de la transacción en curso (solo PostgreSQL; SQLite serializa las escrituras)."""
+    if connection.vendor != 'postgresql':
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_xact_lock(%s)', [SWEEP_LOCK_ID])
+        return cursor.fetchone()[0]
+
+
+def run_scheduled_sweep(interval):
+    """
+    Barrido del programador: lo ejecuta un solo proceso a la vez y solo si
+    nadie barrió en el último intervalo. Devuelve el registro o None.
+    """
+    with transaction.atomic():
+        if not _try_sweep_lock():
+            return None
+        last_run = OverdueSweepRun.objects.filter(triggered_by='scheduler').values_list('ran_at', flat=True).first()
+        # Margen del 10% para que los workers no se salten un intervalo por segundos
+        if last_run and timezone.now() - last_run < timedelta(seconds=interval * 0.9):
+            return None
+        return mark_overdue_invoices(triggered_by='scheduler')
+
+
+def _run_periodically(interval):
+    while True:
+        close_old_connections()
+        try:
+            run = run_scheduled_sweep(interval)
+            if run and run.updated_count:
+                logger.info('Barrido de atrasadas: %s facturas en %s ms', run.updated_count, run.duration_ms)
+        except Exception:
+            logger.exception('Error en el barrido periódico de facturas atrasadas')
+        finally:
+            close_old_connections()
+        time.sleep(interval)
+
+
+def start_overdue_scheduler(interval):
+    """
+    Lanza (una sola vez por proceso) un hilo daemon que ejecuta el barrido
+    cada ``interval`` segundos. Con ``interval`` <= 0 no hace nada.
+    """
+    global _scheduler_thread
+    if interval <= 0:
+        return None
+    with _scheduler_lock:
+        if _scheduler_thread is None:
+            _scheduler_thread = threading.Thread(
+                target=_run_periodically, args=(interval,), name='overdue-invoice-sweeper', daemon=True
+            )
+            _scheduler_thread.start()
+    return _scheduler_thread
@@ -0,0 +1,53 @@
+from django.db.models.signals import pre_delete, pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from sponsors.models import Sponsor
+
+from .models import Transaction, TransactionMonthlyRollup
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_rollup_key(sender, instance, raw=False, **kwargs):
+    """Guarda el bucket anterior por si la edición cambia fecha, tipo, etc."""
+    instance._previous_rollup_key = None
+    if raw or not instance.pk:
+        return
+    previous = Transaction.objects.filter(pk=instance.pk).only(
+        'date', 'type', 'category', 'contribution_type', 'sponsor'
+    ).first()
+    if previous:
+        instance._previous_rollup_key = TransactionMonthlyRollup.key_for(previous)
+
+
+@receiver(post_save, sender=Transaction)
+def update_rollup_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    key = TransactionMonthlyRollup.key_for(instance)
+    TransactionMonthlyRollup.refresh_bucket(key)
+    previous_key = getattr(instance, '_previous_rollup_key', None)
+    if previous_key and previous_key != key:
+        TransactionMonthlyRollup.refresh_bucket(previous_key)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    TransactionMonthlyRollup.refresh_bucket(TransactionMonthlyRollup.key_for(instance))
+
+
+@receiver(pre_delete, sender=Sponsor)
+def remember_sponsor_rollup_keys(sender, instance, **kwargs):
+    """
+    Al borrar un auspiciador sus transacciones pasan a sponsor NULL (SET_NULL) y
+    sus buckets se borran (CASCADE): se anotan los buckets NULL que hay que recalcular.
+    """
+    instance._rollup_keys = [
+        (*key, None)
+        for key in instance.monthly_rollups.values_list('year', 'month', 'type', 'category', 'contribution_type')
+    ]
+
+
+@receiver(post_delete, sender=Sponsor)
+def merge_sponsor_rollups(sender, instance, **kwargs):
+    for key in getattr(instance, '_rollup_keys', []):
+        TransactionMonthlyRollup.refresh_bucket(key)
@@ -1,3 +1,153 @@
+import csv
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
 from django.test import TestCase
+from django.utils import timezone
+
+from players.models import Category, GuardianPlayer, Player
+from sponsors.models import Sponsor
+
+from .billing import apply_fee_assignment, generate_monthly_invoices, plan_fee_assignment
+from .exports import EXPORTS, stream_csv
+from .models import FeeDefinition, Invoice, OverdueSweepRun, Transaction, TransactionMonthlyRollup
+from .overdue import run_scheduled_sweep
+
+
+class BillingTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Sub-14')
+        self.guardian = User.objects.create_user('apoderado', 'apoderado@example.com', 'x')
+        self.players = [
+            Player.objects.create(first_name=f'Jugadora{i}', last_name='Test', birthdate=date(2011, 1, 1), category=self.category)
+            for i in range(3)
+        ]
+        for player in self.players:
+            GuardianPlayer.objects.create(guardian=self.guardian, player=player, relation='madre')
+        self.monthly = FeeDefinition.objects.create(name='Mensualidad', amount=10000, period='mensual', category=self.category)
+
+    def test_generating_the_same_month_twice_creates_no_duplicates(self):
+        first = generate_monthly_invoices(year=2024, month=3)
+        second = generate_monthly_invoices(year=2024, month=3)
+
+        self.assertEqual((first.created, second.created, second.skipped), (3, 0, 3))
+        self.assertEqual(Invoice.objects.filter(billing_period='2024-03').count(), 3)
+
+    def test_rows_lost_to_the_unique_constraint_are_not_counted_as_created(self):
+        generate_monthly_invoices(year=2024, month=3)
+        # Simula una corrida concurrente que no vio las facturas de la primera
+        with mock.patch('finance.billing.billed_pairs', return_value=set()):
+            result = generate_monthly_invoices(year=2024, month=3)
+
+        self.assertEqual((result.created, result.fees[0].already_billed), (0, 3))
+        self.assertEqual(Invoice.objects.count(), 3)
+
+    def test_plan_excludes_players_already_invoiced_in_the_period(self):
+        Invoice.objects.create(guardian=self.guardian, player=self.players[0], fee_definition=self.monthly,
+                               amount=10000, due_date=date(2024, 3, 10))
+
+        plan = plan_fee_assignment(self.monthly, self.category, date(2024, 3, 25))
+
+        self.assertEqual(set(plan.targets), {self.players[1].pk, self.players[2].pk})
+        self.assertEqual(plan.already_invoiced, 1)
+
+    def test_applying_the_same_plan_twice_creates_the_invoices_once(self):
+        plan = plan_fee_assignment(self.monthly, self.category, date(2024, 3, 10))
+
+        self.assertEqual(apply_fee_assignment(plan), 3)
+        self.assertEqual(apply_fee_assignment(plan), 0)
+        self.assertEqual(Invoice.objects.count(), 3)
+
+    def test_duplicate_billing_period_insert_fails(self):
+        fields = {'guardian': self.guardian, 'player': self.players[0], 'fee_definition': self.monthly, 'amount': 10000}
+        Invoice.objects.create(**fields, due_date=date(2024, 3, 10))
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Invoice.objects.create(**fields, due_date=date(2024, 3, 28))
+
+
+class ScheduledOverdueSweepTests(TestCase):
+    def setUp(self):
+        guardian = User.objects.create_user('apoderado', 'apoderado@example.com', 'x')
+        fee = FeeDefinition.objects.create(name='Mensualidad', amount=10000, period='mensual')
+        self.invoice = Invoice.objects.create(guardian=guardian, fee_definition=fee, amount=10000,
+                                              due_date=timezone.localdate() - timedelta(days=3))
+
+    def test_sweeps_once_per_interval(self):
+        run = run_scheduled_sweep(interval=3600)
+
+        self.assertEqual(run.updated_count, 1)
+        self.invoice.refresh_from_db()
+        self.assertEqual(self.invoice.status, 'atrasada')
+        # Otro worker dentro del mismo intervalo no vuelve a barrer
+        self.assertIsNone(run_scheduled_sweep(interval=3600))
+        self.assertEqual(OverdueSweepRun.objects.count(), 1)
+
+    def test_sweeps_again_once_the_interval_has_passed(self):
+        run = run_scheduled_sweep(interval=3600)
+        OverdueSweepRun.objects.filter(pk=run.pk).update(ran_at=timezone.now() - timedelta(hours=1))
+
+        self.assertIsNotNone(run_scheduled_sweep(interval=3600))
+        self.assertEqual(OverdueSweepRun.objects.count(), 2)
+
+    def test_skips_when_another_process_holds_the_lock(self):
+        with mock.patch('finance.overdue._try_sweep_lock', return_value=False):
+            self.assertIsNone(run_scheduled_sweep(interval=3600))
+
+        self.assertFalse(OverdueSweepRun.objects.exists())
+        self.invoice.refresh_from_db()
+        self.assertEqual(self.invoice.status, 'pendiente')
+
+
+class TransactionMonthlyRollupTests(TestCase):
+    def _transaction(self, amount, sponsor=None, day=10):
+        return Transaction.objects.create(
+            type='ingreso', category='sponsor', description='Aporte', amount=amount,
+            date=date(2024, 3, day), sponsor=sponsor,
+        )
+
+    def _buckets(self):
+        return list(TransactionMonthlyRollup.objects.values_list('sponsor_id', 'total', 'transaction_count'))
+
+    def test_deleting_sponsor_merges_its_buckets_into_the_null_sponsor_bucket(self):
+        sponsor = Sponsor.objects.create(name='Ferretería')
+        self._transaction(1000)
+        self._transaction(500, sponsor=sponsor)
+
+        sponsor.delete()
+        self.assertEqual(self._buckets(), [(None, 1500, 2)])
+
+        # Guardar otra transacción del mismo mes refresca el bucket sin duplicados
+        self._transaction(250, day=20)
+        self.assertEqual(self._buckets(), [(None, 1750, 3)])
+
+
+class CsvExportTests(TestCase):
+    def _export(self, dataset, params=None):
+        lines = ''.join(stream_csv(EXPORTS[dataset], params or {})).lstrip('\ufeff').splitlines()
+        return list(csv.reader(lines))
+
+    def test_text_cells_that_look_like_formulas_are_neutralised(self):
+        for i, description in enumerate(['=HYPERLINK("http://x")', '+1+1', '-2', '@SUM(A1)', '\tcmd', 'Rifa']):
+            Transaction.objects.create(type='ingreso', category='evento', description=description,
+                                       amount=1000, date=date(2024, 3, i + 1))
+
+        header, *rows = self._export('transactions')
+        column = header.index('Descripción')
+
+        self.assertEqual(
+            [row[column] for row in rows],
+            ['Rifa', "'\tcmd", "'@SUM(A1)", "'-2", "'+1+1", '\'=HYPERLINK("http://x")'],
+        )
+
+    def test_numbers_and_choice_labels_are_written_as_is(self):
+        Transaction.objects.create(type='gasto', category='arriendo', description='Cancha', amount=-5000,
+                                   date=date(2024, 3, 1))
+
+        header, row = self._export('transactions')
 
-# Create your tests here.
+        self.assertEqual(Decimal(row[header.index('Monto')]), -5000)
+        self.assertEqual(row[header.index('Tipo')], dict(Transaction.TYPE_CHOICES)['gasto'])
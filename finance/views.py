@@ -1,7 +1,7 @@
 from django.shortcuts import redirect, render
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum
-from .models import Payment, Invoice
+from .models import Payment
+from core.stats import get_dashboard_stats
 from users.admin_views import is_admin # Reutilizamos la función de validación
 
 @login_required
@@ -12,14 +12,13 @@ def financial_report_view(request):
     if not is_admin(request.user):
         return redirect('pages:landing')
 
-    total_income = Payment.objects.filter(status='completado').aggregate(total=Sum('amount'))['total'] or 0
-    pending_amount = Invoice.objects.filter(status__in=['pendiente', 'atrasada']).aggregate(total=Sum('amount'))['total'] or 0
+    stats = get_dashboard_stats()
     
     recent_payments = Payment.objects.filter(status='completado').order_by('-paid_at')[:20]
 
     context = {
-        'total_income': total_income,
-        'pending_amount': pending_amount,
+        'total_income': stats.total_funds,
+        'pending_amount': stats.total_outstanding_quotas,
         'recent_payments': recent_payments,
     }
     return render(request, 'finance/financial_report.html', context)
\ No newline at end of file
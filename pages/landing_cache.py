@@ -0,0 +1,47 @@
+"""
+Caché del contexto de la landing page.
+
+El contexto se arma una sola vez como una "foto" serializable (listas de
+instancias ya evaluadas y enteros) y se guarda en la caché por un TTL corto
+(``LANDING_CACHE_TIMEOUT``). Los signals de ``pages.signals`` la invalidan
+cuando cambia cualquiera de los modelos que aparecen en la portada, por lo
+que una visita con la caché caliente no hace consultas a la base de datos.
+"""
+from django.conf import settings
+from django.utils import timezone
+
+from core.cache import get_or_build, invalidate_namespace, register_namespace
+from players.models import Category, Player
+from schedules.models import Activity, Match
+from sponsors.models import Sponsor
+from .models import LandingEvent, LandingNews
+
+LANDING_NAMESPACE = register_namespace('landing', 'Contexto de la landing page')
+
+
+def build_landing_context():
+    """Consulta y materializa todo el contexto de la landing."""
+    now = timezone.now()
+    return {
+        'recent_matches': list(Match.objects.filter(starts_at__gte=now).order_by('starts_at')[:3]),
+        'recent_activities': list(Activity.objects.filter(starts_at__gte=now).order_by('starts_at')[:3]),
+        'sponsors': list(Sponsor.objects.filter(is_visible=True)[:6]),
+        'total_players': Player.objects.count(),
+        'total_categories': Category.objects.count(),
+        'latest_news': list(LandingNews.objects.all()[:3]),
+        'upcoming_events': list(LandingEvent.objects.filter(date__gte=now).order_by('date')[:5]),
+        'featured_players': list(Player.objects.filter(is_featured=True)[:4]),
+    }
+
+
+def get_landing_context():
+    """Devuelve el contexto desde la caché, reconstruyéndolo si expiró o fue invalidado."""
+    return get_or_build(
+        LANDING_NAMESPACE, 'context',
+        builder=build_landing_context,
+        timeout=settings.LANDING_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_landing_cache():
+    invalidate_namespace(LANDING_NAMESPACE)
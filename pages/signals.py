@@ -0,0 +1,39 @@
+"""Invalidación de la caché de la landing cuando cambia su contenido."""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from players.models import Category, Player
+from schedules.models import Activity, Match
+from sponsors.models import Sponsor
+from .landing_cache import invalidate_landing_cache
+from .models import LandingEvent, LandingNews
+
+LANDING_MODELS = (LandingNews, LandingEvent, Sponsor, Match, Activity, Category)
+
+
+def _invalidate(sender, **kwargs):
+    invalidate_landing_cache()
+
+
+for model in LANDING_MODELS:
+    post_save.connect(_invalidate, sender=model, dispatch_uid=f'landing_cache_save_{model.__name__}')
+    post_delete.connect(_invalidate, sender=model, dispatch_uid=f'landing_cache_delete_{model.__name__}')
+
+
+@receiver(pre_save, sender=Player)
+def remember_featured(sender, instance, **kwargs):
+    """Guarda si la jugadora era destacada antes de la edición."""
+    instance._was_featured = bool(instance.pk) and sender.objects.filter(pk=instance.pk, is_featured=True).exists()
+
+
+@receiver(post_save, sender=Player)
+def player_saved(sender, instance, created, **kwargs):
+    # Las altas cambian el total de jugadoras; las ediciones solo importan si
+    # la jugadora es (o era) destacada.
+    if created or instance.is_featured or getattr(instance, '_was_featured', False):
+        invalidate_landing_cache()
+
+
+@receiver(post_delete, sender=Player)
+def player_deleted(sender, instance, **kwargs):
+    invalidate_landing_cache()
@@ -1,3 +1,49 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.contrib.messages import constants
+from django.contrib.messages.storage.base import Message
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.http import HttpRequest, HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from core.tests import PLAIN_STATIC_STORAGES
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGES)
+class ConditionalPageTests(TestCase):
+    url = reverse('pages:teams')
+
+    def _revalidate(self):
+        etag = self.client.get(self.url)['ETag']
+        return self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+    def _queue_message(self, text):
+        # Lo que deja un messages.success() antes de un redirect: la cookie de mensajes
+        storage = CookieStorage(HttpRequest())
+        storage.add(constants.SUCCESS, text)
+        response = HttpResponse()
+        storage.update(response)
+        self.client.cookies['messages'] = response.cookies['messages'].value
+
+    def test_anonymous_visitor_gets_304_for_an_unchanged_page(self):
+        self.assertEqual(self._revalidate().status_code, 304)
+
+    def test_pending_messages_are_rendered_instead_of_304(self):
+        etag = self.client.get(self.url)['ETag']
+        self._queue_message('Solicitud enviada')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Solicitud enviada')
+        # Una vez mostrados, la página vuelve a responder 304
+        self.assertEqual(self._revalidate().status_code, 304)
+
+    def test_authenticated_users_always_get_the_full_page(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_login(User.objects.create_user('apoderado', 'apoderado@example.com', 'x'))
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
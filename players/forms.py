@@ -1,5 +1,6 @@
 from django import forms
 from .models import Player, PlayerDocument
+from core.uploads import UploadRejected, document_rule, process_upload
 
 
 class PlayerForm(forms.ModelForm):
@@ -77,4 +78,14 @@ class PlayerDocumentForm(forms.ModelForm):
         widgets = {
             'title': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Ej: Permiso de Imagen 2025'}),
             'file': forms.FileInput(attrs={'class': 'form-control'}),
-        }
\ No newline at end of file
+        }
+
+    def clean_file(self):
+        # Valida el tipo real y comprime las imágenes antes de guardarlas
+        try:
+            processed = process_upload(self.cleaned_data['file'], document_rule())
+        except UploadRejected as e:
+            raise forms.ValidationError(str(e))
+        self.instance.original_size = processed.original_size
+        self.instance.stored_size = processed.stored_size
+        return processed.file
\ No newline at end of file
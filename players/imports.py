@@ -0,0 +1,403 @@
+"""
+Importación masiva de jugadoras y apoderados desde un CSV.
+
+Todo el archivo se valida en memoria antes de escribir: las categorías, los
+RUT existentes y los apoderados ya registrados se resuelven con una consulta
+``__in`` cada uno (no una por fila). Si alguna fila tiene errores no se
+guarda nada y se devuelve el detalle por fila; si todo es válido, las
+jugadoras, usuarios, perfiles de apoderado y vínculos se insertan con
+``bulk_create``/``bulk_update`` dentro de una sola transacción.
+
+Las jugadoras cuyo RUT ya existe se actualizan con los datos del archivo; el
+resto se crean. Los apoderados se identifican por email (que es también su
+nombre de usuario) sin distinguir mayúsculas; los nuevos se guardan en
+minúsculas, quedan activos y sin contraseña, y la definen con la
+recuperación de contraseña.
+"""
+import csv
+import io
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from pages.landing_cache import invalidate_landing_cache
+from users.models import GuardianProfile
+from .models import Category, GuardianPlayer, Player
+
+# Columnas reconocidas del CSV: {encabezado: descripción}
+IMPORT_COLUMNS = {
+    'nombre': 'Nombre de la jugadora',
+    'apellido': 'Apellido de la jugadora',
+    'rut': 'RUT (opcional; si ya existe se actualiza la ficha)',
+    'fecha_nacimiento': 'AAAA-MM-DD o DD/MM/AAAA',
+    'categoria': 'Nombre exacto de la categoría',
+    'posicion': 'Base, Escolta, Alero, Ala-Pívot o Pívot (opcional)',
+    'estado': 'Activo, Inactivo o Lesionado (por defecto Activo)',
+    'email_jugadora': 'Opcional',
+    'telefono_jugadora': 'Opcional',
+    'estatura': 'En cm, opcional',
+    'apoderado_email': 'Email del apoderado (opcional)',
+    'apoderado_nombre': 'Nombre del apoderado',
+    'apoderado_apellido': 'Apellido del apoderado',
+    'apoderado_telefono': 'Teléfono del apoderado',
+    'apoderado_direccion': 'Dirección del apoderado',
+    'relacion': 'Padre, Madre, Tutor/a, Abuelo/a u Otro (por defecto Tutor/a)',
+}
+REQUIRED_COLUMNS = ('nombre', 'apellido', 'fecha_nacimiento', 'categoria')
+
+# Campos de Player que se copian desde el CSV (y que se actualizan si el RUT ya existe)
+PLAYER_FIELDS = (
+    'first_name', 'last_name', 'birthdate', 'category', 'position', 'status',
+    'player_email', 'player_phone', 'height',
+)
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y')
+
+
+class ImportFileError(ValueError):
+    """El archivo no se puede leer como CSV de importación (encabezados, codificación, tamaño)."""
+
+
+@dataclass
+class RowError:
+    line: int
+    messages: list
+
+
+@dataclass
+class ImportRow:
+    line: int
+    player: Player
+    guardian_email: str = ''
+    guardian: dict = field(default_factory=dict)
+    relation: str = 'tutor'
+
+
+@dataclass
+class ImportPlan:
+    """Resultado de validar el archivo: filas listas para guardar o errores por fila."""
+    rows: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    guardians_existing: dict = field(default_factory=dict)   # {email: User}
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+    @property
+    def players_to_create(self):
+        return sum(1 for row in self.rows if row.player.pk is None)
+
+    @property
+    def players_to_update(self):
+        return sum(1 for row in self.rows if row.player.pk is not None)
+
+    @property
+    def guardians_to_create(self):
+        emails = {row.guardian_email for row in self.rows if row.guardian_email}
+        return len(emails - set(self.guardians_existing))
+
+
+@dataclass
+class ImportResult:
+    players_created: int = 0
+    players_updated: int = 0
+    guardians_created: int = 0
+    links_created: int = 0
+
+
+def normalize_rut(value):
+    """'12.345.678-k' -> '12345678-K' (None si no tiene forma de RUT)."""
+    raw = value.replace('.', '').replace('-', '').replace(' ', '').upper()
+    if len(raw) < 2 or not raw[:-1].isdigit() or raw[-1] not in '0123456789K':
+        return None
+    return f'{raw[:-1]}-{raw[-1]}'
+
+
+def rut_is_valid(rut):
+    """Verifica el dígito verificador (módulo 11) de un RUT normalizado."""
+    body, dv = rut.split('-')
+    total, factor = 0, 2
+    for digit in reversed(body):
+        total += int(digit) * factor
+        factor = 2 if factor == 7 else factor + 1
+    expected = 11 - total % 11
+    return dv == {10: 'K', 11: '0'}.get(expected, str(expected))
+
+
+def format_rut(rut):
+    """'12345678-K' -> '12.345.678-K', el formato que se muestra en los formularios."""
+    body, dv = rut.split('-')
+    return f"{int(body):,}".replace(',', '.') + f'-{dv}'
+
+
+def rut_variants(rut):
+    """Formas en que un RUT normalizado puede estar guardado: con y sin puntos."""
+    variants = {rut, format_rut(rut)}
+    return variants | {variant.lower() for variant in variants}
+
+
+def _parse_date(value):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_choice(value, choices, default=None):
+    """Acepta la clave o la etiqueta (sin distinguir mayúsculas) de un choice."""
+    if not value:
+        return default
+    lookup = value.strip().lower()
+    for key, label in choices:
+        if lookup in (key.lower(), label.lower()):
+            return key
+    raise ValueError(f"'{value}' no es válido. Opciones: {', '.join(label for _, label in choices)}.")
+
+
+def read_csv(fileobj, max_rows=None):
+    """
+    Lee el CSV (UTF-8, con o sin BOM; separado por coma o punto y coma) y
+    devuelve ``[(línea, {columna: valor})]``.
+    """
+    raw = fileobj.read()
+    if isinstance(raw, bytes):
+        try:
+            raw = raw.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raw = raw.decode('latin-1')  # Excel en Windows guarda en ANSI por defecto
+    raw = raw.lstrip('\ufeff')
+    if not raw.strip():
+        raise ImportFileError('El archivo está vacío.')
+
+    first_line = raw.split('\n', 1)[0]
+    delimiter = ';' if first_line.count(';') > first_line.count(',') else ','
+    reader = csv.DictReader(io.StringIO(raw), delimiter=delimiter)
+    headers = [(h or '').strip().lower() for h in reader.fieldnames or []]
+    missing = [column for column in REQUIRED_COLUMNS if column not in headers]
+    if missing:
+        raise ImportFileError(f"Faltan columnas obligatorias: {', '.join(missing)}.")
+    reader.fieldnames = headers
+
+    rows = []
+    for record in reader:
+        values = {key: (value or '').strip() for key, value in record.items() if key in IMPORT_COLUMNS}
+        if not any(values.values()):
+            continue
+        rows.append((reader.line_num, values))
+        if max_rows and len(rows) > max_rows:
+            raise ImportFileError(f'El archivo supera el máximo de {max_rows} filas por importación.')
+    if not rows:
+        raise ImportFileError('El archivo no tiene filas de datos.')
+    return rows
+
+
+def plan_import(fileobj, max_rows=None):
+    """
+    Valida el archivo completo y arma las instancias a guardar, sin escribir
+    en la base de datos. Lanza ``ImportFileError`` si el archivo no se puede leer.
+    """
+    records = read_csv(fileobj, max_rows=max_rows)
+    plan = ImportPlan()
+
+    # Resolución en bloque: una consulta por tipo de dato, no por fila
+    category_names = {values.get('categoria', '') for _, values in records} - {''}
+    categories = {c.name.lower(): c for c in Category.objects.filter(name__in=category_names)}
+    if len(categories) < len(category_names):
+        # Segunda oportunidad sin distinguir mayúsculas (las categorías son pocas)
+        categories.update({c.name.lower(): c for c in Category.objects.all()})
+
+    ruts = {}
+    for _, values in records:
+        rut = normalize_rut(values.get('rut', '')) if values.get('rut') else None
+        if rut:
+            ruts.setdefault(rut, rut_variants(rut))
+    stored_variants = {variant for variants in ruts.values() for variant in variants}
+    existing_players = {}
+    for player in Player.objects.filter(rut__in=stored_variants):
+        existing_players[normalize_rut(player.rut)] = player
+
+    # Sin distinguir mayúsculas (como __iexact, pero con un solo IN para todo el archivo):
+    # 'Ana@Mail.cl' registrada a mano es el mismo apoderado que 'ana@mail.cl' del CSV
+    emails = {values.get('apoderado_email', '').strip().lower() for _, values in records} - {''}
+    users = (
+        User.objects.annotate(username_lower=Lower('username'), email_lower=Lower('email'))
+        .filter(Q(username_lower__in=emails) | Q(email_lower__in=emails))
+        .select_related('guardian_profile').order_by('pk')
+    )
+    for user in users:
+        for key in (user.username.lower(), (user.email or '').lower()):
+            if key in emails:
+                plan.guardians_existing.setdefault(key, user)
+
+    seen_ruts = {}
+    for line, values in records:
+        errors = []
+
+        def value(column):
+            return values.get(column, '')
+
+        for column in REQUIRED_COLUMNS:
+            if not value(column):
+                errors.append(f"'{column}' es obligatorio.")
+
+        birthdate = _parse_date(value('fecha_nacimiento')) if value('fecha_nacimiento') else None
+        if value('fecha_nacimiento') and birthdate is None:
+            errors.append(f"Fecha de nacimiento '{value('fecha_nacimiento')}' no válida (usa AAAA-MM-DD o DD/MM/AAAA).")
+
+        category = categories.get(value('categoria').lower()) if value('categoria') else None
+        if value('categoria') and category is None:
+            errors.append(f"La categoría '{value('categoria')}' no existe.")
+
+        rut = None
+        if value('rut'):
+            rut = normalize_rut(value('rut'))
+            if rut is None or not rut_is_valid(rut):
+                errors.append(f"RUT '{value('rut')}' no válido.")
+                rut = None
+            elif rut in seen_ruts:
+                errors.append(f'El RUT {rut} está repetido en el archivo (línea {seen_ruts[rut]}).')
+            else:
+                seen_ruts[rut] = line
+
+        data = {}
+        try:
+            data['position'] = _parse_choice(value('posicion'), Player.POSITION_CHOICES)
+        except ValueError as e:
+            errors.append(f'Posición {e}')
+        try:
+            data['status'] = _parse_choice(value('estado'), Player.STATUS_CHOICES)
+        except ValueError as e:
+            errors.append(f'Estado {e}')
+        try:
+            relation = _parse_choice(value('relacion'), GuardianPlayer.RELATION_CHOICES, default='tutor')
+        except ValueError as e:
+            errors.append(f'Relación {e}')
+            relation = 'tutor'
+        try:
+            data['height'] = Decimal(value('estatura').replace(',', '.')) if value('estatura') else None
+        except InvalidOperation:
+            errors.append(f"Estatura '{value('estatura')}' no es un número.")
+
+        guardian_email = value('apoderado_email').lower()
+        if guardian_email:
+            try:
+                validate_email(guardian_email)
+            except ValidationError:
+                errors.append(f"Email de apoderado '{guardian_email}' no válido.")
+                guardian_email = ''
+            if guardian_email and guardian_email not in plan.guardians_existing and not value('apoderado_nombre'):
+                errors.append("'apoderado_nombre' es obligatorio para crear un apoderado nuevo.")
+
+        player = existing_players.get(rut) if rut else None
+        if player is None:
+            player = Player(rut=rut and format_rut(rut))
+        player.first_name = value('nombre')
+        player.last_name = value('apellido')
+        player.birthdate = birthdate
+        if category is not None:
+            player.category = category
+        player.player_email = value('email_jugadora') or player.player_email
+        player.player_phone = value('telefono_jugadora') or player.player_phone
+        # Las columnas opcionales vacías no borran lo que ya tenía la ficha
+        for name, parsed in data.items():
+            if parsed is not None:
+                setattr(player, name, parsed)
+
+        if not errors:
+            # Validaciones de campo del modelo (largos, email, decimales) sin las
+            # consultas de full_clean(): unicidad y límite de destacadas
+            try:
+                player.clean_fields(exclude=['photo', 'category'])
+            except ValidationError as e:
+                for field_name, field_errors in e.message_dict.items():
+                    label = Player._meta.get_field(field_name).verbose_name
+                    errors.extend(f'{label}: {message}' for message in field_errors)
+
+        if errors:
+            plan.errors.append(RowError(line=line, messages=errors))
+            continue
+        plan.rows.append(ImportRow(
+            line=line, player=player, guardian_email=guardian_email, relation=relation,
+            guardian={
+                'first_name': value('apoderado_nombre'),
+                'last_name': value('apoderado_apellido'),
+                'phone': value('apoderado_telefono'),
+                'address': value('apoderado_direccion'),
+            },
+        ))
+    return plan
+
+
+def apply_import(plan, batch_size=500):
+    """Guarda un plan válido en una sola transacción. Devuelve un ``ImportResult``."""
+    if not plan.is_valid:
+        raise ValueError('El plan de importación tiene errores; no se guarda nada.')
+    result = ImportResult()
+    now = timezone.now()
+
+    with transaction.atomic():
+        # 1. Apoderados nuevos (usuario + perfil) y perfiles faltantes de usuarios existentes
+        guardians = dict(plan.guardians_existing)
+        new_users = {}
+        for row in plan.rows:
+            if row.guardian_email and row.guardian_email not in guardians and row.guardian_email not in new_users:
+                user = User(
+                    username=row.guardian_email, email=row.guardian_email,
+                    first_name=row.guardian['first_name'], last_name=row.guardian['last_name'],
+                    is_active=True,
+                )
+                user.set_unusable_password()
+                new_users[row.guardian_email] = user
+        User.objects.bulk_create(new_users.values(), batch_size=batch_size)
+        guardians.update(new_users)
+        result.guardians_created = len(new_users)
+
+        profiles = {}
+        for row in plan.rows:
+            user = guardians.get(row.guardian_email)
+            if user is None or user.pk in profiles:
+                continue
+            if row.guardian_email in new_users or not hasattr(user, 'guardian_profile'):
+                profiles[user.pk] = GuardianProfile(
+                    user=user, phone=row.guardian['phone'], address=row.guardian['address'],
+                )
+        GuardianProfile.objects.bulk_create(profiles.values(), batch_size=batch_size)
+
+        # 2. Jugadoras: nuevas con bulk_create, existentes (por RUT) con bulk_update
+        to_create = [row.player for row in plan.rows if row.player.pk is None]
+        to_update = [row.player for row in plan.rows if row.player.pk is not None]
+        Player.objects.bulk_create(to_create, batch_size=batch_size)
+        for player in to_update:
+            player.updated_at = now  # bulk_update no aplica auto_now
+        Player.objects.bulk_update(to_update, [*PLAYER_FIELDS, 'updated_at'], batch_size=batch_size)
+        result.players_created = len(to_create)
+        result.players_updated = len(to_update)
+
+        # 3. Vínculos apoderado-jugadora (los ya existentes se ignoran por unique_together)
+        links = {
+            (guardians[row.guardian_email].pk, row.player.pk): GuardianPlayer(
+                guardian=guardians[row.guardian_email], player=row.player, relation=row.relation,
+            )
+            for row in plan.rows if row.guardian_email
+        }
+        existing_links = set(
+            GuardianPlayer.objects.filter(player_id__in=[player_id for _, player_id in links])
+            .values_list('guardian_id', 'player_id')
+        )
+        new_links = [link for key, link in links.items() if key not in existing_links]
+        GuardianPlayer.objects.bulk_create(new_links, batch_size=batch_size, ignore_conflicts=True)
+        result.links_created = len(new_links)
+
+        # bulk_create no dispara señales: la portada muestra el total de jugadoras
+        transaction.on_commit(invalidate_landing_cache)
+    return result
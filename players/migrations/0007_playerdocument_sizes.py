@@ -0,0 +1,23 @@
+# Generated by Django 5.0 on 2026-10-17 13:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0006_playerdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playerdocument',
+            name='original_size',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Tamaño original (bytes)'),
+        ),
+        migrations.AddField(
+            model_name='playerdocument',
+            name='stored_size',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Tamaño almacenado (bytes)'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-17 13:25
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0007_playerdocument_sizes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='playerdocument',
+            name='file',
+            field=models.FileField(max_length=255, storage=core.storage.dedup_storage, upload_to='player_documents/', verbose_name='Archivo'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-17 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0008_dedup_storage_playerdocument'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='players_name_id_idx'),
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from core.storage import dedup_storage
+
 class Category(models.Model):
     # ... (tu modelo Category no cambia) ...
     name = models.CharField(max_length=50, unique=True, verbose_name='Nombre')
@@ -91,6 +93,10 @@ class Player(models.Model):
         verbose_name = 'Jugador'
         verbose_name_plural = 'Jugadores'
         ordering = ['last_name', 'first_name']
+        indexes = [
+            # Paginación por cursor del listado de jugadoras (core.pagination)
+            models.Index(fields=['last_name', 'first_name', 'id'], name='players_name_id_idx'),
+        ]
 
     def __str__(self):
         return f'{self.first_name} {self.last_name}'
@@ -135,7 +141,10 @@ class PlayerDocument(models.Model):
         verbose_name="Jugadora"
     )
     title = models.CharField(max_length=150, verbose_name="Título del Documento")
-    file = models.FileField(upload_to='player_documents/', verbose_name="Archivo")
+    file = models.FileField(upload_to='player_documents/', storage=dedup_storage, max_length=255, verbose_name="Archivo")
+    # Tamaños antes y después de comprimir (core.uploads)
+    original_size = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Tamaño original (bytes)")
+    stored_size = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Tamaño almacenado (bytes)")
     uploaded_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Subida")
     uploaded_by = models.ForeignKey(
         User, 
@@ -1,3 +1,76 @@
+import io
+
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from .imports import apply_import, plan_import
+from .models import Category, GuardianPlayer, Player
+
+HEADER = 'nombre,apellido,rut,fecha_nacimiento,categoria,estado,apoderado_email,apoderado_nombre,relacion\n'
+
+
+class PlayerImportTests(TestCase):
+    def setUp(self):
+        Category.objects.create(name='Sub-14')
+
+    def _import(self, rows):
+        plan = plan_import(io.StringIO(HEADER + rows))
+        self.assertEqual(plan.errors, [])
+        return apply_import(plan)
+
+    def test_reimporting_the_same_file_updates_instead_of_duplicating(self):
+        rows = (
+            'Ana,Rojas,12.345.678-5,2011-04-02,Sub-14,Activo,madre@example.com,Carla,Madre\n'
+            'Bea,Soto,11.111.111-1,2011-07-15,sub-14,,madre@example.com,Carla,Madre\n'
+        )
+
+        first = self._import(rows)
+        second = self._import(rows)
+
+        self.assertEqual((first.players_created, first.guardians_created, first.links_created), (2, 1, 2))
+        self.assertEqual((second.players_created, second.players_updated), (0, 2))
+        self.assertEqual((second.guardians_created, second.links_created), (0, 0))
+        self.assertEqual((Player.objects.count(), User.objects.count(), GuardianPlayer.objects.count()), (2, 1, 2))
+
+    def test_existing_rut_is_matched_in_any_format_and_updated(self):
+        self._import('Ana,Rojas,12345678-5,2011-04-02,Sub-14,Activo,,,\n')
+        player = Player.objects.get()
+
+        result = self._import('Ana María,Rojas,12.345.678-5,2011-04-02,Sub-14,Lesionado,,,\n')
+
+        player.refresh_from_db()
+        self.assertEqual((result.players_created, result.players_updated), (0, 1))
+        self.assertEqual((player.first_name, player.status), ('Ana María', 'injured'))
+
+    def test_invalid_rows_save_nothing(self):
+        plan = plan_import(io.StringIO(HEADER + (
+            'Ana,Rojas,12.345.678-5,2011-04-02,Sub-14,,,,\n'
+            'Bea,Soto,12.345.678-0,2011-07-15,Sub-16,,,,\n'
+        )))
+
+        self.assertEqual([error.line for error in plan.errors], [3])
+        with self.assertRaises(ValueError):
+            apply_import(plan)
+        self.assertFalse(Player.objects.exists())
+
+    def test_guardians_are_matched_without_case_sensitivity(self):
+        registered = User.objects.create_user('Carla.Rojas@Example.com', 'Carla.Rojas@Example.com')
+        by_email = User.objects.create_user('crojas', 'Pedro@Example.COM')
+
+        result = self._import(
+            'Ana,Rojas,,2011-04-02,Sub-14,,carla.rojas@example.com,Carla,Madre\n'
+            'Bea,Rojas,,2012-01-20,Sub-14,,PEDRO@example.com,Pedro,Padre\n'
+        )
+
+        self.assertEqual(result.guardians_created, 0)
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(
+            set(GuardianPlayer.objects.values_list('guardian_id', 'player__first_name')),
+            {(registered.pk, 'Ana'), (by_email.pk, 'Bea')},
+        )
+
+    def test_new_guardians_are_stored_in_lowercase(self):
+        self._import('Ana,Rojas,,2011-04-02,Sub-14,,Carla.Rojas@Example.com,Carla,Madre\n')
+
+        self.assertEqual(User.objects.values_list('username', 'email').get(),
+                         ('carla.rojas@example.com', 'carla.rojas@example.com'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-17 13:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0006_playerdocument'),
+        ('schedules', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['category', 'starts_at'], name='sched_match_cat_starts_idx'),
+        ),
+    ]
@@ -16,6 +16,9 @@ class Match(models.Model):
         verbose_name = 'Partido'
         verbose_name_plural = 'Partidos'
         ordering = ['starts_at']
+        indexes = [
+            models.Index(fields=['category', 'starts_at'], name='sched_match_cat_starts_idx'),
+        ]
 
     def __str__(self):
         return f'{self.title} - {self.category.name} vs {self.opponent}'
@@ -2,15 +2,32 @@
 
 from django.shortcuts import render
 from django.utils import timezone
+from core.conditional import conditional_page
+from players.models import Category
 from .models import Match, Activity
 
+
+def schedule_sources(request):
+    """Fuentes del ETag de los calendarios públicos (ver core.conditional)."""
+    today = timezone.now()
+    return [
+        (Match.objects.all(), 'updated_at'),
+        # El conteo de próximos cambia cuando un evento ya empezó, aunque nadie lo haya editado
+        (Match.objects.filter(starts_at__gte=today), 'updated_at'),
+        (Activity.objects.all(), 'updated_at'),
+        (Activity.objects.filter(starts_at__gte=today), 'updated_at'),
+        (Category.objects.all(), 'updated_at'),
+    ]
+
+
+@conditional_page(schedule_sources)
 def schedule_list_view(request):
     """
     Muestra una lista pública de los próximos partidos y actividades.
     """
     today = timezone.now()
     
-    upcoming_matches = Match.objects.filter(starts_at__gte=today).order_by('starts_at')
+    upcoming_matches = Match.objects.filter(starts_at__gte=today).select_related('category').order_by('starts_at')
     upcoming_activities = Activity.objects.filter(starts_at__gte=today).order_by('starts_at')
 
     context = {
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-17 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sponsors', '0002_remove_sponsor_active_remove_sponsor_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sponsor',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
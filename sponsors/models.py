@@ -15,6 +15,7 @@ class Sponsor(models.Model):
     contact_email = models.EmailField(blank=True, null=True, verbose_name="Email")
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Auspiciador"
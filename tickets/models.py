@@ -20,6 +20,9 @@ class Ticket(models.Model):
         verbose_name = "Ticket de Soporte"
         verbose_name_plural = "Tickets de Soporte"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='tickets_status_created_idx'),
+        ]
 
     def __str__(self):
         return f"Ticket #{self.id}: {self.subject} ({self.guardian.username})"
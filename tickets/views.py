@@ -3,12 +3,11 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from .models import Ticket, TicketReply
 from .forms import TicketForm, ReplyForm
-from users.guardian_views import is_guardian # Reutilizamos tu helper
 
 @login_required
 def list_tickets(request):
     # ... (esta vista está bien, no hay cambios) ...
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         messages.error(request, "Acceso no autorizado.")
         return redirect('pages:landing')
 
@@ -22,7 +21,7 @@ def list_tickets(request):
 @login_required
 def create_ticket(request):
     # ... (esta vista está bien, no hay cambios) ...
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         messages.error(request, "Acceso no autorizado.")
         return redirect('pages:landing')
 
@@ -59,7 +58,7 @@ def view_ticket(request, pk):
     Muestra un ticket específico y sus respuestas.
     Permite al apoderado añadir una nueva respuesta.
     """
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         messages.error(request, "Acceso no autorizado.")
         return redirect('pages:landing')
 
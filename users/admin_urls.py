@@ -6,9 +6,11 @@ app_name = 'admin_panel'
 urlpatterns = [
     # Dashboard
     path('', admin_views.admin_dashboard, name='dashboard'),
+    path('metrics/', admin_views.request_metrics, name='request_metrics'),
     
     # Players management
     path('players/', admin_views.admin_players, name='players'),
+    path('players/import/', admin_views.admin_import_players, name='import_players'),
     
     # Registrations management
     path('registrations/', admin_views.admin_registrations, name='registrations'),
@@ -23,6 +25,7 @@ urlpatterns = [
     path('finances/pending/', admin_views.manage_pending_payments, name='manage_pending_payments'), # (Parte B)
     path('finances/review/<int:pk>/', admin_views.review_payment, name='review_payment'),
     path('finances/add/', admin_views.add_transaction, name='add_transaction'), # <-- AÑADIR ESTA LÍNEA
+    path('finances/export/<slug:dataset>/', admin_views.export_finance, name='export_finance'),
     path('finances/approve/<int:pk>/', admin_views.approve_payment, name='approve_payment'),
     path('finances/reject/<int:pk>/', admin_views.reject_payment, name='reject_payment'),
     # --- FIN RUTAS FINANZAS ---
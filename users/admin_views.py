@@ -1,12 +1,13 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.db.models import Count, Q, Sum
+from django.conf import settings
+from django.db.models import Count, Max, Prefetch, Q, Sum
 from django.db import IntegrityError
-from django.http import JsonResponse
-from django.core.paginator import Paginator
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
 from datetime import date, timedelta
+import io
 import json
 
 # Importaciones de Modelos
@@ -14,11 +15,22 @@ from pages.models import LandingNews, LandingEvent
 from pages.forms import LandingNewsForm, LandingEventForm
 from .models import User, GuardianProfile, AdminProfile, Registration
 from players.models import Player, GuardianPlayer, Category, PlayerDocument
-from finance.models import Payment, FeeDefinition, Invoice, Transaction
+from finance.models import Payment, FeeDefinition, Invoice, Transaction, TransactionMonthlyRollup
 from sponsors.models import Sponsor
 from schedules.models import Match, Activity
 from communications.models import BulkEmail, EmailRecipient
+from communications.unread import register_delivery
+from communications.delivery import create_recipients, deliver_bulk_email
+from communications.audiences import InvalidAudience, build_audience, label_audiences, resolve_audience
+from core.uploads import document_rule, upload_error, validate_uploads
+from players.imports import IMPORT_COLUMNS, ImportFileError, apply_import, plan_import
+from finance.exports import EXPORT_FORMATS, EXPORTS, InvalidExportFilter, export_filename, filter_transactions, stream_export, validate_params
 from tickets.models import Ticket, TicketReply
+from core.stats import get_dashboard_stats
+from core.pagination import paginate_keyset
+from core.instrumentation import collect_metrics
+from core.background import run_in_background
+from finance.billing import plan_fee_assignment, apply_fee_assignment, assign_fee_to_category
 
 # Importaciones de Formularios
 from .forms import UserRegistrationForm, GuardianProfileForm, AdminProfileForm, UserUpdateForm, CategoryForm
@@ -35,34 +47,12 @@ def is_admin(user):
 @login_required
 @user_passes_test(is_admin)
 def admin_dashboard(request):
-    # Estadísticas
-    total_players = Player.objects.count()
-    total_guardians = GuardianProfile.objects.count()
-    total_paid_quotas = Invoice.objects.filter(status='pagada').aggregate(Sum('amount'))['amount__sum'] or 0
-    total_pending_quotas = Invoice.objects.filter(status__in=['pendiente', 'en revisión']).aggregate(Sum('amount'))['amount__sum'] or 0
-    total_overdue_quotas = Invoice.objects.filter(status='atrasada').aggregate(Sum('amount'))['amount__sum'] or 0
-    total_funds = Payment.objects.filter(status='completado').aggregate(Sum('amount'))['amount__sum'] or 0
-    
-    active_sponsors = Sponsor.objects.filter(is_visible=True).count()
-    pending_registrations = Registration.objects.filter(status='pending').count()
-    
-    # Mensuales
-    current_month = timezone.now().replace(day=1)
-    monthly_registrations = Registration.objects.filter(created_at__gte=current_month).count()
-    monthly_payments = Payment.objects.filter(created_at__gte=current_month, status='completado').count()
+    # Estadísticas (una sola consulta agregada)
+    stats = get_dashboard_stats()
 
     context = {
-        'total_players': total_players,
-        'total_guardians': total_guardians,
-        'total_payments': monthly_payments,
-        'pending_registrations': pending_registrations,
-        'total_paid_quotas': total_paid_quotas,
-        'total_pending_quotas': total_pending_quotas,
-        'total_overdue_quotas': total_overdue_quotas,
-        'total_funds': total_funds,
-        'active_sponsors': active_sponsors,
-        'monthly_registrations': monthly_registrations,
-        'monthly_payments': monthly_payments,
+        **stats.as_dict(),
+        'total_payments': stats.monthly_payments,
         'recent_registrations': Registration.objects.order_by('-created_at')[:5],
         'recent_payments': Payment.objects.filter(status='completado').order_by('-created_at')[:5],
         'upcoming_matches': Match.objects.filter(starts_at__gte=timezone.now()).order_by('starts_at')[:5],
@@ -79,13 +69,12 @@ def admin_registrations(request):
     if status_filter is None:
         status_filter = 'pending'
     
-    registrations = Registration.objects.all().order_by('-created_at')
+    registrations = Registration.objects.select_related('guardian__guardian_profile')
     
     if status_filter:
         registrations = registrations.filter(status=status_filter)
     
-    paginator = Paginator(registrations, 15)
-    page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj = paginate_keyset(request, registrations, ('-created_at', '-id'), 15)
     
     context = {
         'page_obj': page_obj, 
@@ -154,8 +143,7 @@ def admin_sponsors(request):
     elif status_filter == 'inactive':
         sponsors_query = sponsors_query.filter(is_visible=False)
     
-    paginator = Paginator(sponsors_query, 10)
-    page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj = paginate_keyset(request, sponsors_query, ('-created_at', '-id'), 10)
     
     context = {
         'sponsors': page_obj, # Tu HTML usa 'sponsors'
@@ -169,13 +157,9 @@ def admin_sponsors(request):
 @login_required
 @user_passes_test(is_admin)
 def admin_finances(request):
-    total_income = Transaction.objects.filter(type='ingreso').aggregate(Sum('amount'))['amount__sum'] or 0
-    total_expenses = Transaction.objects.filter(type='gasto').aggregate(Sum('amount'))['amount__sum'] or 0
-    
-    transactions_list = Transaction.objects.all().order_by('-date')
-    paginator = Paginator(transactions_list, 25)
-    transactions_page = paginator.get_page(request.GET.get('page'))
-    
+    transactions = filter_transactions(request.GET).select_related('sponsor', 'player')
+    transactions_page = paginate_keyset(request, transactions, ('-date', '-id'), 25)
+
     today = timezone.now().date()
     current_month_start = date(today.year, today.month, 1)
     months_dt = []
@@ -187,21 +171,26 @@ def admin_finances(request):
         else:
             cm = date(cm.year, cm.month - 1, 1)
     monthly_labels = [m.strftime('%b %Y') for m in months_dt]
-    monthly_income = []
-    monthly_expenses = []
-    for m in months_dt:
-        income_total = Transaction.objects.filter(type='ingreso', date__year=m.year, date__month=m.month).aggregate(Sum('amount'))['amount__sum'] or 0
-        expense_total = Transaction.objects.filter(type='gasto', date__year=m.year, date__month=m.month).aggregate(Sum('amount'))['amount__sum'] or 0
-        monthly_income.append(float(income_total))
-        monthly_expenses.append(float(expense_total))
+
+    # Gráficos y totales desde el resumen mensual materializado (pocas filas)
+    first_month = months_dt[0]
+    monthly_rows = TransactionMonthlyRollup.objects.filter(
+        Q(year__gt=first_month.year) | Q(year=first_month.year, month__gte=first_month.month)
+    ).values('year', 'month', 'type').annotate(total=Sum('total'))
+    monthly_totals = {(row['year'], row['month'], row['type']): row['total'] or 0 for row in monthly_rows}
+    monthly_income = [float(monthly_totals.get((m.year, m.month, 'ingreso'), 0)) for m in months_dt]
+    monthly_expenses = [float(monthly_totals.get((m.year, m.month, 'gasto'), 0)) for m in months_dt]
 
     category_display = dict(Transaction.CATEGORY_CHOICES)
-    income_agg = Transaction.objects.filter(type='ingreso').values('category').annotate(total=Sum('amount')).order_by('-total')
-    expense_agg = Transaction.objects.filter(type='gasto').values('category').annotate(total=Sum('amount')).order_by('-total')
+    category_rows = TransactionMonthlyRollup.objects.values('type', 'category').annotate(total=Sum('total')).order_by('-total')
+    income_agg = [row for row in category_rows if row['type'] == 'ingreso']
+    expense_agg = [row for row in category_rows if row['type'] == 'gasto']
     income_categories = [category_display.get(row['category'], row['category']) for row in income_agg]
     income_amounts = [float(row['total'] or 0) for row in income_agg]
     expense_categories = [category_display.get(row['category'], row['category']) for row in expense_agg]
     expense_amounts = [float(row['total'] or 0) for row in expense_agg]
+    total_income = sum((row['total'] or 0 for row in income_agg), 0)
+    total_expenses = sum((row['total'] or 0 for row in expense_agg), 0)
 
     context = {
         'total_income': total_income,
@@ -222,6 +211,23 @@ def admin_finances(request):
     }
     return render(request, 'admin/finances.html', context)
 
+@login_required
+@user_passes_test(is_admin)
+def export_finance(request, dataset):
+    """Descarga en streaming (CSV o XLSX) de transacciones, facturas o pagos con los filtros de la pantalla."""
+    spec = EXPORTS.get(dataset)
+    fmt = request.GET.get('format', 'csv')
+    if spec is None or fmt not in EXPORT_FORMATS:
+        raise Http404('Exportación no disponible.')
+    try:
+        validate_params(spec, request.GET)
+    except InvalidExportFilter as exc:
+        return HttpResponseBadRequest(str(exc))
+    content_type = 'text/csv; charset=utf-8' if fmt == 'csv' else 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    response = StreamingHttpResponse(stream_export(spec, request.GET, fmt), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(spec, fmt)}"'
+    return response
+
 @login_required
 @user_passes_test(is_admin)
 def add_transaction(request):
@@ -276,7 +282,11 @@ def delete_fee_definition(request, pk):
 @user_passes_test(is_admin)
 def manage_pending_payments(request):
     return render(request, 'admin/manage_payments.html', {
-        'payments': Payment.objects.filter(status='pendiente').order_by('paid_at')
+        'payments': (
+            Payment.objects.filter(status='pendiente')
+            .select_related('invoice__guardian', 'invoice__player')
+            .order_by('paid_at')
+        )
     })
 
 @login_required
@@ -300,7 +310,9 @@ def reject_payment(request, pk):
     if request.method == 'POST':
         p = get_object_or_404(Payment, pk=pk)
         p.status = 'fallido'; p.save()
-        p.invoice.status = 'pendiente'; p.invoice.save()
+        # El barrido ya no corre al guardar: una factura vencida vuelve directo a 'atrasada'
+        p.invoice.status = 'atrasada' if p.invoice.due_date < timezone.localdate() else 'pendiente'
+        p.invoice.save()
     return redirect('admin_panel:manage_pending_payments')
 
 # --- JUGADORES ---
@@ -308,13 +320,61 @@ def reject_payment(request, pk):
 @user_passes_test(is_admin)
 def admin_players(request):
     search = request.GET.get('search', '')
-    players = Player.objects.all().order_by('last_name')
+    players = Player.objects.select_related('category').prefetch_related(
+        Prefetch('guardianplayer_set', queryset=GuardianPlayer.objects.select_related('guardian').order_by('pk'), to_attr='guardian_links')
+    )
     if search: players = players.filter(Q(first_name__icontains=search)|Q(last_name__icontains=search))
     
-    paginator = Paginator(players, 20)
-    page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj = paginate_keyset(request, players, ('last_name', 'first_name', 'id'), 20)
     return render(request, 'admin/players.html', {'page_obj': page_obj, 'search_query': search, 'teams': Category.objects.values_list('name', flat=True).distinct()})
 
+@login_required
+@user_passes_test(is_admin)
+def admin_import_players(request):
+    """
+    Importación masiva desde CSV en dos pasos: primero se valida todo el
+    archivo y se muestra el resumen (o los errores por fila); al confirmar se
+    vuelve a validar el mismo contenido y se guarda en una sola transacción.
+    """
+    plan = None
+    csv_content = ''
+    if request.method == 'POST':
+        uploaded = request.FILES.get('csv_file')
+        if uploaded:
+            if uploaded.size > settings.UPLOAD_MAX_DOCUMENT_SIZE:
+                messages.error(request, 'El archivo es demasiado grande.')
+                return redirect('admin_panel:import_players')
+            raw = uploaded.read()
+            try:
+                csv_content = raw.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                csv_content = raw.decode('latin-1')
+        else:
+            csv_content = request.POST.get('csv_content', '')
+
+        try:
+            plan = plan_import(io.StringIO(csv_content), max_rows=settings.PLAYER_IMPORT_MAX_ROWS)
+        except ImportFileError as e:
+            messages.error(request, str(e))
+            return redirect('admin_panel:import_players')
+
+        if plan.is_valid and 'confirm' in request.POST:
+            result = apply_import(plan)
+            messages.success(
+                request,
+                f'Importación lista: {result.players_created} jugadoras creadas, {result.players_updated} actualizadas, '
+                f'{result.guardians_created} apoderados nuevos y {result.links_created} vínculos.'
+            )
+            return redirect('admin_panel:players')
+
+    context = {
+        'plan': plan,
+        'csv_content': csv_content if plan and plan.is_valid else '',
+        'columns': IMPORT_COLUMNS,
+        'max_rows': settings.PLAYER_IMPORT_MAX_ROWS,
+    }
+    return render(request, 'admin/import_players.html', context)
+
 @login_required
 @user_passes_test(is_admin)
 def admin_player_detail(request, pk):
@@ -343,11 +403,15 @@ def admin_edit_player(request, pk):
 
 @login_required
 @user_passes_test(is_admin)
+@validate_uploads(file=document_rule)
 def admin_add_player_document(request, player_pk):
     if request.method == 'POST':
         form = PlayerDocumentForm(request.POST, request.FILES)
         if form.is_valid():
             d = form.save(commit=False); d.player_id = player_pk; d.uploaded_by = request.user; d.save()
+        else:
+            error = upload_error(request, 'file') or next(iter(form.errors.get('file', [])), None)
+            messages.error(request, f"Error al subir el documento. {error or ''}".strip())
     return redirect('admin_panel:admin_player_detail', pk=player_pk)
 
 @login_required
@@ -360,8 +424,9 @@ def admin_player_cards(request):
 @user_passes_test(is_admin)
 def admin_communications(request):
     return render(request, 'admin/communications.html', {
-        'messages_list': BulkEmail.objects.all().order_by('-created_at')[:10],
-        'categories': Category.objects.all()
+        'messages_list': label_audiences(BulkEmail.objects.select_related('created_by').order_by('-created_at')[:10]),
+        'categories': Category.objects.all(),
+        'player_statuses': Player.STATUS_CHOICES,
     })
 
 @login_required
@@ -370,16 +435,25 @@ def admin_send_notification(request):
     if request.method == 'POST':
         title = request.POST.get('title')
         body = request.POST.get('message')
-        recipient_type = request.POST.get('recipient_type')
         attachment = request.FILES.get('attachment')
-        
-        recipients = User.objects.none()
-        if recipient_type == 'all_guardians':
-            recipients = User.objects.filter(guardian_profile__isnull=False, is_active=True)
-        
-        if recipients.exists():
-            bulk = BulkEmail.objects.create(title=title, body_html=body, created_by=request.user, is_sent=True, sent_at=timezone.now(), attachment=attachment)
-            EmailRecipient.objects.bulk_create([EmailRecipient(bulk_email=bulk, user=u, status='enviado', sent_at=timezone.now()) for u in recipients])
+        try:
+            audience = build_audience(request.POST)
+        except InvalidAudience as e:
+            messages.error(request, str(e))
+            return redirect('admin_panel:communications')
+
+        recipients = resolve_audience(audience)
+        if not recipients.exists():
+            messages.warning(request, 'No hay destinatarios para la audiencia seleccionada.')
+        else:
+            bulk = BulkEmail.objects.create(title=title, body_html=body, created_by=request.user, attachment=attachment, audience=audience)
+            create_recipients(bulk, recipients)
+            register_delivery(bulk)
+            # El envío por correo no bloquea la petición
+            if settings.BULK_EMAIL_ASYNC:
+                run_in_background(deliver_bulk_email, bulk.pk, name='deliver_bulk_email')
+            else:
+                deliver_bulk_email(bulk.pk)
             messages.success(request, 'Mensaje enviado.')
     return redirect('admin_panel:communications')
 
@@ -387,7 +461,12 @@ def admin_send_notification(request):
 @user_passes_test(is_admin)
 def communication_status(request, pk):
     msg = get_object_or_404(BulkEmail, pk=pk)
-    return render(request, 'admin/communication_status.html', {'message': msg, 'recipients_list': msg.recipients.all()})
+    # Orden por usuario: lo cubre el índice único (bulk_email, user)
+    recipients = msg.recipients.select_related('user').only(
+        'id', 'bulk_email_id', 'read_at', 'user_id', 'user__first_name', 'user__last_name', 'user__email',
+    )
+    recipients = paginate_keyset(request, recipients, ('user_id',), 50)
+    return render(request, 'admin/communication_status.html', {'message': msg, 'recipients_list': recipients})
 
 @login_required
 @user_passes_test(is_admin)
@@ -465,15 +544,32 @@ def toggle_category_registration(request, pk):
 @login_required
 @user_passes_test(is_admin)
 def assign_fees_to_category(request):
-    if request.method == 'POST':
-        form = AssignFeeForm(request.POST)
-        if form.is_valid():
-            fd, cat, date = form.cleaned_data['fee_definition'], form.cleaned_data['category'], form.cleaned_data['due_date']
-            for gp in GuardianPlayer.objects.filter(player__category=cat, player__status='active'):
-                if not Invoice.objects.filter(player=gp.player, fee_definition=fd).exists():
-                    Invoice.objects.create(guardian=gp.guardian, player=gp.player, fee_definition=fd, amount=fd.amount, due_date=date, status='pendiente')
+    form = AssignFeeForm(request.POST or None)
+    preview = None
+    if request.method == 'POST' and form.is_valid():
+        fd, cat, due_date = form.cleaned_data['fee_definition'], form.cleaned_data['category'], form.cleaned_data['due_date']
+        plan = plan_fee_assignment(fd, cat, due_date)
+        if 'confirm' not in request.POST:
+            # Primer paso: mostrar resumen (cantidad y monto total) antes de confirmar
+            preview = plan
+        elif plan.count >= settings.FEE_ASSIGNMENT_BACKGROUND_THRESHOLD:
+            run_in_background(assign_fee_to_category, fd, cat, due_date, name='assign_fee_to_category')
+            messages.info(request, f'Se están generando {plan.count} cuotas en segundo plano. Pueden tardar unos minutos en aparecer.')
+            return redirect('admin_panel:manage_fees')
+        else:
+            created = apply_fee_assignment(plan)
+            # Las que otra corrida facturó entre la vista previa y la inserción cuentan como omitidas
+            omitted = plan.already_invoiced + plan.count - created
+            messages.success(request, f'Se asignaron {created} cuotas (${fd.amount * created:,.0f}). Omitidas por estar ya facturadas: {omitted}.')
             return redirect('admin_panel:manage_fees')
-    return render(request, 'admin/assign_fees.html', {'form': AssignFeeForm()})
+    return render(request, 'admin/assign_fees.html', {'form': form, 'preview': preview})
+
+# --- MÉTRICAS ---
+@login_required
+@user_passes_test(is_admin)
+def request_metrics(request):
+    """Histogramas de consultas y latencia por vista (todos los procesos), en JSON."""
+    return JsonResponse(collect_metrics(), json_dumps_params={'ensure_ascii': False, 'indent': 2})
 
 # --- TICKETS ---
 @login_required
@@ -481,8 +577,9 @@ def assign_fees_to_category(request):
 def list_admin_tickets(request):
     status_filter = request.GET.get('status', 'abierto')
     qs = Ticket.objects.all() if status_filter == 'todos' else Ticket.objects.filter(status=status_filter)
-    paginator = Paginator(qs, 20)
-    return render(request, 'admin/admin_tickets_list.html', {'page_obj': paginator.get_page(request.GET.get('page')), 'status_filter': status_filter})
+    qs = qs.select_related('guardian').annotate(last_reply_at=Max('replies__created_at'))
+    page_obj = paginate_keyset(request, qs, ('-created_at', '-id'), 20)
+    return render(request, 'admin/admin_tickets_list.html', {'page_obj': page_obj, 'status_filter': status_filter})
 
 @login_required
 @user_passes_test(is_admin)
@@ -0,0 +1,3 @@
+def guardian_context(request):
+    """Expone ``guardian_ctx`` a las plantillas (no hace consultas hasta que se usa)."""
+    return {'guardian_ctx': getattr(request, 'guardian_ctx', None)}
@@ -0,0 +1,62 @@
+"""
+Contexto del apoderado resuelto una sola vez por petición.
+
+GuardianContextMiddleware adjunta ``request.guardian_ctx``; cada dato se
+calcula de forma perezosa la primera vez que se usa y queda memorizado
+hasta el final de la petición, así las vistas, los tickets y las
+plantillas del apoderado comparten las mismas consultas.
+"""
+from django.utils.functional import cached_property
+
+from players.models import Player, GuardianPlayer
+
+
+class GuardianContext:
+    def __init__(self, request):
+        self._request = request
+
+    @cached_property
+    def user(self):
+        return self._request.user
+
+    @cached_property
+    def profile(self):
+        from .models import GuardianProfile
+
+        if not self.user.is_authenticated:
+            return None
+        return GuardianProfile.objects.filter(user=self.user).first()
+
+    @property
+    def is_guardian(self):
+        return self.profile is not None
+
+    @cached_property
+    def _links(self):
+        # (player_id, category_id) de todas las jugadoras del apoderado en una sola consulta
+        if not self.user.is_authenticated:
+            return []
+        return list(
+            GuardianPlayer.objects.filter(guardian=self.user).values_list('player_id', 'player__category_id')
+        )
+
+    @cached_property
+    def player_ids(self):
+        return [player_id for player_id, _ in self._links]
+
+    @cached_property
+    def category_ids(self):
+        return sorted({category_id for _, category_id in self._links})
+
+    @property
+    def players(self):
+        """Queryset nuevo (encadenable) con las jugadoras del apoderado."""
+        return Player.objects.filter(id__in=self.player_ids)
+
+    @cached_property
+    def unread_count(self):
+        from communications.unread import get_unread_count
+
+        if not self.user.is_authenticated:
+            return 0
+        return get_unread_count(self.user)
@@ -28,6 +28,8 @@ from players.models import Player, GuardianPlayer, Category # Modelos de Players
 from finance.models import Invoice, Payment
 from schedules.models import Match, Activity
 from communications.models import EmailRecipient, BulkEmail
+from core.uploads import UploadRejected, document_rule, image_rule, process_upload, upload_error, validate_uploads
+from communications.unread import mark_as_read
 
 def is_guardian(user):
     """Verificar si el usuario es un apoderado"""
@@ -41,12 +43,11 @@ def is_guardian(user):
 
 @login_required
 def guardian_dashboard(request):
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         messages.error(request, 'No tienes permisos para acceder a esta sección.')
         return redirect('pages:landing')
     
-    guardian_players = GuardianPlayer.objects.filter(guardian=request.user)
-    players = Player.objects.filter(id__in=guardian_players.values_list('player_id', flat=True))
+    players = request.guardian_ctx.players
     
     # Estadísticas
     total_players = players.count()
@@ -57,16 +58,12 @@ def guardian_dashboard(request):
         status__in=['pendiente', 'atrasada']
     ).aggregate(total=Sum('amount'))['total'] or 0
     
-    unread_messages = EmailRecipient.objects.filter(
-        user=request.user,
-        read_at__isnull=True
-    ).count()
+    unread_messages = request.guardian_ctx.unread_count
     
     # Eventos próximos
     today = timezone.now().date()
-    player_categories = players.values_list('category', flat=True)
     upcoming_matches = Match.objects.filter(
-        category__id__in=player_categories,
+        category__id__in=request.guardian_ctx.category_ids,
         starts_at__gte=today
     ).order_by('starts_at')[:5]
     
@@ -88,7 +85,7 @@ def guardian_dashboard(request):
 @login_required
 def guardian_profile(request):
     """Muestra y actualiza el perfil del apoderado (Maneja JSON para el template actual)."""
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         return redirect('pages:landing')
 
     profile, created = GuardianProfile.objects.get_or_create(user=request.user)
@@ -124,7 +121,7 @@ def guardian_profile(request):
 @login_required
 def add_new_player(request):
     """Registrar nueva jugadora desde el panel del apoderado"""
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         return redirect('pages:landing')
 
     if request.method == 'POST':
@@ -151,7 +148,7 @@ def add_new_player(request):
 @login_required
 def guardian_edit_player(request, pk):
     """Edición de ficha de jugadora"""
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         return redirect('pages:landing')
 
     # Verificar propiedad
@@ -199,12 +196,11 @@ def update_notifications(request):
 @login_required
 def guardian_players(request):
     """Gestión de jugadores del apoderado"""
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         messages.error(request, 'No tienes permisos para acceder a esta sección.')
         return redirect('pages:landing')
     
-    guardian_players = GuardianPlayer.objects.filter(guardian=request.user)
-    players = Player.objects.filter(id__in=guardian_players.values_list('player_id', flat=True))
+    players = request.guardian_ctx.players
     categories = Category.objects.all()
 
     team_filter = request.GET.get('team')
@@ -230,12 +226,11 @@ def guardian_players(request):
 @login_required
 def guardian_payments(request):
     """Historial de pagos del apoderado"""
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         messages.error(request, 'No tienes permisos para acceder a esta sección.')
         return redirect('pages:landing')
     
-    guardian_players = GuardianPlayer.objects.filter(guardian=request.user)
-    players = Player.objects.filter(id__in=guardian_players.values_list('player_id', flat=True))
+    players = request.guardian_ctx.players
     payments = Payment.objects.filter(invoice__player__in=players)
     
     # Filtros
@@ -254,15 +249,18 @@ def guardian_payments(request):
         payments = payments.filter(invoice__due_date__lte=date_to)
     
     # Estadísticas
-    total_paid = payments.filter(status='paid').aggregate(total=Sum('amount'))['total'] or 0
-    total_pending = payments.filter(status='pending').aggregate(total=Sum('amount'))['total'] or 0
-    total_overdue = payments.filter(
-        status='pending',
-        invoice__due_date__lt=timezone.now().date()
-    ).aggregate(total=Sum('amount'))['total'] or 0
+    # Los tres totales en una sola consulta
+    totals = payments.aggregate(
+        paid=Sum('amount', filter=Q(status='paid')),
+        pending=Sum('amount', filter=Q(status='pending')),
+        overdue=Sum('amount', filter=Q(status='pending', invoice__due_date__lt=timezone.now().date())),
+    )
+    total_paid = totals['paid'] or 0
+    total_pending = totals['pending'] or 0
+    total_overdue = totals['overdue'] or 0
     
     # Paginación
-    paginator = Paginator(payments.order_by('-created_at'), 15)
+    paginator = Paginator(payments.select_related('invoice__player__category').order_by('-created_at'), 15)
     page_number = request.GET.get('page')
     payments_page = paginator.get_page(page_number)
     
@@ -283,11 +281,10 @@ def guardian_payments(request):
 @login_required
 def guardian_schedule(request):
     """Calendario de partidos y entrenamientos del apoderado."""
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         return redirect('pages:landing')
 
-    guardian_players = GuardianPlayer.objects.filter(guardian=request.user)
-    player_categories_ids = guardian_players.values_list('player__category__id', flat=True).distinct()
+    player_categories_ids = request.guardian_ctx.category_ids
 
     # **CORRECCIÓN**: Usar 'starts_at' en lugar de 'date' y 'time'
     matches = Match.objects.filter(
@@ -310,14 +307,14 @@ def guardian_schedule(request):
 @login_required
 def guardian_messages(request):
     """Muestra los mensajes y notificaciones enviadas por el admin al apoderado."""
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         messages.error(request, 'No tienes permisos para acceder a esta sección.')
         return redirect('pages:landing')
 
     # 1. Obtener los *recibos* de email para este usuario
     user_messages = EmailRecipient.objects.filter(
         user=request.user
-    ).select_related('bulk_email').order_by('-sent_at')
+    ).select_related('bulk_email').order_by('-bulk_email__created_at')
 
     # --- CORRECCIÓN ---
     # 2. YA NO marcamos como leídos automáticamente.
@@ -335,7 +332,7 @@ def guardian_view_message(request, pk):
     """
     Muestra un mensaje específico y lo marca como leído.
     """
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         messages.error(request, 'No tienes permisos para acceder a esta sección.')
         return redirect('pages:landing')
     
@@ -346,10 +343,10 @@ def guardian_view_message(request, pk):
         user=request.user
     )
     
-    # 2. Marcar como leído (¡Esta es la lógica clave!)
+    # 2. Marcar como leído (¡Esta es la lógica clave!) y descontar del contador
     if recipient_message.read_at is None:
+        mark_as_read(request.user, EmailRecipient.objects.filter(pk=recipient_message.pk))
         recipient_message.read_at = timezone.now()
-        recipient_message.save()
 
     context = {
         'recipient': recipient_message,
@@ -364,8 +361,8 @@ def message_detail(request, recipient_id):
     recipient_msg = get_object_or_404(EmailRecipient, id=recipient_id, user=request.user)
     
     if not recipient_msg.read_at:
+        mark_as_read(request.user, EmailRecipient.objects.filter(pk=recipient_msg.pk))
         recipient_msg.read_at = timezone.now()
-        recipient_msg.save()
 
     return JsonResponse({
         'success': True,
@@ -385,15 +382,14 @@ def mark_message_as_read(request, recipient_id):
     """Marca un mensaje como leído."""
     recipient_msg = get_object_or_404(EmailRecipient, id=recipient_id, user=request.user)
     if not recipient_msg.read_at:
-        recipient_msg.read_at = timezone.now()
-        recipient_msg.save()
+        mark_as_read(request.user, EmailRecipient.objects.filter(pk=recipient_msg.pk))
     return JsonResponse({'success': True})
 
 @login_required
 @require_http_methods(["POST"])
 def mark_all_as_read(request):
     """Marca todos los mensajes del usuario como leídos."""
-    updated_count = EmailRecipient.objects.filter(user=request.user, read_at__isnull=True).update(read_at=timezone.now())
+    updated_count = mark_as_read(request.user)
     messages.success(request, f'{updated_count} mensajes fueron marcados como leídos.')
     return JsonResponse({'success': True, 'count': updated_count})
 
@@ -401,7 +397,7 @@ def mark_all_as_read(request):
 @require_http_methods(["POST"])
 def register_player(request):
     """Registrar nuevo jugador"""
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         return JsonResponse({'success': False, 'error': 'Sin permisos'})
     
     try:
@@ -431,11 +427,10 @@ def register_player(request):
 @login_required
 def message_detail(request, message_id):
     """Ver detalles de un mensaje"""
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         return JsonResponse({'success': False, 'error': 'Sin permisos'})
     
-    guardian_players = GuardianPlayer.objects.filter(guardian=request.user)
-    players = Player.objects.filter(id__in=guardian_players.values_list('player_id', flat=True))
+    players = request.guardian_ctx.players
     teams = [p.category for p in players]
     
     message = get_object_or_404(BulkEmail, 
@@ -468,11 +463,10 @@ def message_detail(request, message_id):
 @login_required
 def payment_detail(request, payment_id):
     """Ver detalles de un pago"""
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         return JsonResponse({'success': False, 'error': 'Sin permisos'})
     
-    guardian_players = GuardianPlayer.objects.filter(guardian=request.user)
-    player_ids = guardian_players.values_list('player_id', flat=True)
+    player_ids = request.guardian_ctx.player_ids
     payment = get_object_or_404(Payment, 
         id=payment_id,
         player_id__in=player_ids
@@ -487,7 +481,7 @@ def payment_detail(request, payment_id):
 @login_required
 def guardian_player_detail(request, player_id):
     """Vista detallada de la ficha del jugador"""
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         messages.error(request, 'No tienes permisos para acceder a esta sección.')
         return redirect('pages:landing')
     
@@ -537,11 +531,12 @@ def guardian_player_detail(request, player_id):
     return render(request, 'guardian/player_detail.html', context)
 
 @login_required
+@validate_uploads(file=document_rule)
 def guardian_add_player_document(request, player_pk):
     """
     Maneja la subida de un nuevo documento para la jugadora desde el panel del apoderado.
     """
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         messages.error(request, 'No tienes permisos.')
         return redirect('pages:landing')
     
@@ -562,16 +557,17 @@ def guardian_add_player_document(request, player_pk):
             doc.save()
             messages.success(request, f"Documento '{doc.title}' subido exitosamente.")
         else:
-            messages.error(request, "Error al subir el documento.")
+            error = upload_error(request, 'file') or next(iter(form.errors.get('file', [])), None)
+            messages.error(request, f"Error al subir el documento. {error or ''}".strip())
     
-    return redirect('guardian:player_detail', pk=player_pk)
+    return redirect('guardian:guardian_player_detail', player_id=player_pk)
 
 @login_required
 def guardian_edit_player(request, pk):
     """
     Permite al apoderado editar la información de su jugadora.
     """
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         messages.error(request, 'No tienes permisos para acceder a esta sección.')
         return redirect('pages:landing')
 
@@ -602,13 +598,12 @@ def guardian_edit_player(request, pk):
 @login_required
 def guardian_quotas_paid(request):
     """Vista de cuotas pagadas del apoderado"""
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         messages.error(request, 'No tienes permisos para acceder a esta sección.')
         return redirect('pages:landing')
     
     # Obtener jugadores del apoderado
-    guardian_players = GuardianPlayer.objects.filter(guardian=request.user)
-    players = Player.objects.filter(id__in=guardian_players.values_list('player_id', flat=True))
+    players = request.guardian_ctx.players
     
     # Filtros
     player_filter = request.GET.get('player')
@@ -652,13 +647,12 @@ def guardian_quotas_paid(request):
 @login_required
 def guardian_quotas_upcoming(request):
     """Vista de cuotas próximas a pagar"""
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         messages.error(request, 'No tienes permisos para acceder a esta sección.')
         return redirect('pages:landing')
     
     # Obtener jugadores del apoderado
-    guardian_players = GuardianPlayer.objects.filter(guardian=request.user)
-    players = Player.objects.filter(id__in=guardian_players.values_list('player_id', flat=True))
+    players = request.guardian_ctx.players
     
     from finance.models import Invoice
     from datetime import date, timedelta
@@ -673,13 +667,14 @@ def guardian_quotas_upcoming(request):
         due_date__lte=next_month
     ).select_related('player', 'fee_definition').order_by('due_date')
     
-    # Separar por urgencia
-    overdue_invoices = upcoming_invoices.filter(due_date__lt=today)
+    # Separar por urgencia (el barrido periódico mantiene el estado 'atrasada')
+    overdue_invoices = upcoming_invoices.filter(status='atrasada')
     due_soon_invoices = upcoming_invoices.filter(
-        due_date__gte=today,
+        status='pendiente',
         due_date__lte=today + timedelta(days=7)
     )
     pending_invoices = upcoming_invoices.filter(
+        status='pendiente',
         due_date__gt=today + timedelta(days=7)
     )
     
@@ -701,14 +696,14 @@ def guardian_quotas_upcoming(request):
     return render(request, 'guardian/quotas_upcoming.html', context)
 
 @login_required
+@validate_uploads(payment_proof=image_rule)
 def guardian_pay_quota(request, invoice_id):
     """Vista para pagar una cuota específica (subir comprobante)"""
-    if not is_guardian(request.user):
+    if not request.guardian_ctx.is_guardian:
         messages.error(request, 'No tienes permisos para acceder a esta sección.')
         return redirect('pages:landing')
     
-    guardian_players = GuardianPlayer.objects.filter(guardian=request.user)
-    player_ids = guardian_players.values_list('player_id', flat=True)
+    player_ids = request.guardian_ctx.player_ids
     invoice = get_object_or_404(Invoice, id=invoice_id, player_id__in=player_ids)
     
     # Verificar que la cuota no esté ya pagada o en revisión
@@ -731,7 +726,14 @@ def guardian_pay_quota(request, invoice_id):
             return redirect('guardian:guardian_pay_quota', invoice_id=invoice.id)
         
         if not payment_proof_file:
-            messages.error(request, 'Debes subir un comprobante de pago.')
+            messages.error(request, upload_error(request, 'payment_proof') or 'Debes subir un comprobante de pago.')
+            return redirect('guardian:guardian_pay_quota', invoice_id=invoice.id)
+
+        # Quitar EXIF, achicar y recomprimir el comprobante antes de guardarlo
+        try:
+            proof = process_upload(payment_proof_file, image_rule())
+        except UploadRejected as e:
+            messages.error(request, str(e))
             return redirect('guardian:guardian_pay_quota', invoice_id=invoice.id)
 
         # Crear el objeto Payment
@@ -741,7 +743,9 @@ def guardian_pay_quota(request, invoice_id):
             paid_at=timezone.now(), # Se marca la fecha de subida
             method=payment_method,
             status='pendiente', # Pendiente de aprobación
-            payment_proof=payment_proof_file, # Guardar el archivo
+            payment_proof=proof.file, # Guardar el archivo
+            proof_original_size=proof.original_size,
+            proof_stored_size=proof.stored_size,
             notes=reference_number
         )
         
@@ -796,8 +800,7 @@ def guardian_pay_multiple(request):
             messages.error(request, 'No se seleccionaron cuotas para pagar.')
             return redirect('guardian:guardian_quotas_upcoming')
         
-        guardian_players = GuardianPlayer.objects.filter(guardian=request.user)
-        player_ids = guardian_players.values_list('player_id', flat=True)
+        player_ids = request.guardian_ctx.player_ids
         invoices = Invoice.objects.filter(
             id__in=invoice_ids,
             player_id__in=player_ids,
@@ -822,8 +825,7 @@ def guardian_pay_multiple(request):
         payment_method = request.POST.get('payment_method')
         reference_number = request.POST.get('reference_number', '')
         
-        guardian_players = GuardianPlayer.objects.filter(guardian=request.user)
-        player_ids = guardian_players.values_list('player_id', flat=True)
+        player_ids = request.guardian_ctx.player_ids
         invoices = Invoice.objects.filter(
             id__in=invoice_ids,
             player_id__in=player_ids,
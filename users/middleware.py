@@ -0,0 +1,12 @@
+from .guardian_context import GuardianContext
+
+
+class GuardianContextMiddleware:
+    """Adjunta ``request.guardian_ctx`` (perezoso). Debe ir después de AuthenticationMiddleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.guardian_ctx = GuardianContext(request)
+        return self.get_response(request)
@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-17 13:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_registration'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['status', 'created_at'], name='users_reg_status_created_idx'),
+        ),
+    ]
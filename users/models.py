@@ -62,6 +62,9 @@ class Registration(models.Model):
         verbose_name = 'Registro de Jugador'
         verbose_name_plural = 'Registros de Jugadores'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='users_reg_status_created_idx'),
+        ]
     
     def __str__(self):
         return f'{self.player_first_name} {self.player_last_name} - {self.get_status_display()}'
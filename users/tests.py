@@ -1,3 +1,79 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from finance.models import FeeDefinition, Invoice, Payment
+
+from .models import AdminProfile
+
+
+class UploadViewAccessTests(TestCase):
+    """Las vistas con ``validate_uploads`` autentican antes de mirar el archivo."""
+
+    def _post_proof(self, client):
+        proof = SimpleUploadedFile('comprobante.png', b'\x89PNG\r\n\x1a\n' + b'0' * 64, content_type='image/png')
+        return client.post(reverse('guardian:guardian_pay_quota', args=[1]), {'payment_proof': proof})
+
+    def test_anonymous_upload_is_redirected_without_reading_the_file(self):
+        with mock.patch('core.uploads.ValidatingUploadHandler') as handler:
+            response = self._post_proof(Client())
+
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse('login'), response['Location'])
+        handler.assert_not_called()
+
+    def test_csrf_is_still_enforced_for_authenticated_uploads(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(User.objects.create_user('apoderado', 'apoderado@example.com', 'x'))
+
+        self.assertEqual(self._post_proof(client).status_code, 403)
+
+
+class RejectPaymentTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'x')
+        AdminProfile.objects.create(user=self.admin, position='Tesorería')
+        self.guardian = User.objects.create_user('apoderado', 'apoderado@example.com', 'x')
+        self.fee = FeeDefinition.objects.create(name='Mensualidad', amount=10000, period='mensual')
+        self.client.force_login(self.admin)
+
+    def _reject(self, days_until_due):
+        invoice = Invoice.objects.create(guardian=self.guardian, fee_definition=self.fee, amount=10000, status='en revisión',
+                                         due_date=timezone.localdate() + timedelta(days=days_until_due))
+        payment = Payment.objects.create(invoice=invoice, amount=10000, paid_at=timezone.now(), method='transferencia')
+        self.client.post(reverse('admin_panel:reject_payment', args=[payment.pk]))
+        invoice.refresh_from_db()
+        return invoice.status
+
+    def test_rejected_payment_of_past_due_invoice_marks_it_overdue(self):
+        self.assertEqual(self._reject(days_until_due=-1), 'atrasada')
+
+    def test_rejected_payment_of_current_invoice_leaves_it_pending(self):
+        self.assertEqual(self._reject(days_until_due=5), 'pendiente')
+
+
+class ExportFinanceTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user('admin', 'admin@example.com', 'x')
+        AdminProfile.objects.create(user=admin, position='Tesorería')
+        self.client.force_login(admin)
+
+    def _export(self, **params):
+        return self.client.get(reverse('admin_panel:export_finance', args=['invoices']), params)
+
+    def test_non_numeric_category_is_rejected_before_streaming(self):
+        response = self._export(category='sub-14')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.streaming)
+
+    def test_numeric_category_streams_the_csv(self):
+        response = self._export(category='1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).decode('utf-8-sig').startswith('ID,'))